@@ -0,0 +1,180 @@
+# adaptive_stability.py
+"""
+Adaptive replacement for the fixed-interval stability wait.
+
+Each watched folder keeps a small record of how files usually arrive there
+(average write rate and how long writes take to finish). It is persisted in
+config/watcher_stats.json, so the defaults improve over time:
+
+- folders where files land in one go get a short polling interval, so small
+  files are confirmed stable in a fraction of a second;
+- while a file keeps growing the polling interval backs off, and the timeout
+  only counts time *without* growth, so large slow downloads are not abandoned.
+"""
+import os
+import json
+import threading
+
+from categories import CONFIG_DIR
+from config_store import atomic_write_json
+
+STATS_FILE = os.path.join(CONFIG_DIR, "watcher_stats.json")
+
+# bounds for the polling interval (seconds)
+MIN_CHECK_INTERVAL = 0.1
+MAX_CHECK_INTERVAL = 10.0
+# interval multiplier applied after each poll that saw the file grow
+BACKOFF_FACTOR = 1.5
+# hard cap on a single wait, however long the file keeps growing (seconds)
+MAX_ADAPTIVE_TIMEOUT = 6 * 3600.0
+# weight of the newest sample in the running averages
+EWMA_ALPHA = 0.2
+# persist stats after this many new samples
+SAVE_EVERY = 20
+
+
+class FolderWriteStats:
+    """
+    Learned write behaviour for one folder.
+    avg_rate: bytes/second while files were growing.
+    avg_duration: seconds from first sight of a file until it stopped growing.
+    """
+
+    def __init__(self, samples=0, avg_rate=0.0, avg_duration=0.0):
+        self.samples = samples
+        self.avg_rate = avg_rate
+        self.avg_duration = avg_duration
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(int(data.get("samples", 0)), float(data.get("avg_rate", 0.0)), float(data.get("avg_duration", 0.0)))
+
+    def to_dict(self):
+        return {"samples": self.samples, "avg_rate": self.avg_rate, "avg_duration": self.avg_duration}
+
+    def record(self, size, duration):
+        rate = size / duration if duration > 0 else 0.0
+        if self.samples == 0:
+            self.avg_rate, self.avg_duration = rate, duration
+        else:
+            self.avg_rate += EWMA_ALPHA * (rate - self.avg_rate)
+            self.avg_duration += EWMA_ALPHA * (duration - self.avg_duration)
+        self.samples += 1
+
+    def base_interval(self, default_interval):
+        """
+        Polling interval to start with: a quarter of the usual write duration,
+        clamped to [MIN_CHECK_INTERVAL, default_interval]. No history -> default.
+        """
+        if self.samples == 0:
+            return default_interval
+        return max(MIN_CHECK_INTERVAL, min(default_interval, self.avg_duration / 4))
+
+
+class WriteStatsStore:
+    """
+    Thread-safe map of folder path -> FolderWriteStats, persisted as JSON.
+    """
+
+    def __init__(self, path=STATS_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._stats = self._load()
+        self._unsaved = 0
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return {folder: FolderWriteStats.from_dict(d) for folder, d in data.items()}
+        except Exception:
+            return {}
+
+    def for_folder(self, folder):
+        with self._lock:
+            return self._stats.setdefault(folder, FolderWriteStats())
+
+    def record(self, folder, size, duration):
+        with self._lock:
+            self._stats.setdefault(folder, FolderWriteStats()).record(size, duration)
+            self._unsaved += 1
+            should_save = self._unsaved >= SAVE_EVERY
+        if should_save:
+            self.save()
+
+    def save(self):
+        with self._lock:
+            data = {folder: s.to_dict() for folder, s in self._stats.items()}
+            self._unsaved = 0
+        try:
+            atomic_write_json(self.path, data, indent=2)
+        except Exception:
+            pass
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_stats_store():
+    """
+    Process-wide store shared by every watcher.
+    """
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = WriteStatsStore()
+        return _default_store
+
+
+class StabilityTracker:
+    """
+    Polling state machine for one file. Drive it with observe(size, now) after each
+    stat; it answers ("stable", None), ("timeout", None) or ("wait", seconds).
+    Shared by the thread and asyncio watchers, which only differ in how they sleep.
+    """
+
+    def __init__(self, stats, check_interval, stable_checks, idle_timeout):
+        self.base_interval = stats.base_interval(check_interval)
+        self.interval = self.base_interval
+        self.stable_checks = stable_checks
+        # learned durations extend the idle timeout for folders with slow writers
+        self.idle_timeout = max(idle_timeout, 2 * stats.avg_duration)
+        self.first_seen = None
+        self.last_growth = None
+        self.last_size = -1
+        self.stable_count = 0
+
+    def observe(self, size, now, busy=False):
+        """
+        busy: a readiness check saw a writer on the file, so an unchanged size does
+        not count towards stability.
+        """
+        if self.first_seen is None:
+            self.first_seen = self.last_growth = now
+
+        if size != self.last_size:
+            if self.last_size >= 0:
+                self.last_growth = now
+                # still growing: back off so large transfers cost few stats
+                self.interval = min(MAX_CHECK_INTERVAL, self.interval * BACKOFF_FACTOR)
+            self.stable_count = 0
+            self.last_size = size
+        elif busy:
+            self.stable_count = 0
+        else:
+            self.stable_count += 1
+            # quiet: tighten back so stability is confirmed quickly
+            self.interval = self.base_interval
+
+        if self.stable_count >= self.stable_checks:
+            return "stable", None
+        if now - self.last_growth > self.idle_timeout or now - self.first_seen > MAX_ADAPTIVE_TIMEOUT:
+            return "timeout", None
+        return "wait", self.interval
+
+    def write_duration(self):
+        """
+        Seconds the file was observed growing (for the folder statistics).
+        """
+        return max(0.0, self.last_growth - self.first_seen)
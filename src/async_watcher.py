@@ -0,0 +1,478 @@
+# async_watcher.py
+"""
+asyncio-based alternative to file_watcher.FolderWatcher.
+
+The watchdog Observer still produces the raw events on its own thread, but every
+per-file step after that (stability polling, debouncing, sentinel monitoring) runs
+as a coroutine on a single event loop. Only the blocking move is handed to a bounded
+thread pool, so thousands of in-flight files cost coroutines instead of OS threads.
+
+Usage from an existing asyncio service:
+
+    watcher = AsyncFolderWatcher(folder, log_func=logger.info)
+    await watcher.start()
+    ...
+    await watcher.stop()
+"""
+import os
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import readiness
+from categories import CategoryManager
+from readiness import DEFAULT_READINESS
+from adaptive_stability import StabilityTracker
+from file_watcher import (
+    SENTINEL_FILENAME,
+    DEFAULT_STABLE_CHECK_INTERVAL,
+    DEFAULT_STABLE_CHECKS,
+    DEFAULT_STABILITY_TIMEOUT,
+    DEFAULT_DEBOUNCE_WINDOW,
+    DEFAULT_BACKEND,
+    DEFAULT_POLICY,
+    DEFAULT_BATCH_INTERVAL,
+    DEFAULT_BATCH_SIZE,
+    _WatchHandler,
+    _make_observer,
+)
+
+# maximum number of blocking moves running at the same time
+DEFAULT_MAX_MOVE_WORKERS = 4
+
+
+def _probe(path, readiness_checks):
+    """
+    (size, busy) of a file, or None if it is gone. Blocking (stat, /proc scan):
+    the coroutines run it on the loop's default executor, never on the loop itself,
+    so a slow drive stalls only its own files.
+    """
+    if not os.path.exists(path):
+        return None
+    return os.path.getsize(path), readiness.is_busy(path, readiness_checks)
+
+
+async def _wait_for_stable_file_async(path, check_interval=DEFAULT_STABLE_CHECK_INTERVAL, stable_checks=DEFAULT_STABLE_CHECKS, timeout=DEFAULT_STABILITY_TIMEOUT, log_func=print,
+                                      readiness_checks=()):
+    """
+    Coroutine version of file_watcher._wait_for_stable_file.
+    Sleeps with asyncio.sleep so waiting files do not hold a thread; each check
+    runs briefly on the loop's default executor.
+    Returns True if stable, False otherwise.
+    """
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    last_size = -1
+    stable_count = 0
+
+    while True:
+        try:
+            probe = await loop.run_in_executor(None, _probe, path, readiness_checks)
+        except Exception as e:
+            log_func(f"[Watcher] Error accessing file {path} while waiting for stability: {e}")
+            return False
+        if probe is None:
+            log_func(f"[Watcher] File disappeared while waiting: {path}")
+            return False
+        # an open writer keeps the file unsettled even if its size holds still
+        size, busy = probe
+
+        if size == last_size and not busy:
+            stable_count += 1
+        else:
+            stable_count = 0
+            last_size = size
+
+        if stable_count >= stable_checks:
+            return True
+
+        if (loop.time() - start) > timeout:
+            log_func(f"[Watcher] Timed out waiting for file stability: {path}")
+            return False
+
+        await asyncio.sleep(check_interval)
+
+
+async def _wait_for_stable_file_adaptive_async(path, tracker: StabilityTracker, log_func=print, readiness_checks=()):
+    """
+    Coroutine version of file_watcher._wait_for_stable_file_adaptive.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        try:
+            probe = await loop.run_in_executor(None, _probe, path, readiness_checks)
+        except Exception as e:
+            log_func(f"[Watcher] Error accessing file {path} while waiting for stability: {e}")
+            return False
+        if probe is None:
+            log_func(f"[Watcher] File disappeared while waiting: {path}")
+            return False
+        # an open writer keeps the file unsettled even if its size holds still
+        size, busy = probe
+
+        verdict, delay = tracker.observe(size, loop.time(), busy=busy)
+        if verdict == "stable":
+            return True
+        if verdict == "timeout":
+            log_func(f"[Watcher] Timed out waiting for file stability: {path}")
+            return False
+        await asyncio.sleep(delay)
+
+
+class _AsyncWatchHandler(_WatchHandler):
+    """
+    Watch handler that forwards observer events onto an asyncio loop.
+    Filtering, classification and the move itself are shared with _WatchHandler;
+    the event callbacks are inherited and call the _submit/_touch/_cancel hooks below.
+    """
+
+    def __init__(self, folder_path, category_manager: CategoryManager, loop, executor, log_func=print,
+                 stable_checks=DEFAULT_STABLE_CHECKS, check_interval=DEFAULT_STABLE_CHECK_INTERVAL, stability_timeout=DEFAULT_STABILITY_TIMEOUT,
+                 debounce_window=DEFAULT_DEBOUNCE_WINDOW, readiness_checks=DEFAULT_READINESS, adaptive=True, catalog=None, sharding=None, governor=None,
+                 journal=None, policy=DEFAULT_POLICY, batch_interval=DEFAULT_BATCH_INTERVAL, batch_size=DEFAULT_BATCH_SIZE,
+                 tracer=None, view_root=None):
+        # debouncing is done with loop timers here, not with the threaded _Debouncer
+        super().__init__(folder_path, category_manager, log_func=log_func, stable_checks=stable_checks,
+                         check_interval=check_interval, stability_timeout=stability_timeout, debounce_window=0,
+                         readiness_checks=readiness_checks, adaptive=adaptive, catalog=catalog, sharding=sharding,
+                         governor=governor, journal=journal, policy=policy, batch_interval=batch_interval,
+                         batch_size=batch_size, tracer=tracer, view_root=view_root)
+        self.debounce_window = debounce_window
+        self.loop = loop
+        self.executor = executor
+        self._tasks = {}  # canonical path -> asyncio.Task currently handling it
+        self._timers = {}  # canonical path -> asyncio.TimerHandle for debounced paths
+        self._moving = set()  # paths whose move has been handed to the executor
+
+    def _blocking(self, func, *args):
+        # filesystem work (stat, /proc scan, config reads) stays off the event loop
+        return self.loop.run_in_executor(None, func, *args)
+
+    # --- hooks called on the observer thread ---
+    def _submit(self, path, immediate=False):
+        self.loop.call_soon_threadsafe(self._debounce, os.path.abspath(path), False, immediate)
+
+    def _touch(self, path):
+        self.loop.call_soon_threadsafe(self._debounce, os.path.abspath(path), True, False)
+
+    def _cancel(self, path):
+        self.loop.call_soon_threadsafe(self._cancel_timer, os.path.abspath(path))
+
+    # --- loop-side debouncing ---
+    def _debounce(self, src_path, only_if_pending, immediate):
+        timer = self._timers.pop(src_path, None)
+        if timer is None and only_if_pending:
+            return
+        if timer is not None:
+            timer.cancel()
+        if immediate or self.debounce_window <= 0:
+            self._schedule(src_path)
+            return
+        self._timers[src_path] = self.loop.call_later(self.debounce_window, self._fire, src_path)
+
+    def _fire(self, src_path):
+        self._timers.pop(src_path, None)
+        self._schedule(src_path)
+
+    def _cancel_timer(self, src_path):
+        timer = self._timers.pop(src_path, None)
+        if timer is not None:
+            timer.cancel()
+
+    def _cancel_all_timers(self):
+        for timer in self._timers.values():
+            timer.cancel()
+        self._timers.clear()
+
+    def _schedule(self, src_path):
+        """
+        Runs on the event loop. Starts one task per path; repeated events for a path
+        that is already being handled (or queued for a batch move) are dropped.
+        """
+        if src_path in self._tasks or src_path in self._queued:
+            return
+        task = self.loop.create_task(self._process_new_file_async(src_path))
+        self._tasks[src_path] = task
+        task.add_done_callback(lambda t, p=src_path: self._tasks.pop(p, None))
+
+    async def _process_new_file_async(self, src_path):
+        trace = self._trace(src_path)
+        trace.gap("debounce")
+        arrived_complete = self._take_arrived_complete(src_path)
+        filename = os.path.basename(src_path)
+        outcome = "error"
+        try:
+            with trace.span("filter") as info:
+                info["accepted"] = accepted = await self._blocking(self._should_process, src_path)
+            if not accepted:
+                outcome = "filtered"
+                return
+
+            with trace.span("readiness") as info:
+                info["ready"] = ready = await self._blocking(self._ready_now, src_path, arrived_complete)
+            if ready:
+                stable = True
+            else:
+                with trace.span("stability_wait") as info:
+                    info["stable"] = stable = await self._wait_for_stable_async(src_path)
+            if not stable:
+                outcome = "unstable"
+                self.log(f"[Watcher] Skipping unstable file: {filename}")
+                return
+
+            with trace.span("classify") as info:
+                info["category"] = category = await self._blocking(self._category_for, src_path)
+            if not category:
+                outcome = "no category"
+                return
+            self._moving.add(src_path)
+            try:
+                placed = await self.loop.run_in_executor(self.executor, self._place, src_path, category)
+            finally:
+                self._moving.discard(src_path)
+            outcome = None if placed is None else ("moved" if placed else "move failed")
+        except asyncio.CancelledError:
+            outcome = "interrupted"
+            raise
+        finally:
+            if outcome is not None:
+                self._trace_finish(src_path, outcome)
+
+    async def _wait_for_stable_async(self, src_path):
+        if not self.adaptive:
+            return await _wait_for_stable_file_async(src_path, check_interval=self.check_interval,
+                                                     stable_checks=self.stable_checks, timeout=self.stability_timeout, log_func=self.log,
+                                                     readiness_checks=self.readiness_checks)
+        tracker = await self._blocking(self._new_tracker)
+        stable = await _wait_for_stable_file_adaptive_async(src_path, tracker, log_func=self.log, readiness_checks=self.readiness_checks)
+        if stable:
+            await self._blocking(self._record_write, src_path, tracker)  # may save the stats file
+        return stable
+
+    async def drain(self):
+        """
+        Let moves already handed to the executor finish. Files still waiting for
+        stability are cancelled and left in place: with the observer stopped, a
+        growing file could otherwise hold stop() for its whole stability timeout.
+        """
+        moving = []
+        for path, task in list(self._tasks.items()):
+            if path in self._moving:
+                moving.append(task)
+            else:
+                task.cancel()
+        if moving:
+            await asyncio.gather(*moving, return_exceptions=True)
+
+    def cancel_all(self):
+        for task in list(self._tasks.values()):
+            task.cancel()
+
+    async def checkpoint(self, deadline):
+        """
+        Shutdown under a deadline (a time.monotonic() value): files still debouncing or
+        waiting for stability are cancelled, moves already handed to the executor get
+        until the deadline to finish. Returns the paths left unfinished.
+        """
+        unfinished = list(self._timers)
+        self._cancel_all_timers()
+        moving = []
+        for path, task in list(self._tasks.items()):
+            if path in self._moving:
+                moving.append(task)
+            else:
+                task.cancel()
+                unfinished.append(path)
+        if moving:
+            await asyncio.wait(moving, timeout=max(0.0, deadline - time.monotonic()))
+        unfinished.extend(self._moving)  # still running past the deadline
+        if self._batcher is not None:
+            unfinished.extend(src for src, _ in self._batcher.stop(flush=False))
+            self._queued.clear()
+        return list(dict.fromkeys(unfinished))
+
+
+class AsyncFolderWatcher:
+    """
+    asyncio counterpart of file_watcher.FolderWatcher.
+    - Creates the sentinel file if not present.
+    - Stops itself if sentinel is deleted.
+    - Blocking moves run on `executor` (shared or private, bounded by max_workers).
+    """
+
+    def __init__(self, folder_path, log_func=print, cm: CategoryManager = None,
+                 stable_checks=DEFAULT_STABLE_CHECKS,
+                 check_interval=DEFAULT_STABLE_CHECK_INTERVAL,
+                 stability_timeout=DEFAULT_STABILITY_TIMEOUT,
+                 debounce_window=DEFAULT_DEBOUNCE_WINDOW,
+                 readiness_checks=DEFAULT_READINESS,
+                 adaptive=True,
+                 backend=DEFAULT_BACKEND,
+                 catalog=None,
+                 sharding=None,
+                 governor=None,
+                 journal=None,
+                 policy=DEFAULT_POLICY,
+                 batch_interval=DEFAULT_BATCH_INTERVAL,
+                 batch_size=DEFAULT_BATCH_SIZE,
+                 tracer=None,
+                 pending_work=None,
+                 view_root=None,
+                 executor=None, max_workers=DEFAULT_MAX_MOVE_WORKERS):
+
+        self.folder_path = os.path.abspath(folder_path)
+        self.log = log_func
+        self.cm = cm if cm is not None else CategoryManager()
+        self._stable_checks = stable_checks
+        self._check_interval = check_interval
+        self._stability_timeout = stability_timeout
+        self._debounce_window = debounce_window
+        self._readiness_checks = readiness_checks
+        self._adaptive = adaptive
+        self.backend = backend
+        self.catalog = catalog
+        self.sharding = sharding
+        self.governor = governor
+        self.journal = journal
+        self._policy = (policy, batch_interval, batch_size)
+        self.tracer = tracer
+        self.pending_work = pending_work  # optional pending_work.PendingWork: checkpoint across restarts
+        self.view_root = view_root  # for policy "view"
+        # only shut down the executor on stop if we created it
+        self._owns_executor = executor is None
+        self.executor = executor if executor is not None else ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="organizer-move")
+        self.handler = None
+        self.observer = None
+        self._monitor_task = None
+        self._running = False
+
+    def _sentinel_path(self):
+        return os.path.join(self.folder_path, SENTINEL_FILENAME)
+
+    def _create_sentinel(self):
+        sentinel = self._sentinel_path()
+        if not os.path.exists(sentinel):
+            try:
+                with open(sentinel, "w", encoding="utf-8") as f:
+                    f.write("This folder is under watch of auto organizer (delete this to stop auto organization)\n")
+            except Exception as e:
+                self.log(f"[Watcher] Could not create sentinel file: {e}")
+
+    def _remove_sentinel(self):
+        try:
+            sentinel = self._sentinel_path()
+            if os.path.exists(sentinel):
+                os.remove(sentinel)
+                self.log(f"[Watcher] Removed sentinel file.")
+        except Exception as e:
+            self.log(f"[Watcher] Error removing sentinel file: {e}")
+
+    async def start(self):
+        """
+        Start watching the folder on the running event loop. Creates sentinel file if missing.
+        """
+        if not os.path.isdir(self.folder_path):
+            raise ValueError("Folder does not exist: " + self.folder_path)
+
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.executor, self._create_sentinel)
+
+        def build_handler():
+            return _AsyncWatchHandler(self.folder_path, self.cm, loop, self.executor, log_func=self.log,
+                                      stable_checks=self._stable_checks, check_interval=self._check_interval,
+                                      stability_timeout=self._stability_timeout,
+                                      debounce_window=self._debounce_window,
+                                      readiness_checks=self._readiness_checks,
+                                      adaptive=self._adaptive,
+                                      catalog=self.catalog,
+                                      sharding=self.sharding,
+                                      governor=self.governor,
+                                      journal=self.journal,
+                                      policy=self._policy[0],
+                                      batch_interval=self._policy[1],
+                                      batch_size=self._policy[2],
+                                      tracer=self.tracer,
+                                      view_root=self.view_root)
+
+        # building the handler loads categories, statistics and views from disk
+        self.handler = await loop.run_in_executor(None, build_handler)
+        self.observer = _make_observer(self.backend)
+        self.observer.schedule(self.handler, self.folder_path, recursive=False)
+        self.observer.start()
+        self._running = True
+        self._monitor_task = loop.create_task(self._monitor_sentinel())
+        self.log(f"[Watcher] Started watching: {self.folder_path}")
+        if self.handler._view is not None:
+            loop.run_in_executor(self.executor, self.handler.rebuild_view)
+        if self.pending_work is not None:
+            resumed = await loop.run_in_executor(None, self.pending_work.take, self.folder_path)
+            if resumed:
+                self.log(f"[Watcher] Resuming {len(resumed)} file(s) left over from the last shutdown.")
+                for path in resumed:
+                    self.handler._submit(path)
+
+    async def _monitor_sentinel(self):
+        """
+        Background coroutine that watches the sentinel file. When sentinel is removed, stop observer.
+        """
+        sentinel = self._sentinel_path()
+        loop = asyncio.get_running_loop()
+        while self._running:
+            if not await loop.run_in_executor(None, os.path.exists, sentinel):
+                self.log("[Watcher] Sentinel file removed — stopping watcher.")
+                await self.stop()
+                break
+            await asyncio.sleep(1)
+
+    async def stop(self, drain=True, deadline=None):
+        """
+        Stop watching. Files still waiting for stability are cancelled and left in place;
+        with drain=True, moves already handed to the executor finish first. A deadline (a time.monotonic() value) marks a
+        shutdown: see _AsyncWatchHandler.checkpoint(); unfinished files go to pending_work.
+        """
+        if not self._running:
+            return
+        self._running = False
+        loop = asyncio.get_running_loop()
+
+        if self._monitor_task is not None and self._monitor_task is not asyncio.current_task():
+            self._monitor_task.cancel()
+        if deadline is not None:
+            unfinished = await self.handler.checkpoint(deadline)
+            if unfinished and self.pending_work is not None:
+                self.pending_work.add(self.folder_path, unfinished)
+                self.log(f"[Watcher] Saved {len(unfinished)} unfinished file(s) to resume on next start.")
+        self.handler._cancel_all_timers()
+        if self.handler.stats_store is not None:
+            await loop.run_in_executor(None, self.handler.stats_store.save)
+        if self.handler._view is not None:
+            await loop.run_in_executor(None, self.handler._view.flush)
+
+        try:
+            self.observer.stop()
+            timeout = 5 if deadline is None else min(5, max(0.0, deadline - time.monotonic()))
+            await loop.run_in_executor(None, self.observer.join, timeout)
+        except Exception:
+            pass
+
+        if drain and deadline is None:
+            await self.handler.drain()
+        else:
+            self.handler.cancel_all()
+        if self.handler._batcher is not None:
+            # moves whatever is still queued for the next flush
+            await loop.run_in_executor(self.executor, self.handler._batcher.stop)
+
+        await loop.run_in_executor(None, self._remove_sentinel)
+        if self._owns_executor:
+            self.executor.shutdown(wait=False)
+        self.log(f"[Watcher] Stopped watching: {self.folder_path}")
+
+    def is_running(self):
+        return self._running
+
+    def in_flight(self):
+        """
+        Number of files currently waiting or moving.
+        """
+        return len(self.handler._tasks) if self.handler else 0
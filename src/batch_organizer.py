@@ -0,0 +1,176 @@
+# batch_organizer.py
+"""
+Organize many folders at once using a process pool.
+
+Each folder is handled by organizer.organize_folder in a worker process, so the
+classification and bookkeeping of different folders no longer share one GIL.
+Folders on the same device are limited to `per_device_limit` concurrent jobs so
+a batch does not thrash a single disk. Logs and undo records from all workers
+are merged back into this process: after the batch, organizer.undo_last_organization
+undoes the whole session. Workers journal their moves under the batch's session
+as they make them, so a crash mid-batch still leaves an undoable journal.
+
+CLI:
+    python batch_organizer.py FOLDER [FOLDER ...] [--workers N] [--per-device N] [--dry-run]
+    python batch_organizer.py --watched          # every folder in config/watched_folders.json
+"""
+import os
+import sys
+import argparse
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+import organizer
+from categories import CONFIG_DIR, CategoryManager
+from config_store import load_json, valid_watched_folders
+from catalog import get_catalog, new_session_id
+from sharding import get_sharding_config
+from journal import get_journal
+from move_log import MoveLog
+
+WATCHED_FOLDERS_FILE = os.path.join(CONFIG_DIR, "watched_folders.json")
+
+# concurrent jobs allowed on one physical device (st_dev)
+DEFAULT_PER_DEVICE_LIMIT = 2
+
+
+def load_watched_folder_list(path=WATCHED_FOLDERS_FILE):
+    """
+    Return the folder paths stored by the GUI in watched_folders.json.
+    Entries are either a path or {"path": ..., <watcher options>}.
+    """
+    entries = load_json(path, validate=valid_watched_folders)
+    if entries is None:
+        raise FileNotFoundError(f"No usable watched folder list at {path}")
+    return [e["path"] if isinstance(e, dict) else e for e in entries]
+
+
+def _device_of(folder):
+    try:
+        return os.stat(folder).st_dev
+    except OSError:
+        return None
+
+
+def _organize_one(folder, categories_dict, selected_categories, dry_run, sharding, journal=None, session=None):
+    """
+    Worker entry point (runs in a child process).
+    Returns (folder, log lines, moves) so the parent can merge them.
+    """
+    logs = []
+    try:
+        organizer.organize_folder(folder, categories_dict, selected_categories,
+                                  log_func=logs.append, progress_func=None, dry_run=dry_run, sharding=sharding,
+                                  journal=journal, session=session)
+    except Exception as e:
+        logs.append(f"Error organizing folder: {e}")
+    return folder, logs, organizer._last_moves
+
+
+def organize_folders(folders, categories_dict, selected_categories=None, log_func=print, progress_func=None,
+                     dry_run=False, max_workers=None, per_device_limit=DEFAULT_PER_DEVICE_LIMIT, catalog=None,
+                     sharding=None, journal=None):
+    """
+    Organize every folder in `folders` in parallel worker processes.
+    log_func(message) receives each worker's log lines, prefixed with its folder.
+    progress_func(done, total) is called as folders complete; may be None.
+    catalog: optional catalog.Catalog; moves are recorded here, in the parent process.
+    sharding: optional sharding.ShardingConfig passed to every worker.
+    journal: optional journal.MoveJournal; every worker journals its moves under the batch session.
+    Returns the merged MoveLog of (dest, src) moves, which also becomes organizer._last_moves.
+    """
+    session = new_session_id("batch")
+    folders = [os.path.abspath(f) for f in dict.fromkeys(folders)]  # dedupe, keep order
+    total = len(folders)
+    session_moves = MoveLog()
+    if total == 0:
+        log_func("No folders to organize.")
+        organizer._last_moves = session_moves
+        return session_moves
+
+    # queue folders per device; a device only gets per_device_limit jobs at a time
+    pending = {}
+    for folder in folders:
+        if not os.path.isdir(folder):
+            log_func(f"[{folder}] Skipped: folder does not exist.")
+            continue
+        pending.setdefault(_device_of(folder), []).append(folder)
+
+    running_per_device = {dev: 0 for dev in pending}
+    in_flight = {}  # future -> device
+    done = total - sum(len(v) for v in pending.values())
+    if progress_func:
+        progress_func(done, total)
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        def fill():
+            submitted = True
+            # round-robin across devices so one device's long queue does not go first
+            while submitted:
+                submitted = False
+                for dev, queue in pending.items():
+                    if queue and running_per_device[dev] < per_device_limit:
+                        fut = pool.submit(_organize_one, queue.pop(0), categories_dict, selected_categories, dry_run, sharding,
+                                          journal, session)
+                        in_flight[fut] = dev
+                        running_per_device[dev] += 1
+                        submitted = True
+
+        fill()
+        while in_flight:
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                dev = in_flight.pop(fut)
+                running_per_device[dev] -= 1
+                try:
+                    folder, logs, moves = fut.result()
+                except Exception as e:
+                    log_func(f"Worker failed: {e}")
+                else:
+                    for line in logs:
+                        log_func(f"[{folder}] {line}")
+                    session_moves.extend(moves)
+                    if catalog is not None:
+                        for dest, _src in moves:
+                            category = os.path.relpath(dest, folder).split(os.sep)[0]
+                            catalog.record(dest, category, folder, session)
+                done += 1
+                if progress_func:
+                    progress_func(done, total)
+            fill()
+
+    # one undo session for the whole batch
+    organizer._last_moves = session_moves
+    log_func(f"Batch complete: {total} folder(s), {len(session_moves)} file(s) moved.")
+    return session_moves
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Organize many folders in parallel.")
+    parser.add_argument("folders", nargs="*", help="folders to organize")
+    parser.add_argument("--watched", action="store_true", help="include every folder from watched_folders.json")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--per-device", type=int, default=DEFAULT_PER_DEVICE_LIMIT, help="concurrent jobs per device")
+    parser.add_argument("--dry-run", action="store_true", help="only log planned moves")
+    args = parser.parse_args(argv)
+
+    folders = list(args.folders)
+    if args.watched:
+        try:
+            folders.extend(load_watched_folder_list())
+        except Exception as e:
+            print(f"Error loading watched folders: {e}")
+    if not folders:
+        parser.error("no folders given")
+
+    categories = CategoryManager().get()
+    catalog = None if args.dry_run else get_catalog()
+    organize_folders(folders, categories, dry_run=args.dry_run, max_workers=args.workers, per_device_limit=args.per_device,
+                     catalog=catalog, sharding=get_sharding_config(),
+                     journal=None if args.dry_run else get_journal())
+    if catalog is not None:
+        catalog.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,279 @@
+# catalog.py
+"""
+Persistent SQLite catalog of every file the organizer or the watcher has placed.
+
+record() only puts the move on a queue; a background writer thread stats the
+file and inserts rows in batched transactions, so the move path never waits on
+SQLite. Queries use indexes on category, origin folder, session and placement
+time, so lookups like "PDFs moved out of Downloads last week" stay instant with
+millions of rows.
+
+CLI:
+    python catalog.py query [--category C] [--origin DIR] [--since 7d] [--until 2024-01-31]
+                            [--name "%.pdf"] [--session S] [--limit N]
+    python catalog.py stats
+"""
+import os
+import sys
+import time
+import queue
+import sqlite3
+import argparse
+import itertools
+import threading
+from datetime import datetime
+
+from categories import CONFIG_DIR
+
+CATALOG_FILE = os.path.join(CONFIG_DIR, "catalog.db")
+
+# the writer commits after this many queued operations, or after FLUSH_INTERVAL seconds
+FLUSH_BATCH_SIZE = 500
+FLUSH_INTERVAL = 1.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path      TEXT PRIMARY KEY,
+    name      TEXT NOT NULL,
+    category  TEXT,
+    size      INTEGER,
+    mtime     REAL,
+    origin    TEXT,
+    session   TEXT,
+    placed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_files_category ON files(category, placed_at);
+CREATE INDEX IF NOT EXISTS idx_files_origin ON files(origin, placed_at);
+CREATE INDEX IF NOT EXISTS idx_files_session ON files(session);
+CREATE INDEX IF NOT EXISTS idx_files_placed ON files(placed_at);
+CREATE INDEX IF NOT EXISTS idx_files_name ON files(name);
+"""
+
+_STOP = object()
+# numbers sessions within this process; next() on a count is atomic under the GIL
+_session_counter = itertools.count(1)
+
+
+def new_session_id(kind):
+    """
+    Unique label for one organize run or watcher lifetime, e.g. 'manual-20240131-101500-4242-1':
+    the start time, then the process id and a per-process counter, so watchers started
+    together and runs within the same second never share a session.
+    """
+    return f"{kind}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{next(_session_counter)}"
+
+
+class Catalog:
+    """
+    Thread-safe handle on the catalog database. One writer thread per instance;
+    each reading thread gets its own connection.
+    """
+
+    def __init__(self, path=CATALOG_FILE):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        conn = self._connect()
+        conn.executescript(_SCHEMA)
+        conn.commit()
+        conn.close()
+        self._queue = queue.Queue()
+        self._local = threading.local()
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        # WAL lets readers (GUI, CLI) query while the writer commits
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _reader(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+            conn.row_factory = sqlite3.Row
+        return conn
+
+    # --- writes (queued) ---
+    def record(self, path, category, origin, session):
+        """
+        Queue a placed file. Returns immediately.
+        """
+        self._queue.put(("add", os.path.abspath(path), category, os.path.abspath(origin), session, time.time()))
+
+    def remove(self, path):
+        """
+        Queue removal of a file from the catalog (e.g. after undo).
+        """
+        self._queue.put(("remove", os.path.abspath(path)))
+
+    def flush(self):
+        """
+        Block until everything queued so far is committed.
+        """
+        done = threading.Event()
+        self._queue.put(("flush", done))
+        done.wait()
+
+    def close(self):
+        self._queue.put(_STOP)
+        self._writer.join()
+
+    def _write_loop(self):
+        conn = self._connect()
+        batch = []
+        waiters = []
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                op = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                op = None
+
+            if op is _STOP:
+                self._commit(conn, batch)
+                conn.close()
+                return
+            if op is not None:
+                if op[0] == "flush":
+                    waiters.append(op[1])
+                else:
+                    batch.append(op)
+                    if deadline is None:
+                        deadline = time.monotonic() + FLUSH_INTERVAL
+
+            if waiters or len(batch) >= FLUSH_BATCH_SIZE or (deadline is not None and time.monotonic() >= deadline):
+                self._commit(conn, batch)
+                batch = []
+                deadline = None
+                for w in waiters:
+                    w.set()
+                waiters = []
+
+    @staticmethod
+    def _commit(conn, batch):
+        if not batch:
+            return
+        rows = []
+        removals = []
+        for op in batch:
+            if op[0] == "add":
+                _, path, category, origin, session, placed_at = op
+                try:
+                    st = os.stat(path)
+                    size, mtime = st.st_size, st.st_mtime
+                except OSError:
+                    size = mtime = None
+                rows.append((path, os.path.basename(path), category, size, mtime, origin, session, placed_at))
+            else:
+                removals.append((op[1],))
+        try:
+            with conn:
+                if rows:
+                    conn.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+                if removals:
+                    conn.executemany("DELETE FROM files WHERE path = ?", removals)
+        except sqlite3.Error as e:
+            print(f"[Catalog] Error writing batch: {e}")
+
+    # --- reads ---
+    def query(self, category=None, origin=None, since=None, until=None, name_like=None, session=None, limit=1000):
+        """
+        Return placed files as dicts, newest first.
+        since/until are epoch seconds; name_like is a SQL LIKE pattern (e.g. '%.pdf').
+        """
+        clauses, params = [], []
+        if category is not None:
+            clauses.append("category = ?"); params.append(category)
+        if origin is not None:
+            clauses.append("origin = ?"); params.append(os.path.abspath(origin))
+        if since is not None:
+            clauses.append("placed_at >= ?"); params.append(since)
+        if until is not None:
+            clauses.append("placed_at < ?"); params.append(until)
+        if name_like is not None:
+            clauses.append("name LIKE ?"); params.append(name_like)
+        if session is not None:
+            clauses.append("session = ?"); params.append(session)
+        sql = "SELECT * FROM files"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY placed_at DESC"
+        if limit:
+            sql += " LIMIT ?"; params.append(limit)
+        return [dict(r) for r in self._reader().execute(sql, params)]
+
+    def stats(self):
+        """
+        Return {category: (file count, total bytes)}.
+        """
+        cur = self._reader().execute("SELECT category, COUNT(*), COALESCE(SUM(size), 0) FROM files GROUP BY category ORDER BY category")
+        return {cat: (count, size) for cat, count, size in cur}
+
+
+_default_catalog = None
+_default_catalog_lock = threading.Lock()
+
+
+def get_catalog():
+    """
+    Process-wide catalog shared by the organizer and the watchers.
+    """
+    global _default_catalog
+    with _default_catalog_lock:
+        if _default_catalog is None:
+            _default_catalog = Catalog()
+        return _default_catalog
+
+
+def _parse_time(value):
+    """
+    '7d', '12h', '30m' (relative to now) or an ISO date/datetime -> epoch seconds.
+    """
+    units = {"d": 86400, "h": 3600, "m": 60}
+    if value[-1:] in units and value[:-1].isdigit():
+        return time.time() - int(value[:-1]) * units[value[-1]]
+    return datetime.fromisoformat(value).timestamp()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query the catalog of organized files.")
+    parser.add_argument("--db", default=CATALOG_FILE, help="catalog database path")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    q = sub.add_parser("query", help="list placed files")
+    q.add_argument("--category")
+    q.add_argument("--origin", help="folder the files were organized in")
+    q.add_argument("--since", help="e.g. 7d, 12h or 2024-01-01")
+    q.add_argument("--until", help="e.g. 2024-01-31")
+    q.add_argument("--name", help="SQL LIKE pattern, e.g. %%.pdf")
+    q.add_argument("--session")
+    q.add_argument("--limit", type=int, default=100)
+
+    sub.add_parser("stats", help="file count and size per category")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        print(f"No catalog at {args.db}")
+        return 1
+    cat = Catalog(args.db)
+    if args.command == "query":
+        rows = cat.query(category=args.category, origin=args.origin,
+                         since=_parse_time(args.since) if args.since else None,
+                         until=_parse_time(args.until) if args.until else None,
+                         name_like=args.name, session=args.session, limit=args.limit)
+        for r in rows:
+            placed = datetime.fromtimestamp(r["placed_at"]).strftime("%Y-%m-%d %H:%M")
+            print(f"{placed}  {r['category'] or '-':<14} {r['size'] if r['size'] is not None else '?':>12}  {r['path']}")
+        print(f"{len(rows)} file(s).")
+    else:
+        for category, (count, size) in cat.stats().items():
+            print(f"{category or '-':<20} {count:>10} files {size:>16} bytes")
+    cat.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
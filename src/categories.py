@@ -1,5 +1,6 @@
 import os
-import json
+
+from config_store import ConfigStore, valid_categories
 
 DEFAULT_CATEGORIES = {
 	"Applications": [".exe", ".msi"],
@@ -19,22 +20,23 @@ CATEGORY_FILE = os.path.join(CONFIG_DIR, "categories.json")
 class CategoryManager:
     def __init__(self):
         os.makedirs(CONFIG_DIR, exist_ok=True)
+        # debounced atomic writes; a damaged file falls back to categories.json.bak
+        self._store = ConfigStore(CATEGORY_FILE, validate=valid_categories, indent=4)
         self.categories = self._load()
 
     def _load(self):
-        if os.path.exists(CATEGORY_FILE):
-            with open(CATEGORY_FILE, "r", encoding="utf-8") as f:
-                try:
-                    data = json.load(f)
-                    # Python dicts preserve insertion order (Python 3.7+)
-                    return {k: [ext.lower() for ext in v] for k, v in data.items()}
-                except Exception:
-                    return DEFAULT_CATEGORIES.copy()
-        return DEFAULT_CATEGORIES.copy()
+        data = self._store.load()
+        if data is None:
+            return {k: list(v) for k, v in DEFAULT_CATEGORIES.items()}
+        # Python dicts preserve insertion order (Python 3.7+)
+        return {k: [ext.lower() for ext in v] for k, v in data.items()}
 
     def save(self):
-        with open(CATEGORY_FILE, "w", encoding="utf-8") as f:
-            json.dump(self.categories, f, indent=4, ensure_ascii=False)
+        self._store.save(self.categories)
+
+    def flush(self):
+        """Write pending category changes now (otherwise done shortly after the last change)."""
+        self._store.flush()
 
     def get(self):
         return self.categories
@@ -0,0 +1,206 @@
+# config_store.py
+"""
+Crash-safe, debounced JSON config files.
+
+Writes never touch the live file in place: the new content goes to a temporary
+file in the same folder, is fsynced, and then atomically replaces the old file
+with os.replace(). Any number of processes can read the file concurrently and
+always see either the old or the new complete version. After each write the
+same content is also saved as "<file>.bak", the last known-good snapshot.
+
+ConfigStore.save() only records the latest content; a background thread writes
+it once no change has arrived for `delay` seconds, so a burst of edits (drag
+reordering, adding many folders) costs one write; the thread exits once nothing
+is pending. Pending writes of every live store are flushed at interpreter exit,
+and flush() forces one immediately.
+
+ConfigStore.load() validates what it reads. A missing, truncated or invalid file
+falls back to the .bak snapshot before giving up, and a parsed snapshot is
+reused while the file's mtime and size are unchanged.
+"""
+import os
+import copy
+import json
+import time
+import atexit
+import weakref
+import threading
+
+# seconds without further changes before a save is written
+DEFAULT_SAVE_DELAY = 0.5
+BACKUP_SUFFIX = ".bak"
+
+# stores with possibly unsaved changes are flushed at exit; weak, so stores can be dropped
+_live_stores = weakref.WeakSet()
+
+
+def _flush_live_stores():
+    for store in list(_live_stores):
+        store.flush()
+
+
+atexit.register(_flush_live_stores)
+
+
+def atomic_write_json(path, data, indent=4):
+    """
+    Write `data` to `path` as JSON via a temporary file and an atomic rename.
+    """
+    _atomic_write_text(path, json.dumps(data, indent=indent, ensure_ascii=False))
+
+
+def _atomic_write_text(path, text):
+    folder = os.path.dirname(path) or "."
+    os.makedirs(folder, exist_ok=True)
+    tmp = os.path.join(folder, f".{os.path.basename(path)}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def load_json(path, validate=None, default=None, log_func=print):
+    """
+    Read JSON from `path`, falling back to its .bak snapshot if the file is
+    missing, unreadable or rejected by validate(data). Returns `default` if neither works.
+    """
+    for candidate in (path, path + BACKUP_SUFFIX):
+        data = _read_valid(candidate, validate, log_func)
+        if data is not None:
+            if candidate != path and os.path.exists(path):
+                log_func(f"[Config] {path} is damaged; using the last good copy from {candidate}.")
+            return data
+    return default
+
+
+def _read_valid(path, validate, log_func):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        log_func(f"[Config] Could not read {path}: {e}")
+        return None
+    if validate is not None and not validate(data):
+        log_func(f"[Config] Ignoring invalid contents of {path}.")
+        return None
+    return data
+
+
+class ConfigStore:
+    """
+    One JSON config file with validated, cached loads and debounced atomic saves.
+    """
+
+    def __init__(self, path, validate=None, indent=4, delay=DEFAULT_SAVE_DELAY, log_func=print):
+        self.path = path
+        self.validate = validate
+        self.indent = indent
+        self.delay = delay
+        self.log = log_func
+        self._cond = threading.Condition()
+        self._pending = None  # (sequence, serialized content) waiting to be written
+        self._sequence = 0
+        self._due = 0.0
+        self._write_lock = threading.Lock()
+        self._written = 0  # sequence of the newest content on disk
+        self._writer = None
+        self._cache = None  # (stat signature, data)
+        _live_stores.add(self)
+
+    # --- loading ---
+    def _signature(self):
+        try:
+            st = os.stat(self.path)
+            return st.st_mtime_ns, st.st_size
+        except OSError:
+            return None
+
+    def load(self, default=None):
+        """
+        Return a copy of the stored data (or `default`). Unsaved changes are not visible here.
+        """
+        signature = self._signature()
+        if signature is not None and self._cache is not None and self._cache[0] == signature:
+            return copy.deepcopy(self._cache[1])
+        data = load_json(self.path, self.validate, None, self.log)
+        if data is None:
+            return default
+        if signature is not None:
+            self._cache = (signature, data)
+        return copy.deepcopy(data)
+
+    # --- saving ---
+    def save(self, data):
+        """
+        Schedule `data` to be written. It is serialized now, so the caller may keep changing it.
+        """
+        text = json.dumps(data, indent=self.indent, ensure_ascii=False)
+        with self._cond:
+            self._sequence += 1
+            self._pending = (self._sequence, text)
+            self._due = time.monotonic() + self.delay
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._run, daemon=True)
+                self._writer.start()
+            self._cond.notify()
+
+    def flush(self):
+        """
+        Write any pending change now.
+        """
+        with self._cond:
+            pending, self._pending = self._pending, None
+        if pending is not None:
+            self._write(*pending)
+
+    def _run(self):
+        # the thread holds a reference to the store, so it only lives while a save is pending
+        while True:
+            with self._cond:
+                if self._pending is None:
+                    self._writer = None
+                    return
+                while time.monotonic() < self._due:
+                    self._cond.wait(self._due - time.monotonic())
+                    if self._pending is None:
+                        break  # taken by flush()
+                pending, self._pending = self._pending, None
+            if pending is not None:
+                self._write(*pending)
+
+    def _write(self, sequence, text):
+        # flush() and the writer thread may race; never replace newer content with older
+        with self._write_lock:
+            if sequence <= self._written:
+                return
+            try:
+                _atomic_write_text(self.path, text)
+                _atomic_write_text(self.path + BACKUP_SUFFIX, text)
+                self._written = sequence
+            except Exception as e:
+                self.log(f"[Config] Error saving {self.path}: {e}")
+
+
+# --- validators for the app's config files ---
+def valid_categories(data):
+    """
+    {"Category": [".ext", ...], ...}
+    """
+    return isinstance(data, dict) and all(
+        isinstance(name, str) and isinstance(exts, list) and all(isinstance(e, str) for e in exts)
+        for name, exts in data.items())
+
+
+def valid_watched_folders(data):
+    """
+    ["path", {"path": ..., <watcher options>}, ...]
+    """
+    return isinstance(data, list) and all(
+        isinstance(e, str) or (isinstance(e, dict) and isinstance(e.get("path"), str)) for e in data)
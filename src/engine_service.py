@@ -0,0 +1,425 @@
+# engine_service.py
+"""
+Single-instance organizing engine with a local Unix socket API.
+
+The service owns the watchers and the shared catalog, sharding config, I/O
+governor and undo journal. The GUI and the CLI are thin clients, so a second
+app instance or a script no longer starts duplicate observers on the same
+folders.
+
+Protocol: one JSON object per line in each direction.
+    request:  {"cmd": "status"}            {"cmd": "watch", "path": ..., "options": {...}}
+    response: {"ok": true, "result": ...}  {"ok": false, "error": "..."}
+
+Commands: ping, status, watch, unwatch, organize, undo, stats, logs, reload_categories, trace, shutdown.
+
+CLI:
+    python engine_service.py serve
+    python engine_service.py status | stats | undo | logs
+    python engine_service.py watch PATH [--polling] [--batch | --view]
+    python engine_service.py unwatch PATH
+    python engine_service.py organize PATH [--dry-run]
+    python engine_service.py trace [OUT]      # export sampled per-file traces (see tracing.py)
+"""
+import os
+import sys
+import json
+import socket
+import argparse
+import threading
+import socketserver
+from collections import deque
+
+import organizer
+from categories import CONFIG_DIR, CategoryManager
+from config_store import ConfigStore, valid_watched_folders
+from file_watcher import FolderWatcher, DEFAULT_BACKEND, DEFAULT_POLICY, stop_watchers
+from catalog import get_catalog
+from sharding import get_sharding_config
+from io_governor import get_governor
+from journal import get_journal
+from tracing import get_tracer, TRACE_EXPORT_FILE
+from pending_work import get_pending_work
+
+SOCKET_PATH = os.path.join(CONFIG_DIR, "engine.sock")
+WATCHED_FOLDERS_FILE = os.path.join(CONFIG_DIR, "watched_folders.json")
+# log lines kept for clients polling with "logs"
+LOG_BUFFER_SIZE = 2000
+
+
+def supported():
+    """
+    Unix sockets are unavailable on some platforms (e.g. Windows builds of Python);
+    there the GUI and CLI run the engine in-process instead.
+    """
+    return hasattr(socket, "AF_UNIX") and hasattr(socketserver, "ThreadingUnixStreamServer")
+
+
+class EngineService:
+    """
+    Holds the watchers and shared resources; every client request runs through here.
+    """
+
+    def __init__(self, socket_path=SOCKET_PATH, log_func=print):
+        self.socket_path = socket_path
+        self._print = log_func
+        self.cm = CategoryManager()
+        self._folders_store = ConfigStore(WATCHED_FOLDERS_FILE, validate=valid_watched_folders, indent=2,
+                                          log_func=self.log)
+        self.watchers = {}  # path -> FolderWatcher
+        self.options = {}  # path -> {"backend": ..., "policy": ...}
+        self._starting = set()  # paths with a start thread running
+        self._start_gen = {}  # path -> generation of the watch request its start thread must satisfy
+        self._generation = 0
+        self.status = {}  # path -> status text
+        self._lock = threading.RLock()
+        self._logs = deque(maxlen=LOG_BUFFER_SIZE)
+        self._log_seq = 0
+        self._server = None
+
+    # --- logging (buffered for clients) ---
+    def log(self, msg):
+        with self._lock:
+            self._log_seq += 1
+            self._logs.append((self._log_seq, msg))
+        self._print(msg)
+
+    def logs_after(self, seq):
+        with self._lock:
+            return [[s, m] for s, m in self._logs if s > seq]
+
+    # --- watcher management ---
+    def _new_watcher(self, path, options):
+        if not os.path.isdir(path):
+            raise ValueError(f"Cannot watch non-existent folder: {path}")
+        watcher = FolderWatcher(path, log_func=self.log, cm=self.cm,
+                                backend=options.get("backend", DEFAULT_BACKEND), policy=options.get("policy", DEFAULT_POLICY),
+                                catalog=get_catalog(), sharding=get_sharding_config(), governor=get_governor(),
+                                journal=get_journal(), tracer=get_tracer(), pending_work=get_pending_work())
+        watcher.start()
+        return watcher
+
+    def _start(self, path):
+        """
+        Start thread of one path. Only one runs per path: a start superseded by
+        unwatch (and maybe a new watch) meanwhile stops its watcher, then starts
+        again for the newest request, so two observers never share a folder.
+        """
+        while True:
+            with self._lock:
+                generation = self._start_gen.get(path)
+                if generation is None:  # unwatched while starting
+                    self._starting.discard(path)
+                    return
+                options = dict(self.options[path])
+            watcher = error = None
+            try:
+                watcher = self._new_watcher(path, options)
+            except Exception as e:
+                error = e
+            with self._lock:
+                current = self._start_gen.get(path) == generation
+                if current:
+                    del self._start_gen[path]
+                    self._starting.discard(path)
+                    if watcher is not None:
+                        self.watchers[path] = watcher
+                        self.status[path] = "Watching"
+                    else:
+                        self.status[path] = "Failed"
+            if current:
+                if error is not None:
+                    self.log(f"[Error] Failed to start watcher for {path}: {error}")
+                return
+            if watcher is not None:
+                watcher.stop()  # superseded; removes the sentinel before the next start recreates it
+
+    def watch(self, path, options=None, save=True):
+        path = os.path.abspath(path)
+        with self._lock:
+            if path in self.status:
+                return False
+            self.status[path] = "Starting..."
+            self.options[path] = dict(options or {})
+            self._generation += 1
+            self._start_gen[path] = self._generation
+            spawn = path not in self._starting
+            self._starting.add(path)
+        if spawn:
+            # slow or disconnected drives must not block the request
+            threading.Thread(target=self._start, args=(path,), daemon=True).start()
+        if save:
+            self.save_watched_folders()
+        return True
+
+    def unwatch(self, path, save=True):
+        path = os.path.abspath(path)
+        with self._lock:
+            self.status.pop(path, None)
+            self.options.pop(path, None)
+            self._start_gen.pop(path, None)
+            watcher = self.watchers.pop(path, None)
+        if watcher:
+            watcher.stop()
+        if save:
+            self.save_watched_folders()
+        return watcher is not None
+
+    def status_report(self):
+        with self._lock:
+            report = []
+            for path, status in self.status.items():
+                watcher = self.watchers.get(path)
+                if watcher is not None and not watcher.is_running():
+                    status = "Stopped (sentinel removed)"
+                report.append({"path": path, "status": status, "options": self.options.get(path, {})})
+            return report
+
+    def load_watched_folders(self):
+        try:
+            entries = self._folders_store.load(default=[])
+        except Exception as e:
+            self.log(f"Error loading watched folders: {e}")
+            return
+        for entry in entries:
+            if isinstance(entry, dict):
+                self.watch(entry["path"], {k: v for k, v in entry.items() if k != "path"}, save=False)
+            else:
+                self.watch(entry, save=False)
+
+    def save_watched_folders(self):
+        defaults = {"backend": DEFAULT_BACKEND, "policy": DEFAULT_POLICY}
+        with self._lock:
+            entries = []
+            for path in self.status:
+                opts = {k: v for k, v in self.options.get(path, {}).items() if defaults.get(k) != v}
+                entries.append({"path": path, **opts} if opts else path)
+        try:
+            self._folders_store.save(entries)
+        except Exception as e:
+            self.log(f"Error saving watched folders: {e}")
+
+    # --- one-off jobs ---
+    def organize(self, path, selected_categories=None, dry_run=False, mode="move"):
+        categories = self.cm.get()
+        threading.Thread(target=organizer.organize_folder,
+                         args=(os.path.abspath(path), categories, selected_categories, self.log, None, dry_run),
+                         kwargs={"catalog": get_catalog(), "sharding": get_sharding_config(), "governor": get_governor(),
+                                 "journal": get_journal(), "mode": mode},
+                         daemon=True).start()
+        return True
+
+    def undo(self):
+        threading.Thread(target=organizer.undo_last_organization,
+                         kwargs={"log_func": self.log, "catalog": get_catalog(), "journal": get_journal()},
+                         daemon=True).start()
+        return True
+
+    def stats(self):
+        with self._lock:
+            watchers = {path: {"processing": len(w.handler._processing), "queued": len(w.handler._queued)}
+                        for path, w in self.watchers.items()}
+        return {"watchers": watchers, "undo_moves": len(organizer._last_moves),
+                "catalog": {cat: list(v) for cat, v in get_catalog().stats().items()}}
+
+    def reload_categories(self):
+        # watchers hold a reference to self.cm, so reloading in place updates them all
+        self.cm.categories = self.cm._load()
+        return True
+
+    # --- request dispatch ---
+    def handle(self, request):
+        cmd = request.get("cmd")
+        if cmd == "ping":
+            return "pong"
+        if cmd == "status":
+            return self.status_report()
+        if cmd == "watch":
+            return self.watch(request["path"], request.get("options"))
+        if cmd == "unwatch":
+            return self.unwatch(request["path"])
+        if cmd == "organize":
+            return self.organize(request["path"], request.get("categories"), bool(request.get("dry_run")),
+                                 request.get("mode", "move"))
+        if cmd == "undo":
+            return self.undo()
+        if cmd == "stats":
+            return self.stats()
+        if cmd == "logs":
+            return self.logs_after(int(request.get("after", 0)))
+        if cmd == "reload_categories":
+            return self.reload_categories()
+        if cmd == "trace":
+            path = os.path.abspath(request.get("out") or TRACE_EXPORT_FILE)
+            return {"path": path, "traces": get_tracer().export(path)}
+        if cmd == "shutdown":
+            threading.Thread(target=self.shutdown, daemon=True).start()
+            return True
+        raise ValueError(f"Unknown command: {cmd}")
+
+    # --- server lifecycle ---
+    def serve(self):
+        """
+        Bind the socket and serve until shutdown. Raises RuntimeError if another
+        engine already owns the socket or the platform has no Unix sockets.
+        """
+        if not supported():
+            raise RuntimeError("Unix sockets are not supported on this platform.")
+        os.makedirs(os.path.dirname(self.socket_path) or ".", exist_ok=True)
+        if os.path.exists(self.socket_path):
+            if EngineClient(self.socket_path).is_running():
+                raise RuntimeError(f"Engine already running on {self.socket_path}")
+            os.remove(self.socket_path)  # stale socket from a crashed engine
+
+        service = self
+
+        class _Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    try:
+                        response = {"ok": True, "result": service.handle(json.loads(line))}
+                    except Exception as e:
+                        response = {"ok": False, "error": str(e)}
+                    self.wfile.write((json.dumps(response) + "\n").encode("utf-8"))
+                    self.wfile.flush()
+
+        self._server = socketserver.ThreadingUnixStreamServer(self.socket_path, _Handler)
+        self._server.daemon_threads = True
+        self.load_watched_folders()
+        self.log(f"[Engine] Listening on {self.socket_path}")
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            try:
+                os.remove(self.socket_path)
+            except OSError:
+                pass
+
+    def shutdown(self):
+        self.log("[Engine] Shutting down... stopping watchers.")
+        with self._lock:
+            watchers = list(self.watchers.values())
+            self.watchers.clear()
+            self._start_gen.clear()  # starts still running stop their watcher when they finish
+            self.status.clear()
+            self.options.clear()
+        # in parallel under one deadline; unfinished files are checkpointed for the next start
+        stop_watchers(watchers, log_func=self.log)
+        get_pending_work().flush()
+        self._folders_store.flush()
+        self.cm.flush()
+        get_catalog().close()
+        if get_tracer().enabled():
+            get_tracer().export()
+        if self._server is not None:
+            self._server.shutdown()
+
+
+class EngineClient:
+    """
+    Connects to a running EngineService. Each call opens a short-lived connection.
+    """
+
+    def __init__(self, socket_path=SOCKET_PATH, timeout=5.0):
+        self.socket_path = socket_path
+        self.timeout = timeout
+
+    def call(self, cmd, **args):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+            sock.sendall((json.dumps({"cmd": cmd, **args}) + "\n").encode("utf-8"))
+            with sock.makefile("rb") as f:
+                response = json.loads(f.readline())
+        if not response.get("ok"):
+            raise RuntimeError(response.get("error", "engine error"))
+        return response.get("result")
+
+    def is_running(self):
+        if not supported() or not os.path.exists(self.socket_path):
+            return False
+        try:
+            return self.call("ping") == "pong"
+        except (OSError, ValueError, RuntimeError):
+            return False
+
+
+def connect_if_running(socket_path=SOCKET_PATH):
+    """
+    Return an EngineClient if an engine is serving on socket_path, else None
+    (always None where Unix sockets are unsupported).
+    """
+    if not supported():
+        return None
+    client = EngineClient(socket_path)
+    return client if client.is_running() else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="File organizer engine service.")
+    parser.add_argument("--socket", default=SOCKET_PATH)
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("serve", help="run the engine in the foreground")
+    for name in ("status", "stats", "undo", "logs", "shutdown"):
+        sub.add_parser(name)
+    p_watch = sub.add_parser("watch")
+    p_watch.add_argument("path")
+    p_watch.add_argument("--polling", action="store_true", help="use the polling backend (network shares)")
+    watch_policy = p_watch.add_mutually_exclusive_group()
+    watch_policy.add_argument("--batch", action="store_true", help="use the batch flush policy")
+    watch_policy.add_argument("--view", action="store_true", help="link files into a category view instead of moving them")
+    p_unwatch = sub.add_parser("unwatch")
+    p_unwatch.add_argument("path")
+    p_org = sub.add_parser("organize")
+    p_org.add_argument("path")
+    p_org.add_argument("--dry-run", action="store_true")
+    p_org.add_argument("--view", action="store_true", help="build a view of links instead of moving files")
+    p_trace = sub.add_parser("trace", help="export sampled per-file traces as Chrome trace JSON")
+    p_trace.add_argument("out", nargs="?", help=f"output file (default: {TRACE_EXPORT_FILE} next to the engine)")
+    args = parser.parse_args(argv)
+
+    if not supported():
+        print("Unix sockets are not supported on this platform.")
+        return 1
+
+    if args.command == "serve":
+        try:
+            EngineService(args.socket).serve()
+        except RuntimeError as e:
+            print(e)
+            return 1
+        return 0
+
+    client = EngineClient(args.socket)
+    if not client.is_running():
+        print(f"No engine running on {args.socket}. Start one with: python engine_service.py serve")
+        return 1
+    if args.command == "watch":
+        options = {}
+        if args.polling:
+            options["backend"] = "polling"
+        if args.batch:
+            options["policy"] = "batch"
+        if args.view:
+            options["policy"] = "view"
+        result = client.call("watch", path=args.path, options=options)
+    elif args.command in ("unwatch", "organize"):
+        extra = {"dry_run": args.dry_run, "mode": "view" if args.view else "move"} if args.command == "organize" else {}
+        result = client.call(args.command, path=args.path, **extra)
+    elif args.command == "logs":
+        result = [m for _, m in client.call("logs", after=0)]
+    elif args.command == "trace":
+        result = client.call("trace", out=os.path.abspath(args.out) if args.out else None)
+    else:
+        result = client.call(args.command)
+
+    if isinstance(result, list) and args.command == "logs":
+        print("\n".join(result))
+    else:
+        print(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,13 +2,21 @@
 import os
 import time
 import threading
-import shutil
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 
 # optional: import CategoryManager and organizer to reuse logic
 from categories import CategoryManager
 import organizer  # used to append to organizer._last_moves for undo, if available
+import readiness
+from readiness import DEFAULT_READINESS
+from adaptive_stability import StabilityTracker, get_stats_store
+from polling_observer import ScandirPollingObserver
+from catalog import new_session_id
+from sharding import category_destination
+from io_governor import throttle, PRIORITY_LIVE
+from tracing import NO_TRACE
+from views import get_view
 
 # Name of the sentinel file (exact filename placed into watched folder)
 SENTINEL_FILENAME = "AUTO-ORGANIZER-WATCH - This folder is under watch of auto organizer (delete this to stop auto organization).txt"
@@ -22,6 +30,57 @@ DEFAULT_STABLE_CHECK_INTERVAL = 1.0
 DEFAULT_STABLE_CHECKS = 3
 # maximum wait (seconds) before giving up on stability
 DEFAULT_STABILITY_TIMEOUT = 30.0
+# quiet period (seconds) an event burst for one path must settle for before it is dispatched
+DEFAULT_DEBOUNCE_WINDOW = 0.5
+
+# how a FolderWatcher learns about new files:
+#   "native"  - watchdog's Observer (inotify / ReadDirectoryChangesW / FSEvents)
+#   "polling" - ScandirPollingObserver, for network shares where native events are unreliable
+WATCHER_BACKENDS = ("native", "polling")
+DEFAULT_BACKEND = "native"
+
+# when ready files are moved:
+#   "immediate" - each file as soon as it is stable
+#   "batch"     - collected and flushed through organizer.organize_files every
+#                 batch_interval seconds or every batch_size files
+#   "view"      - not moved at all: linked into category folders under view_root
+#                 (see views.py), and unlinked again when deleted or renamed away
+WATCHER_POLICIES = ("immediate", "batch", "view")
+DEFAULT_POLICY = "immediate"
+DEFAULT_BATCH_INTERVAL = 30.0
+DEFAULT_BATCH_SIZE = 500
+
+# overall time (seconds) stop_watchers() gives all watchers to shut down
+DEFAULT_SHUTDOWN_TIMEOUT = 10.0
+# watchers stopped concurrently by stop_watchers()
+SHUTDOWN_WORKERS = 32
+
+
+def default_backend_for(folder_path):
+    """
+    Suggest a backend for folder_path: UNC paths (\\\\server\\share) are network shares.
+    """
+    if folder_path.startswith("\\\\") or folder_path.startswith("//"):
+        return "polling"
+    return DEFAULT_BACKEND
+
+
+def _make_observer(backend):
+    if backend == "native":
+        return Observer()
+    if backend == "polling":
+        return ScandirPollingObserver()
+    raise ValueError(f"Unknown watcher backend: {backend}")
+
+
+def _pause(seconds, stop_event=None):
+    """
+    Sleep between stability checks. Returns True (early) if stop_event gets set.
+    """
+    if stop_event is None:
+        time.sleep(seconds)
+        return False
+    return stop_event.wait(seconds)
 
 
 def _resolve_duplicate(dest_path):
@@ -54,10 +113,14 @@ def _is_partial(filename):
     return False
 
 
-def _wait_for_stable_file(path, check_interval=DEFAULT_STABLE_CHECK_INTERVAL, stable_checks=DEFAULT_STABLE_CHECKS, timeout=DEFAULT_STABILITY_TIMEOUT, log_func=print):
+def _wait_for_stable_file(path, check_interval=DEFAULT_STABLE_CHECK_INTERVAL, stable_checks=DEFAULT_STABLE_CHECKS, timeout=DEFAULT_STABILITY_TIMEOUT, log_func=print,
+                          readiness_checks=(), stop_event=None):
     """
     Wait until the file size remains identical for `stable_checks` consecutive checks,
     checking every `check_interval` seconds, but give up after `timeout` seconds.
+    readiness_checks (see readiness.py) are consulted on every check; while one of
+    them sees a writer the file does not count as stable.
+    Setting stop_event ends the wait early.
     Returns True if stable, False otherwise.
     """
     start = time.time()
@@ -74,8 +137,11 @@ def _wait_for_stable_file(path, check_interval=DEFAULT_STABLE_CHECK_INTERVAL, st
             log_func(f"[Watcher] Error accessing file {path} while waiting for stability: {e}")
             return False
 
+        # an open writer keeps the file unsettled even if its size holds still
+        busy = readiness.is_busy(path, readiness_checks)
+
         # if size unchanged since last check
-        if size == last_size:
+        if size == last_size and not busy:
             stable_count += 1
         else:
             stable_count = 0
@@ -88,7 +154,169 @@ def _wait_for_stable_file(path, check_interval=DEFAULT_STABLE_CHECK_INTERVAL, st
             log_func(f"[Watcher] Timed out waiting for file stability: {path}")
             return False
 
-        time.sleep(check_interval)
+        if _pause(check_interval, stop_event):
+            return False
+
+
+def _wait_for_stable_file_adaptive(path, tracker: StabilityTracker, log_func=print, readiness_checks=(), stop_event=None):
+    """
+    Like _wait_for_stable_file, but the polling interval and timeout come from
+    `tracker` (see adaptive_stability.py): polls back off while the file grows and
+    the timeout only counts time without growth.
+    Returns True if stable, False otherwise.
+    """
+    while True:
+        try:
+            if not os.path.exists(path):
+                log_func(f"[Watcher] File disappeared while waiting: {path}")
+                return False
+            size = os.path.getsize(path)
+        except Exception as e:
+            log_func(f"[Watcher] Error accessing file {path} while waiting for stability: {e}")
+            return False
+
+        # an open writer keeps the file unsettled even if its size holds still
+        busy = readiness.is_busy(path, readiness_checks)
+
+        verdict, delay = tracker.observe(size, time.monotonic(), busy=busy)
+        if verdict == "stable":
+            return True
+        if verdict == "timeout":
+            log_func(f"[Watcher] Timed out waiting for file stability: {path}")
+            return False
+        if _pause(delay, stop_event):
+            return False
+
+
+class _Debouncer:
+    """
+    Collapses bursts of events for the same path into a single callback.
+    Each submit() pushes the path's deadline `window` seconds into the future; the
+    callback fires once the path has been quiet for the whole window.
+    A single background thread serves every pending path.
+    """
+
+    def __init__(self, window, callback):
+        self.window = window
+        self.callback = callback
+        self._deadlines = {}  # path -> monotonic deadline
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopped = False
+
+    def submit(self, path, window=None):
+        with self._cond:
+            self._deadlines[path] = time.monotonic() + (self.window if window is None else window)
+            if self._thread is None or not self._thread.is_alive():
+                self._stopped = False
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def touch(self, path):
+        """
+        Extend the window for a path only if it is already pending.
+        """
+        with self._cond:
+            if path in self._deadlines:
+                self._deadlines[path] = time.monotonic() + self.window
+                self._cond.notify()
+
+    def cancel(self, path):
+        with self._cond:
+            return self._deadlines.pop(path, None) is not None
+
+    def pending(self):
+        with self._cond:
+            return list(self._deadlines)
+
+    def stop(self):
+        """
+        Stop the thread. Returns the paths that were still waiting for their quiet window.
+        """
+        with self._cond:
+            self._stopped = True
+            pending = list(self._deadlines)
+            self._deadlines.clear()
+            self._cond.notify()
+        return pending
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if self._stopped:
+                    return
+                now = time.monotonic()
+                due = [p for p, d in self._deadlines.items() if d <= now]
+                for p in due:
+                    del self._deadlines[p]
+                if not due:
+                    if self._deadlines:
+                        self._cond.wait(min(self._deadlines.values()) - now)
+                    else:
+                        self._cond.wait()
+                    continue
+            for p in due:
+                self.callback(p)
+
+
+class _BatchCollector:
+    """
+    Collects ready files and hands them to `flush_func` in one list, every
+    `interval` seconds or as soon as `size` files are waiting.
+    """
+
+    def __init__(self, interval, size, flush_func):
+        self.interval = interval
+        self.size = size
+        self.flush_func = flush_func
+        self._items = []
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def add(self, item):
+        with self._lock:
+            self._items.append(item)
+            full = len(self._items) >= self.size
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+        if full:
+            self.flush()
+
+    def pending(self):
+        with self._lock:
+            return len(self._items)
+
+    def flush(self):
+        with self._lock:
+            items, self._items = self._items, []
+        if items:
+            self.flush_func(items)
+
+    def stop(self, flush=True):
+        """
+        Stop the timer. Queued items are flushed, or with flush=False returned unprocessed.
+        """
+        self._stopped.set()
+        if flush:
+            self.flush()
+            return []
+        with self._lock:
+            items, self._items = self._items, []
+        return items
+
+    def join(self, timeout=None):
+        """
+        Wait for a flush that is already running on the timer thread.
+        """
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self.flush()
 
 
 class _WatchHandler(FileSystemEventHandler):
@@ -97,7 +325,11 @@ class _WatchHandler(FileSystemEventHandler):
     """
 
     def __init__(self, folder_path, category_manager: CategoryManager, log_func=print,
-                 stable_checks=DEFAULT_STABLE_CHECKS, check_interval=DEFAULT_STABLE_CHECK_INTERVAL, stability_timeout=DEFAULT_STABILITY_TIMEOUT):
+                 stable_checks=DEFAULT_STABLE_CHECKS, check_interval=DEFAULT_STABLE_CHECK_INTERVAL, stability_timeout=DEFAULT_STABILITY_TIMEOUT,
+                 debounce_window=DEFAULT_DEBOUNCE_WINDOW, readiness_checks=DEFAULT_READINESS,
+                 adaptive=True, stats_store=None, catalog=None, sharding=None, governor=None,
+                 journal=None, policy=DEFAULT_POLICY, batch_interval=DEFAULT_BATCH_INTERVAL, batch_size=DEFAULT_BATCH_SIZE,
+                 tracer=None, view_root=None):
         super().__init__()
         self.folder_path = os.path.abspath(folder_path)
         self.cm = category_manager # Use the passed-in CM
@@ -106,6 +338,35 @@ class _WatchHandler(FileSystemEventHandler):
         self.stable_checks = stable_checks
         self.check_interval = check_interval
         self.stability_timeout = stability_timeout
+        # debounce_window <= 0 dispatches every event immediately (old behaviour)
+        self.debounce_window = debounce_window
+        self._debouncer = _Debouncer(debounce_window, self._dispatch) if debounce_window > 0 else None
+        self.readiness_checks = readiness.resolve_checks(readiness_checks)
+        # paths whose last event was a rename into place; renames are atomic, so the
+        # writer finished before the file got its final name and no wait is needed
+        self._arrived_complete = set()
+        # adaptive=True learns polling interval/timeout per folder instead of the fixed values
+        self.adaptive = adaptive
+        self.stats_store = (stats_store or get_stats_store()) if adaptive else None
+        # optional catalog.Catalog; one session per handler lifetime
+        self.catalog = catalog
+        self.session = new_session_id("watch")
+        self.sharding = sharding  # optional sharding.ShardingConfig
+        self.governor = governor  # optional io_governor.IOGovernor; watcher moves are live priority
+        self.journal = journal  # optional journal.MoveJournal
+        if policy not in WATCHER_POLICIES:
+            raise ValueError(f"Unknown watcher policy: {policy}")
+        self.policy = policy
+        self._batcher = _BatchCollector(batch_interval, batch_size, self._flush_batch) if policy == "batch" else None
+        self._queued = set()  # paths waiting in the batch
+        self._view = get_view(self.folder_path, view_root, log_func=self.log) if policy == "view" else None
+        # optional tracing.Tracer; kept only when sampling is on, so the off case costs nothing
+        self.tracer = tracer if tracer is not None and tracer.enabled() else None
+        # set by stop(): stability waits end early and files not yet moving are left alone
+        self._stop_event = threading.Event()
+        self._workers = set()  # threads running _process_new_file
+        self._workers_lock = threading.Lock()
+        self._interrupted = []  # paths left unfinished because of stop()
 
         # set of folder names that are category targets (so we can ignore events inside them)
         self._category_folder_names = set(self.cm.get().keys())
@@ -121,89 +382,356 @@ class _WatchHandler(FileSystemEventHandler):
             return True
         return False
 
-    def _process_new_file(self, src_path):
+    def _should_process(self, src_path):
         """
-        Move a single file into its category folder (if any category matches).
-        This is intentionally conservative and only touches the single file.
+        Cheap filters applied before waiting on a file: sentinel, location, partial names.
+        Returns True if the file is a candidate for organization.
         """
-        # normalize
-        src_path = os.path.abspath(src_path)
-
         # ignore sentinel file itself
         if os.path.basename(src_path) == SENTINEL_FILENAME:
-            return
+            return False
 
         # ignore files outside the watched folder
         if not os.path.commonpath([self.folder_path, src_path]) == self.folder_path:
-            return
+            return False
 
         # ignore directories
         if not os.path.isfile(src_path):
-            return
+            return False
 
         # ignore files that are already inside category folders
         if self._is_inside_category_folder(src_path):
-            return
+            return False
 
         filename = os.path.basename(src_path)
         if _is_partial(filename):
             self.log(f"[Watcher] Ignoring partial/temp file (by extension): {filename}")
+            return False
+        return True
+
+    def _category_for(self, src_path):
+        """
+        Return the category name for src_path, or None if no category applies.
+        """
+        filename = os.path.basename(src_path)
+        # determine extension
+        ext = os.path.splitext(filename)[1].lower()
+        if not ext:
+            # guess extension via mimetypes fallback (optional)
+            import mimetypes
+            guessed = mimetypes.guess_extension(mimetypes.guess_type(src_path)[0] or "")
+            if guessed:
+                ext = guessed.lower()
+
+        # find category
+        category = self.cm.find_category_for_ext(ext)
+        if not category:
+            # fallback to "Others" if present
+            if "Others" in self.cm.get():
+                category = "Others"
+            else:
+                self.log(f"[Watcher] No category for extension '{ext}' (file: {filename}); skipping.")
+                return None
+        return category
+
+    def _move_to_category(self, src_path, category):
+        """
+        Move src_path into its category folder and record the move for undo.
+        Blocking; callers decide which thread this runs on. Returns True if moved.
+        """
+        filename = os.path.basename(src_path)
+        trace = self._trace(src_path)
+        # prepare destination
+        with trace.span("destination") as info:
+            dest_dir = category_destination(self.folder_path, category, filename, src_path, self.sharding)
+            os.makedirs(dest_dir, exist_ok=True)
+            dest = os.path.join(dest_dir, filename)
+            dest = _resolve_duplicate(dest)
+            info["dest"] = dest
+
+        # move file
+        try:
+            with trace.span("throttle"):
+                throttle(self.governor, self.folder_path, src_path, dest_dir, PRIORITY_LIVE)
+            with trace.span("move"):
+                if self.journal is not None:
+                    self.journal.intend([(dest, src_path)], self.session)
+                while True:
+                    try:
+                        organizer._move_no_replace(src_path, dest)
+                        break
+                    except FileExistsError:
+                        # another file took the name since it was picked
+                        dest = _resolve_duplicate(os.path.join(dest_dir, filename))
+                        if self.journal is not None:
+                            self.journal.intend([(dest, src_path)], self.session)
+            self.log(f"[Auto] {filename} → {category}")
+            # record move in organizer._last_moves (if module available)
+            try:
+                organizer._last_moves.append((dest, src_path))
+            except Exception:
+                # ignore–undo will not be available if organizer not present
+                pass
+            if self.catalog is not None:
+                self.catalog.record(dest, category, self.folder_path, self.session)
+            if self.journal is not None:
+                self.journal.append_batch([(dest, src_path)], self.session)
+            return True
+        except Exception as e:
+            self.log(f"[Watcher] Error moving file {filename}: {e}")
+            return False
+
+    def _place(self, src_path, category):
+        """
+        Move a ready file now, or queue it for the next batch flush.
+        Returns True/False for an immediate move, None if queued.
+        """
+        if self._view is not None:
+            return self._link_in_view(src_path, category)
+        if self._batcher is None:
+            return self._move_to_category(src_path, category)
+        if self._stop_event.is_set():
+            # the batch has already been flushed or checkpointed
+            self._interrupted.append(src_path)
+            return False
+        self._queued.add(src_path)
+        self._batcher.add((src_path, category))
+        return None
+
+    def _link_in_view(self, src_path, category):
+        """
+        View policy: leave the file in place and link it into its category folder.
+        """
+        filename = os.path.basename(src_path)
+        try:
+            with self._trace(src_path).span("link") as info:
+                info["link"] = self._view.link(src_path, category)
+            self.log(f"[View] {filename} → {category}")
+            return True
+        except Exception as e:
+            self.log(f"[Watcher] Error linking file {filename}: {e}")
+            return False
+
+    def rebuild_view(self):
+        """
+        Bring the view up to date with changes made while nothing was watching.
+        """
+        try:
+            self._view.rebuild(self.cm.get(), log_func=lambda m: self.log(f"[View] {m}"))
+        except Exception as e:
+            self.log(f"[Watcher] Error rebuilding view of {self.folder_path}: {e}")
+
+    def _flush_batch(self, items):
+        """
+        Move a batch of ready files through the bulk organizer path.
+        """
+        queued = [src for src, _ in items]
+        items = [(src, cat) for src, cat in items if os.path.exists(src)]
+        flush_start = time.perf_counter()
+        for src, _ in items:
+            self._trace(src).gap("batch_queue")
+        try:
+            if not items:
+                return
+            moves = organizer.organize_files(self.folder_path, [(os.path.basename(src), cat) for src, cat in items],
+                                             log_func=lambda m: self.log(f"[Batch] {m}"), catalog=self.catalog,
+                                             sharding=self.sharding, governor=self.governor, priority=PRIORITY_LIVE,
+                                             journal=self.journal, session=self.session)
+            organizer._last_moves.extend(moves)
+            self.log(f"[Batch] Flushed {len(moves)} file(s) in {self.folder_path}")
+        except Exception as e:
+            self.log(f"[Watcher] Error flushing batch: {e}")
+        finally:
+            # every queued path, including files deleted while they waited: a new file
+            # under the same name must not be taken for one already queued
+            for src in queued:
+                self._queued.discard(src)
+            for src, _ in items:
+                self._trace(src).add("batch_flush", flush_start, size=len(items))
+                self._trace_finish(src, "moved (batch)")
+
+    def _process_new_file(self, src_path):
+        """
+        Move a single file into its category folder (if any category matches).
+        This is intentionally conservative and only touches the single file.
+        """
+        # normalize
+        src_path = os.path.abspath(src_path)
+        trace = self._trace(src_path)
+        trace.gap("debounce")
+        arrived_complete = self._take_arrived_complete(src_path)
+        with trace.span("filter") as info:
+            info["accepted"] = accepted = self._should_process(src_path)
+        if not accepted:
+            self._trace_finish(src_path, "filtered")
             return
 
         # avoid double-processing same file
-        if src_path in self._processing:
+        if src_path in self._processing or src_path in self._queued:
             return
 
+        filename = os.path.basename(src_path)
         # mark as processing
         self._processing.add(src_path)
+        outcome = "error"
         try:
-            # wait until the file is stable (not changing in size)
-            stable = _wait_for_stable_file(src_path, check_interval=self.check_interval,
-                                           stable_checks=self.stable_checks, timeout=self.stability_timeout, log_func=self.log)
+            # wait until the file is stable (not changing in size), unless it is clearly complete
+            with trace.span("readiness") as info:
+                info["ready"] = ready = self._ready_now(src_path, arrived_complete)
+            if ready:
+                stable = True
+            else:
+                with trace.span("stability_wait") as info:
+                    info["stable"] = stable = self._wait_for_stable(src_path)
+            if self._stop_event.is_set():
+                # shutting down: not moved yet, so leave it for the next start
+                outcome = "interrupted"
+                self._interrupted.append(src_path)
+                return
             if not stable:
+                outcome = "unstable"
                 self.log(f"[Watcher] Skipping unstable file: {filename}")
                 return
 
-            # determine extension
-            ext = os.path.splitext(filename)[1].lower()
-            if not ext:
-                # guess extension via mimetypes fallback (optional)
-                import mimetypes
-                guessed = mimetypes.guess_extension(mimetypes.guess_type(src_path)[0] or "")
-                if guessed:
-                    ext = guessed.lower()
-
-            # find category
-            category = self.cm.find_category_for_ext(ext)
+            with trace.span("classify") as info:
+                info["category"] = category = self._category_for(src_path)
             if not category:
-                # fallback to "Others" if present
-                if "Others" in self.cm.get():
-                    category = "Others"
-                else:
-                    self.log(f"[Watcher] No category for extension '{ext}' (file: {filename}); skipping.")
-                    return
-
-            # prepare destination
-            dest_dir = os.path.join(self.folder_path, category)
-            os.makedirs(dest_dir, exist_ok=True)
-            dest = os.path.join(dest_dir, filename)
-            dest = _resolve_duplicate(dest)
-
-            # move file
-            try:
-                shutil.move(src_path, dest)
-                self.log(f"[Auto] {filename} → {category}")
-                # record move in organizer._last_moves (if module available)
-                try:
-                    organizer._last_moves.append((dest, src_path))
-                except Exception:
-                    # ignore–undo will not be available if organizer not present
-                    pass
-            except Exception as e:
-                self.log(f"[Watcher] Error moving file {filename}: {e}")
+                outcome = "no category"
+                return
+            placed = self._place(src_path, category)
+            outcome = None if placed is None else ("moved" if placed else "move failed")
         finally:
             # unmark processing (use discard to be safe)
             self._processing.discard(src_path)
+            if outcome is not None:
+                self._trace_finish(src_path, outcome)
+
+    def _ready_now(self, src_path, arrived_complete=False):
+        """
+        True if src_path can be moved without a stability wait: it was renamed into
+        place from a finished name and no readiness check sees a writer on it.
+        """
+        return arrived_complete and not readiness.is_busy(src_path, self.readiness_checks)
+
+    def _new_tracker(self):
+        return StabilityTracker(self.stats_store.for_folder(self.folder_path), self.check_interval,
+                                self.stable_checks, self.stability_timeout)
+
+    def _record_write(self, src_path, tracker):
+        try:
+            self.stats_store.record(self.folder_path, os.path.getsize(src_path), tracker.write_duration())
+        except OSError:
+            pass
+
+    def _wait_for_stable(self, src_path):
+        if not self.adaptive:
+            return _wait_for_stable_file(src_path, check_interval=self.check_interval,
+                                         stable_checks=self.stable_checks, timeout=self.stability_timeout, log_func=self.log,
+                                         readiness_checks=self.readiness_checks, stop_event=self._stop_event)
+        tracker = self._new_tracker()
+        stable = _wait_for_stable_file_adaptive(src_path, tracker, log_func=self.log, readiness_checks=self.readiness_checks,
+                                                stop_event=self._stop_event)
+        if stable:
+            self._record_write(src_path, tracker)
+        return stable
+
+    # --- Tracing ---
+    def _trace(self, path):
+        return self.tracer.get(path) if self.tracer is not None else NO_TRACE
+
+    def _trace_event(self, path, kind, renamed_from=None):
+        # first event of a file starts its trace (if sampled); a rename carries it over
+        if self.tracer is None:
+            return
+        if renamed_from is None or not self.tracer.rename(renamed_from, path):
+            self.tracer.begin(path, self.folder_path)
+        self.tracer.get(path).add("event", time.perf_counter(), kind=kind)
+
+    def _trace_finish(self, path, outcome):
+        if self.tracer is not None:
+            self.tracer.finish(path, outcome)
+
+    def _take_arrived_complete(self, src_path):
+        if src_path in self._arrived_complete:
+            self._arrived_complete.discard(src_path)
+            return True
+        return False
+
+    # --- Event coalescing ---
+    def _dispatch(self, path):
+        """
+        Hand a settled path to a worker thread (so we can wait for stability).
+        """
+        if self._stop_event.is_set():
+            self._interrupted.append(path)
+            return
+        worker = threading.Thread(target=self._run_worker, args=(path,), daemon=True)
+        with self._workers_lock:
+            self._workers.add(worker)
+        worker.start()
+
+    def _run_worker(self, path):
+        try:
+            self._process_new_file(path)
+        finally:
+            with self._workers_lock:
+                self._workers.discard(threading.current_thread())
+
+    def _submit(self, path, immediate=False):
+        """
+        A path may have become ready. With debouncing, repeated events within the
+        window collapse into one dispatch; immediate=True skips the quiet window.
+        """
+        path = os.path.abspath(path)
+        if self._debouncer is None or self._stop_event.is_set():
+            self._dispatch(path)
+        else:
+            self._debouncer.submit(path, window=0 if immediate else None)
+
+    def _touch(self, path):
+        # a write to a pending path restarts its quiet window
+        if self._debouncer is not None:
+            self._debouncer.touch(os.path.abspath(path))
+
+    def _cancel(self, path):
+        # the path was renamed away or deleted before it settled
+        if self._debouncer is not None:
+            self._debouncer.cancel(os.path.abspath(path))
+
+    def stop(self, deadline=None):
+        """
+        Stop processing: stability waits end early and files not moving yet are left in place.
+        With a deadline (a time.monotonic() value) this is a shutdown: the batch is not
+        flushed, moves already under way get until the deadline to finish, and the paths
+        left unfinished are returned so they can be checkpointed for the next start.
+        """
+        self._stop_event.set()
+        unfinished = []
+        if self._debouncer is not None:
+            unfinished.extend(self._debouncer.stop())
+        if self._batcher is not None:
+            if deadline is None:
+                self._batcher.stop()
+            else:
+                unfinished.extend(src for src, _ in self._batcher.stop(flush=False))
+                self._queued.clear()
+                self._batcher.join(max(0.0, deadline - time.monotonic()))
+        if deadline is not None:
+            with self._workers_lock:
+                workers = list(self._workers)
+            for worker in workers:
+                worker.join(max(0.0, deadline - time.monotonic()))
+            # interrupted waits, plus moves still running past the deadline
+            unfinished.extend(self._interrupted)
+            unfinished.extend(self._processing)
+        self._interrupted = []
+        if self._view is not None:
+            self._view.flush()
+        if self.stats_store is not None:
+            self.stats_store.save()
+        if self.tracer is not None:
+            self.tracer.discard_folder(self.folder_path)
+        return list(dict.fromkeys(unfinished))
 
     # event callbacks
     def on_created(self, event):
@@ -214,18 +742,46 @@ class _WatchHandler(FileSystemEventHandler):
         # if sentinel file was removed we shouldn't be here (observer stops), but we still check
         if os.path.basename(path) == SENTINEL_FILENAME:
             return
-        # spawn a short-lived thread to not block the handler (so we can wait for stability)
-        threading.Thread(target=self._process_new_file, args=(path,), daemon=True).start()
+        self._arrived_complete.discard(os.path.abspath(path))
+        self._trace_event(os.path.abspath(path), "created")
+        self._submit(path)
+
+    def on_modified(self, event):
+        if event.is_directory:
+            return
+        # written to after arriving: no longer known to be complete
+        self._arrived_complete.discard(os.path.abspath(event.src_path))
+        self._touch(event.src_path)
+
+    def on_deleted(self, event):
+        if event.is_directory:
+            return
+        self._arrived_complete.discard(os.path.abspath(event.src_path))
+        self._cancel(event.src_path)
+        self._trace_finish(os.path.abspath(event.src_path), "deleted")
+        if self._view is not None:
+            self._view.unlink(event.src_path)
 
     def on_moved(self, event):
-        # handle files moved into watched folder
+        # handle files moved into watched folder; a rename chain
+        # (foo.crdownload -> foo.pdf) collapses into a single event for the final name
         if event.is_directory:
             return
+        self._cancel(event.src_path)
+        if self._view is not None:
+            self._view.unlink(event.src_path)
         dest_path = event.dest_path
         # if sentinel file was moved in/out, ignore
         if os.path.basename(dest_path) == SENTINEL_FILENAME:
             return
-        threading.Thread(target=self._process_new_file, args=(dest_path,), daemon=True).start()
+        if _is_partial(os.path.basename(event.src_path)):
+            # finished download/temp file: the writer may still be flushing it
+            self._arrived_complete.discard(os.path.abspath(dest_path))
+        else:
+            # renamed from a finished name (e.g. an atomic save): complete on arrival
+            self._arrived_complete.add(os.path.abspath(dest_path))
+        self._trace_event(os.path.abspath(dest_path), "moved", renamed_from=os.path.abspath(event.src_path))
+        self._submit(dest_path, immediate=True)
 
 
 class FolderWatcher:
@@ -238,15 +794,36 @@ class FolderWatcher:
     def __init__(self, folder_path, log_func=print, cm: CategoryManager = None, 
                  stable_checks=DEFAULT_STABLE_CHECKS,
                  check_interval=DEFAULT_STABLE_CHECK_INTERVAL, 
-                 stability_timeout=DEFAULT_STABILITY_TIMEOUT):
+                 stability_timeout=DEFAULT_STABILITY_TIMEOUT,
+                 debounce_window=DEFAULT_DEBOUNCE_WINDOW,
+                 readiness_checks=DEFAULT_READINESS,
+                 adaptive=True,
+                 backend=DEFAULT_BACKEND,
+                 catalog=None,
+                 sharding=None,
+                 governor=None,
+                 journal=None,
+                 policy=DEFAULT_POLICY,
+                 batch_interval=DEFAULT_BATCH_INTERVAL,
+                 batch_size=DEFAULT_BATCH_SIZE,
+                 tracer=None,
+                 pending_work=None,
+                 view_root=None):
         
         self.folder_path = os.path.abspath(folder_path)
         self.log = log_func
         # Use the passed-in CategoryManager, or create a default one if not provided
         self.cm = cm if cm is not None else CategoryManager()
         self.handler = _WatchHandler(self.folder_path, self.cm, log_func=self.log,
-                                     stable_checks=stable_checks, check_interval=check_interval, stability_timeout=stability_timeout)
-        self.observer = Observer()
+                                     stable_checks=stable_checks, check_interval=check_interval, stability_timeout=stability_timeout,
+                                     debounce_window=debounce_window, readiness_checks=readiness_checks,
+                                     adaptive=adaptive, catalog=catalog, sharding=sharding,
+                                     governor=governor, journal=journal, policy=policy,
+                                     batch_interval=batch_interval, batch_size=batch_size, tracer=tracer,
+                                     view_root=view_root)
+        self.backend = backend
+        self.observer = _make_observer(backend)
+        self.pending_work = pending_work  # optional pending_work.PendingWork: checkpoint across restarts
         self._thread = None
         self._running = False
 
@@ -276,6 +853,21 @@ class FolderWatcher:
         self._thread = threading.Thread(target=self._monitor_sentinel, daemon=True)
         self._thread.start()
         self.log(f"[Watcher] Started watching: {self.folder_path}")
+        if self.handler._view is not None:
+            threading.Thread(target=self.handler.rebuild_view, daemon=True).start()
+        self._resume_pending()
+
+    def _resume_pending(self):
+        """
+        Re-submit files that were still queued when the last shutdown checkpointed them.
+        """
+        if self.pending_work is None:
+            return
+        resumed = self.pending_work.take(self.folder_path)
+        if resumed:
+            self.log(f"[Watcher] Resuming {len(resumed)} file(s) left over from the last shutdown.")
+            for path in resumed:
+                self.handler._submit(path)
 
     def _monitor_sentinel(self):
         """
@@ -290,15 +882,27 @@ class FolderWatcher:
                 break
             time.sleep(1)
 
-    def stop(self):
+    def stop(self, deadline=None):
+        """
+        Stop watching. deadline (a time.monotonic() value) marks a shutdown: see
+        _WatchHandler.stop(). Unfinished files are saved to pending_work, if set.
+        """
         if not self._running:
             return
         self._running = False
         try:
-            self.observer.stop()
-            self.observer.join(timeout=5)
+            self.observer.stop()  # no new events; joined below
+        except Exception:
+            pass
+        unfinished = self.handler.stop(deadline)
+        try:
+            timeout = 5 if deadline is None else min(5, max(0.0, deadline - time.monotonic()))
+            self.observer.join(timeout=timeout)
         except Exception:
             pass
+        if unfinished and self.pending_work is not None:
+            self.pending_work.add(self.folder_path, unfinished)
+            self.log(f"[Watcher] Saved {len(unfinished)} unfinished file(s) to resume on next start.")
 
         # --- NEW: Delete sentinel file on stop ---
         try:
@@ -314,3 +918,47 @@ class FolderWatcher:
 
     def is_running(self):
         return self._running
+
+
+def stop_watchers(watchers, timeout=DEFAULT_SHUTDOWN_TIMEOUT, log_func=print):
+    """
+    Stop many FolderWatchers in parallel under one overall deadline, `timeout`
+    seconds from now. Each watcher gets the same deadline for its in-flight moves
+    and checkpoints whatever is left. Stopper threads are daemons, so a watcher
+    stuck on an unreachable drive cannot hold up the process after the deadline.
+    Returns the folders whose watcher had not finished stopping in time.
+    """
+    watchers = list(watchers)
+    if not watchers:
+        return []
+    deadline = time.monotonic() + timeout
+    remaining = list(watchers)
+    stopped = set()  # indexes into watchers
+    lock = threading.Lock()
+
+    def stopper():
+        while True:
+            with lock:
+                if not remaining:
+                    return
+                index = len(remaining) - 1
+                watcher = remaining.pop()
+            try:
+                watcher.stop(deadline)
+            except Exception as e:
+                log_func(f"[Watcher] Error stopping {watcher.folder_path}: {e}")
+            with lock:
+                stopped.add(index)
+
+    threads = [threading.Thread(target=stopper, daemon=True, name="watcher-stop")
+               for _ in range(min(len(watchers), SHUTDOWN_WORKERS))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        # small grace period past the deadline for sentinel removal and logging
+        t.join(max(0.0, deadline - time.monotonic()) + 1.0)
+    with lock:
+        late = [w.folder_path for i, w in enumerate(watchers) if i not in stopped]
+    if late:
+        log_func(f"[Watcher] {len(late)} watcher(s) did not stop within {timeout:.0f}s: {', '.join(late)}")
+    return late
@@ -1,6 +1,5 @@
 import os
 import sys
-import json
 import tkinter as tk
 from tkinter import filedialog, messagebox
 import ttkbootstrap as ttk
@@ -9,21 +8,43 @@ from ttkbootstrap.constants import *
 # --- IMPORTS for Tray, Startup, and Threading ---
 import queue
 import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
 from PIL import Image, ImageTk # Requires 'Pillow'
 import pystray # Requires 'pystray'
 import winshell # Requires 'winshell'
-from file_watcher import FolderWatcher
+from file_watcher import FolderWatcher, DEFAULT_BACKEND, DEFAULT_POLICY, default_backend_for, stop_watchers
 
 from categories import CategoryManager
+from config_store import ConfigStore, valid_watched_folders
 from organizer import organize_folder, undo_last_organization
+from catalog import get_catalog
+from sharding import get_sharding_config
+from io_governor import get_governor
+from journal import get_journal
+from tracing import get_tracer
+from pending_work import get_pending_work
+from virtual_list import VirtualList
+from engine_service import connect_if_running
 
 # --- NEW GLOBALS & CONFIG ---
 CONFIG_DIR = "config"
 WATCHED_FOLDERS_FILE = os.path.join(CONFIG_DIR, "watched_folders.json")
 STARTUP_SHORTCUT_NAME = "File Organizer.lnk"
+# seconds before a folder that is still starting is reported as timed out
+WATCHER_START_TIMEOUT = 10.0
+# watchers brought up concurrently (slow network drives each hold one)
+WATCHER_START_WORKERS = 8
+# seconds quitting waits for watchers that are still starting, so they are stopped with the rest
+WATCHER_QUIT_START_WAIT = 2.0
 
 # Global state
 global_watchers = {}  # Holds {path: FolderWatcher}
+watcher_status = {}  # Holds {path: status text} for every configured folder, running or not
+watcher_options = {}  # Holds {path: {"backend": ..., "policy": ...}} per-folder watcher settings
+DEFAULT_WATCHER_OPTIONS = {"backend": DEFAULT_BACKEND, "policy": DEFAULT_POLICY}
+pending_starts = {}  # Holds {path: (Future, start time)} for watchers still starting
+watcher_start_executor = None
 log_queue = queue.Queue()
 tray_icon_thread = None
 app_is_quitting = False
@@ -65,6 +86,10 @@ def create_main_window():
         """Puts a log message onto the queue from any thread."""
         log_queue.put(msg)
 
+    # written by a background thread, so errors go through the log queue
+    watched_folders_store = ConfigStore(WATCHED_FOLDERS_FILE, validate=valid_watched_folders, indent=2,
+                                        log_func=thread_safe_log_func)
+
     def process_log_queue():
         """Polls the queue and updates the GUI log."""
         try:
@@ -78,46 +103,246 @@ def create_main_window():
             root.after(100, process_log_queue)
     # --- END LOGGING ---
 
+    # --- ENGINE SERVICE (optional) ---
+    # If an engine service is running (python engine_service.py serve), the GUI is a
+    # thin client: watchers, organize and undo run in the service, and
+    # watcher_status/watcher_options mirror its state. Otherwise everything runs in-process,
+    # as it always does where the engine's Unix sockets are unsupported (Windows).
+    engine = connect_if_running()
+
+    def engine_call(cmd, **args):
+        try:
+            return engine.call(cmd, **args)
+        except Exception as e:
+            log_func(f"[Engine] Request '{cmd}' failed: {e}")
+            return None
+
+    engine_log_seq = 0
+
+    def sync_from_engine():
+        """Polls the engine for watcher states and new log lines on a worker thread."""
+        if engine is None or app_is_quitting:
+            return
+        client, after = engine, engine_log_seq
+
+        def fetch():
+            # socket round-trips stay off the Tk thread; results are applied there
+            try:
+                result = (client.call("status"), client.call("logs", after=after)), None
+            except Exception as e:
+                result = None, e
+            try:
+                root.after(0, apply_engine_sync, client, *result)
+            except RuntimeError:
+                pass  # main loop already gone
+
+        threading.Thread(target=fetch, daemon=True, name="engine-sync").start()
+
+    def apply_engine_sync(client, fetched, error):
+        """Runs on the Tk thread with the results of one sync_from_engine() poll."""
+        nonlocal engine, engine_log_seq
+        if client is not engine or app_is_quitting:
+            return
+        if error is not None:
+            # engine went away: take over the watchers in-process
+            log_func(f"[Engine] Lost connection ({error}). Running watchers in the app instead.")
+            engine = None
+            folders = {p: watcher_options.get(p) for p in watcher_status}
+            watcher_status.clear()
+            watcher_options.clear()
+            for path, options in folders.items():
+                start_watcher(path, options)
+            return
+        report, lines = fetched
+        watcher_status.clear()
+        watcher_options.clear()
+        for entry in report:
+            watcher_status[entry["path"]] = entry["status"]
+            watcher_options[entry["path"]] = entry["options"]
+        for seq, msg in lines:
+            engine_log_seq = seq
+            log_queue.put(msg)
+        root.after(1000, sync_from_engine)
+
+    def notify_categories_changed():
+        if engine is not None:
+            cm.flush()  # the engine re-reads categories.json
+            engine_call("reload_categories")
+
     # --- WATCHER MANAGEMENT ---
-    def start_watcher(folder_path):
-        if folder_path in global_watchers:
+    # Watchers are created and started on a background pool so slow or disconnected
+    # drives never block the UI. Only the main thread touches global_watchers and
+    # watcher_status; poll_watcher_startup() applies finished starts.
+    def _create_watcher(folder_path, options, superseded=None):
+        """Runs on a startup worker thread. superseded: Event set once an older watcher of the folder is stopped."""
+        if superseded is not None:
+            # stopping the old watcher removes the sentinel; it must not take the new one with it
+            superseded.wait()
+        if not os.path.isdir(folder_path):
+            raise ValueError(f"Cannot watch non-existent folder: {folder_path}")
+        # Pass the REAL category manager and the thread-safe logger
+        watcher = FolderWatcher(folder_path, log_func=thread_safe_log_func, cm=cm,
+                                backend=options.get("backend", DEFAULT_BACKEND), policy=options.get("policy", DEFAULT_POLICY),
+                                catalog=get_catalog(), sharding=get_sharding_config(), governor=get_governor(),
+                                journal=get_journal(), tracer=get_tracer(), pending_work=get_pending_work())
+        watcher.start()
+        return watcher
+
+    def start_watcher(folder_path, options=None):
+        global watcher_start_executor
+        if folder_path in watcher_status:
             log_func(f"[Info] Watcher for {folder_path} is already running.")
             return
-        if not os.path.isdir(folder_path):
-            log_func(f"[Error] Cannot watch non-existent folder: {folder_path}")
+        if options is None:
+            options = {"backend": default_backend_for(folder_path)}
+        if engine is not None:
+            watcher_status[folder_path] = "Starting..."
+            watcher_options[folder_path] = dict(options)
+            engine_call("watch", path=folder_path, options=options)
             return
-        
+        if watcher_start_executor is None:
+            watcher_start_executor = ThreadPoolExecutor(max_workers=WATCHER_START_WORKERS, thread_name_prefix="watcher-start")
+        watcher_status[folder_path] = "Starting..."
+        watcher_options[folder_path] = dict(options)
+        superseded = None
+        previous = pending_starts.get(folder_path)
+        if previous is not None and not previous[0].cancel():
+            # stopped and re-started (e.g. an option change) while the old start still runs
+            superseded = _stop_when_started(previous[0])
+        was_idle = not pending_starts
+        pending_starts[folder_path] = (watcher_start_executor.submit(_create_watcher, folder_path, watcher_options[folder_path],
+                                                                     superseded), time.monotonic())
+        if was_idle:
+            root.after(100, poll_watcher_startup)
+
+    def poll_watcher_startup():
+        now = time.monotonic()
+        for path, (future, started_at) in list(pending_starts.items()):
+            if future.done():
+                del pending_starts[path]
+                try:
+                    watcher = future.result()
+                except Exception as e:
+                    if path in watcher_status:
+                        watcher_status[path] = "Failed"
+                    thread_safe_log_func(f"[Error] Failed to start watcher for {path}: {e}")
+                    continue
+                if path not in watcher_status or app_is_quitting:
+                    # removed (or quitting) while it was starting
+                    threading.Thread(target=watcher.stop, daemon=True).start()
+                    continue
+                global_watchers[path] = watcher
+                watcher_status[path] = "Watching"
+                thread_safe_log_func(f"[Watcher] Started watching: {path}")
+            elif now - started_at > WATCHER_START_TIMEOUT and watcher_status.get(path) == "Starting...":
+                watcher_status[path] = "Timed out (still trying)"
+                thread_safe_log_func(f"[Watcher] Still waiting for {path} after {WATCHER_START_TIMEOUT:.0f}s (slow or disconnected drive?)")
+        if pending_starts and not app_is_quitting:
+            root.after(200, poll_watcher_startup)
+
+    def _stop_started_watcher(future):
+        """Done-callback for starts still running at quit: stop the watcher once it is up."""
         try:
-            # Pass the REAL category manager and the thread-safe logger
-            watcher = FolderWatcher(folder_path, log_func=thread_safe_log_func, cm=cm)
-            watcher.start()
-            global_watchers[folder_path] = watcher
-            thread_safe_log_func(f"[Watcher] Started watching: {folder_path}")
-        except Exception as e:
-            thread_safe_log_func(f"[Error] Failed to start watcher for {folder_path}: {e}")
+            watcher = future.result()
+        except Exception:
+            return  # never started, nothing to stop
+        watcher.stop()
+
+    def _stop_when_started(future):
+        """
+        Stop the watcher of a start that was replaced by a newer one, once it is up.
+        Returns an Event set when that watcher is stopped (or never started).
+        """
+        stopped = threading.Event()
+
+        def stop_in_background(f):
+            def run():
+                try:
+                    _stop_started_watcher(f)
+                finally:
+                    stopped.set()
+            threading.Thread(target=run, daemon=True).start()
+
+        future.add_done_callback(stop_in_background)
+        return stopped
+
+    def take_pending_starts():
+        """
+        On quit: cancel starts that have not begun and wait briefly for the rest.
+        Returns the watchers that came up in time; later ones stop themselves as they finish.
+        """
+        starting = [future for future, _ in pending_starts.values() if not future.cancel()]
+        pending_starts.clear()
+        if watcher_start_executor is not None:
+            watcher_start_executor.shutdown(wait=False)
+        finished, late = wait(starting, timeout=WATCHER_QUIT_START_WAIT)
+        for future in late:
+            future.add_done_callback(_stop_started_watcher)
+        return [future.result() for future in finished if future.exception() is None]
+
+    def folder_status(path):
+        watcher = global_watchers.get(path)
+        if watcher is not None and not watcher.is_running():
+            return "Stopped (sentinel removed)"
+        if watcher is not None:
+            # live counter of files being waited on or queued for a batch
+            in_progress = len(watcher.handler._processing) + len(watcher.handler._queued)
+            if in_progress:
+                return f"{watcher_status.get(path, '')} ({in_progress} in progress)"
+        return watcher_status.get(path, "")
 
     def stop_watcher(folder_path):
+        watcher_status.pop(folder_path, None)
+        watcher_options.pop(folder_path, None)
+        if engine is not None:
+            engine_call("unwatch", path=folder_path)
+            return
         watcher = global_watchers.pop(folder_path, None)
         if watcher:
             watcher.stop()
             thread_safe_log_func(f"[Watcher] Stopped watching: {folder_path}")
     
     def load_watched_folders():
+        if engine is not None:
+            log_func("Connected to the engine service. Watchers run in the service.")
+            sync_from_engine()
+            return
         try:
-            with open(WATCHED_FOLDERS_FILE, 'r') as f:
-                folders = json.load(f)
-            log_func(f"Loaded {len(folders)} watched folder(s) from config.")
-            for folder in folders:
-                start_watcher(folder)
-        except FileNotFoundError:
-            log_func("No watched folder config found. Starting fresh.")
+            folders = watched_folders_store.load()
+            if folders is None:
+                log_func("No watched folder config found. Starting fresh.")
+                return
+            log_func(f"Loaded {len(folders)} watched folder(s) from config. Starting watchers in the background...")
+            for entry in folders:
+                # entries are a plain path, or {"path": ..., <options>} for non-default settings
+                if isinstance(entry, dict):
+                    options = {k: v for k, v in entry.items() if k != "path"}
+                    start_watcher(entry["path"], options)
+                else:
+                    start_watcher(entry)
         except Exception as e:
             log_func(f"Error loading watched folders: {e}")
             
+    def _config_entry(path):
+        options = {k: v for k, v in watcher_options.get(path, {}).items() if DEFAULT_WATCHER_OPTIONS.get(k) != v}
+        if not options:
+            return path  # keep the simple format for folders on default settings
+        return {"path": path, **options}
+
+    def set_watcher_option(folder_path, key, value):
+        """Restart a folder's watcher with one setting changed (e.g. backend="polling", policy="batch")."""
+        options = dict(watcher_options.get(folder_path, {}))
+        options[key] = value
+        stop_watcher(folder_path)
+        start_watcher(folder_path, options)
+        save_watched_folders()
+
     def save_watched_folders():
+        if engine is not None:
+            return  # the engine keeps its own watched folder config
         try:
-            with open(WATCHED_FOLDERS_FILE, 'w') as f:
-                json.dump(list(global_watchers.keys()), f, indent=2)
+            # every configured folder, including ones still starting; written in the background
+            watched_folders_store.save([_config_entry(p) for p in watcher_status])
         except Exception as e:
             log_func(f"Error saving watched folders: {e}")
 
@@ -125,7 +350,7 @@ def create_main_window():
     def open_watcher_manager_window(cm): # Now accepts CategoryManager
         win = ttk.Toplevel(root)
         win.title("Manage Auto-Organization")
-        win.geometry("750x450") # Made wider for buttons
+        win.geometry("810x450") # Made wider for buttons
         win.resizable(False, True)
         win.grab_set()
 
@@ -138,12 +363,23 @@ def create_main_window():
             # Get all categories
             all_categories_dict = cm.get()
             all_category_names = list(all_categories_dict.keys())
+            # folders watched with the view policy get their view rebuilt instead
+            mode = "view" if watcher_options.get(folder_path, {}).get("policy") == "view" else "move"
             
+            if engine is not None:
+                engine_call("organize", path=folder_path, categories=all_category_names, mode=mode)
+                messagebox.showinfo("Organization Started",
+                                    "Manual organization has started in the engine service.\nCheck the Activity Log for progress.",
+                                    parent=win)
+                return
+
             # Run the existing organizer.py function in a background thread
             # We pass the thread_safe_log_func and 'None' for progress
             org_thread = threading.Thread(
                 target=organize_folder,
                 args=(folder_path, all_categories_dict, all_category_names, thread_safe_log_func, None, False),
+                kwargs={"catalog": get_catalog(), "sharding": get_sharding_config(), "governor": get_governor(),
+                        "journal": get_journal(), "mode": mode},
                 daemon=True
             )
             org_thread.start()
@@ -161,66 +397,79 @@ def create_main_window():
         
         ttk.Separator(win, orient="horizontal").pack(fill="x", padx=10)
 
-        # --- Custom list area (replaces Listbox) ---
-        list_frame = ttk.Frame(win)
-        list_frame.pack(fill="both", expand=True, padx=10, pady=(5, 10))
-
-        list_canvas = tk.Canvas(list_frame, borderwidth=0, highlightthickness=0)
-        scrollbar = ttk.Scrollbar(list_frame, orient="vertical", command=list_canvas.yview)
-        inner_frame = ttk.Frame(list_canvas) # This frame holds the rows
-
-        inner_frame.bind(
-            "<Configure>",
-            lambda e: list_canvas.configure(scrollregion=list_canvas.bbox("all"), width=e.width)
-        )
-        
-        list_canvas.create_window((0, 0), window=inner_frame, anchor="nw")
-        list_canvas.configure(yscrollcommand=scrollbar.set)
-
-        list_canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
-        
-        # --- Functions to manage the custom list ---
-        
-        def rebuild_folder_list():
-            # Clear old widgets
-            for widget in inner_frame.winfo_children():
-                widget.destroy()
-            
-            # Add header
-            ttk.Label(inner_frame, text="Watched Folder Path", font=("-weight bold")).grid(row=0, column=0, sticky="w", padx=10, pady=5)
-            ttk.Label(inner_frame, text="Actions", font=("-weight bold")).grid(row=0, column=1, columnspan=2, sticky="w", padx=10, pady=5)
-            
-            # Add a row for each watched folder
-            row_index = 1
-            if not global_watchers:
-                ttk.Label(inner_frame, text="No folders are being watched.", bootstyle="secondary").grid(row=1, column=0, padx=10, pady=10)
-                
-            for path in global_watchers.keys():
-                # The folder path label
-                path_label = ttk.Label(inner_frame, text=path, wraplength=450, justify="left")
-                path_label.grid(row=row_index, column=0, sticky="w", padx=10, pady=8)
-                
-                # "Organize Now" button
-                org_button = ttk.Button(inner_frame, text="Organize Now", 
-                                        command=lambda p=path: run_manual_org(p), 
-                                        bootstyle="primary-outline", width=12)
-                org_button.grid(row=row_index, column=1, sticky="e", padx=5)
-                
-                # "Remove" button
-                remove_button = ttk.Button(inner_frame, text="Remove Watch", 
-                                           command=lambda p=path: remove_folder(p), 
-                                           bootstyle="danger-outline", width=12)
-                remove_button.grid(row=row_index, column=2, sticky="e", padx=10)
-                
-                row_index += 1
+        # --- Column header (stays put while the list scrolls) ---
+        header = ttk.Frame(win)
+        header.pack(fill="x", padx=10, pady=(5, 0))
+        ttk.Label(header, text="Watched Folder Path", font=("-weight bold"), width=34).grid(row=0, column=0, sticky="w", padx=10, pady=5)
+        ttk.Label(header, text="Status", font=("-weight bold"), width=22).grid(row=0, column=1, sticky="w", padx=5, pady=5)
+        ttk.Label(header, text="Polling", font=("-weight bold")).grid(row=0, column=2, sticky="w", padx=5, pady=5)
+        ttk.Label(header, text="Batch", font=("-weight bold")).grid(row=0, column=3, sticky="w", padx=5, pady=5)
+        ttk.Label(header, text="View", font=("-weight bold")).grid(row=0, column=4, sticky="w", padx=5, pady=5)
+        ttk.Label(header, text="Actions", font=("-weight bold")).grid(row=0, column=5, columnspan=2, sticky="w", padx=10, pady=5)
+
+        # --- Virtualized list: only the visible rows exist as widgets ---
+        def create_folder_row(parent):
+            row = ttk.Frame(parent)
+            # The folder path label
+            row.path_label = ttk.Label(row, width=34, wraplength=240, justify="left")
+            row.path_label.grid(row=0, column=0, sticky="w", padx=10)
+            # Live status (updated by refresh_statuses)
+            row.status_label = ttk.Label(row, width=22)
+            row.status_label.grid(row=0, column=1, sticky="w", padx=5)
+            # Polling backend toggle (for network shares)
+            row.poll_var = tk.BooleanVar()
+            ttk.Checkbutton(row, variable=row.poll_var,
+                            command=lambda: set_watcher_option(row.key, "backend", "polling" if row.poll_var.get() else "native")
+                            ).grid(row=0, column=2, padx=(12, 20))
+            # Batch policy toggle (collect files and move them in periodic flushes)
+            row.batch_var = tk.BooleanVar()
+            ttk.Checkbutton(row, variable=row.batch_var,
+                            command=lambda: set_watcher_option(row.key, "policy", "batch" if row.batch_var.get() else "immediate")
+                            ).grid(row=0, column=3, padx=(8, 16))
+            # View policy toggle (link files into FOLDER/_Views instead of moving them)
+            row.view_var = tk.BooleanVar()
+            ttk.Checkbutton(row, variable=row.view_var,
+                            command=lambda: set_watcher_option(row.key, "policy", "view" if row.view_var.get() else "immediate")
+                            ).grid(row=0, column=4, padx=(4, 16))
+            # "Organize Now" and "Remove" buttons
+            ttk.Button(row, text="Organize Now", command=lambda: run_manual_org(row.key),
+                       bootstyle="primary-outline", width=12).grid(row=0, column=5, sticky="e", padx=5)
+            ttk.Button(row, text="Remove Watch", command=lambda: remove_folder(row.key),
+                       bootstyle="danger-outline", width=12).grid(row=0, column=6, sticky="e", padx=10)
+            return row
+
+        def bind_folder_row(row, path, index):
+            options = watcher_options.get(path, {})
+            row.path_label.config(text=path)
+            row.status_label.config(text=folder_status(path))
+            row.poll_var.set(options.get("backend") == "polling")
+            row.batch_var.set(options.get("policy") == "batch")
+            row.view_var.set(options.get("policy") == "view")
+
+        folder_list = VirtualList(win, row_height=44, create_row=create_folder_row, bind_row=bind_folder_row,
+                                  empty_text="No folders are being watched.")
+        folder_list.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+
+        def refresh_statuses():
+            """Sync the list with watcher_status and update visible status labels in place."""
+            if not win.winfo_exists():
+                return
+            if folder_list.keys != list(watcher_status):
+                folder_list.set_keys(watcher_status)
+            for path in folder_list.visible_keys():
+                label = folder_list.row_for(path).status_label
+                text = folder_status(path)
+                if label.cget("text") != text:
+                    label.config(text=text)
+            win.after(500, refresh_statuses)
         
         def add_folder():
             folder = filedialog.askdirectory(parent=win)
-            if folder and folder not in global_watchers:
+            if folder and folder not in watcher_status:
                 start_watcher(folder)
                 save_watched_folders()
-                rebuild_folder_list() # Update UI
+                folder_list.set_keys(watcher_status) # Update UI
+                folder_list.see(len(folder_list.keys) - 1)
             elif folder:
                 messagebox.showwarning("Already Watching", "That folder is already being watched.", parent=win)
                 
@@ -228,10 +477,11 @@ def create_main_window():
             if messagebox.askyesno("Confirm Removal", f"Stop watching this folder?\n\n{path_to_remove}", parent=win):
                 stop_watcher(path_to_remove) # This also deletes the sentinel
                 save_watched_folders()
-                rebuild_folder_list() # Update UI
+                folder_list.set_keys(watcher_status) # Update UI
 
         # Initial load
-        rebuild_folder_list()
+        folder_list.set_keys(watcher_status)
+        refresh_statuses()
     
     
     # --- Category Checkbox Refresh ---
@@ -252,6 +502,7 @@ def create_main_window():
     def open_categories_window():
         win = ttk.Toplevel(root)
         win.title("Manage Categories")
+        win.geometry("900x520")
         win.resizable(False, True) 
         win.grab_set()
 
@@ -271,53 +522,90 @@ def create_main_window():
         ttk.Label(hdr, text="Extensions", width=hdr_widths[3], anchor="w", font=("Segoe UI", 9, "bold")).grid(row=0, column=3, sticky="w")
         ttk.Label(hdr, text="Actions", width=hdr_widths[4], anchor="w", font=("Segoe UI", 9, "bold")).grid(row=0, column=4, sticky="w")
 
-        rows_frame = ttk.Frame(win)
-        rows_frame.pack(fill="both", expand=True, padx=8, pady=6)
-        list_canvas = tk.Canvas(rows_frame)
-        scrollbar = ttk.Scrollbar(rows_frame, orient="vertical", command=list_canvas.yview)
-        inner = ttk.Frame(list_canvas) 
-        inner.bind("<Configure>", lambda e: list_canvas.configure(scrollregion=list_canvas.bbox("all")))
-        list_canvas.create_window((0, 0), window=inner, anchor="nw")
-        list_canvas.configure(yscrollcommand=scrollbar.set)
-        list_canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
-        
-        drop_indicator = ttk.Separator(inner, orient="horizontal")
-
-        row_vars = {}
-        row_widgets = {}
+        row_vars = {}  # category -> selection BooleanVar, kept for every category (visible or not)
+        NEW_KEY = "__new__"  # list key of a category being created
+        editing = {"key": None}  # list key being edited inline, plus its sel/name/ext variables
+
+        def selection_var(cat_name):
+            if cat_name not in row_vars:
+                row_vars[cat_name] = tk.BooleanVar(value=category_vars[cat_name].get() if cat_name in category_vars else True)
+            return row_vars[cat_name]
+
+        def category_keys():
+            keys = list(cm.get())
+            if editing["key"] == NEW_KEY:
+                keys.append(NEW_KEY)
+            return keys
+
+        # --- Virtualized rows: only the visible rows exist; each shows a category or its edit form ---
+        def create_category_row(parent):
+            row = ttk.Frame(parent)
+            row.handle = ttk.Label(row, text="☰", cursor="hand2", width=hdr_widths[0])
+            row.handle.grid(row=0, column=0, sticky="w", padx=(4, 6))
+            row.handle.bind("<Button-1>", lambda e: on_drag_start(e, row.key))
+            row.handle.bind("<B1-Motion>", on_drag_motion)
+            row.handle.bind("<ButtonRelease-1>", on_drag_end)
+            row.chk = ttk.Checkbutton(row, width=hdr_widths[1] - 2)
+            row.chk.grid(row=0, column=1, sticky="w", padx=4)
+
+            row.lbl_name = ttk.Label(row, anchor="w", width=hdr_widths[2])
+            row.lbl_exts = ttk.Label(row, anchor="w", width=hdr_widths[3], justify="left")
+            row.view_btns = ttk.Frame(row)
+            ttk.Button(row.view_btns, text="Edit", command=lambda: switch_to_edit(row.key), width=6, bootstyle="info-outline").pack(side="left", padx=2)
+            ttk.Button(row.view_btns, text="Delete", command=lambda: delete_category_confirm(row.key), width=6, bootstyle="danger-outline").pack(side="left", padx=2)
+
+            row.ent_name = ttk.Entry(row, width=hdr_widths[2] + 2)
+            row.ent_exts = ttk.Entry(row, width=hdr_widths[3] + 2)
+            row.edit_btns = ttk.Frame(row)
+            ttk.Button(row.edit_btns, text="Save", command=lambda: save_edit(), width=6, bootstyle="success").pack(side="left", padx=2)
+            ttk.Button(row.edit_btns, text="Cancel", command=lambda: cancel_edit(), width=6, bootstyle="secondary").pack(side="left", padx=2)
+            return row
+
+        def bind_category_row(row, cat_name, index):
+            if cat_name == editing["key"]:
+                row.handle.config(cursor="arrow")
+                row.chk.config(variable=editing["sel_var"])
+                row.ent_name.config(textvariable=editing["name_var"])
+                row.ent_exts.config(textvariable=editing["ext_var"])
+                shown, hidden = (row.ent_name, row.ent_exts, row.edit_btns), (row.lbl_name, row.lbl_exts, row.view_btns)
+            else:
+                row.handle.config(cursor="hand2")
+                row.chk.config(variable=selection_var(cat_name))
+                row.lbl_name.config(text=cat_name)
+                row.lbl_exts.config(text=", ".join(cm.get().get(cat_name, [])))
+                shown, hidden = (row.lbl_name, row.lbl_exts, row.view_btns), (row.ent_name, row.ent_exts, row.edit_btns)
+            for widget in hidden:
+                widget.grid_remove()
+            for column, widget in enumerate(shown, start=2):
+                widget.grid(row=0, column=column, sticky="w", padx=2)
+
+        category_list = VirtualList(win, row_height=36, create_row=create_category_row, bind_row=bind_category_row)
+        category_list.pack(fill="both", expand=True, padx=8, pady=6)
+
+        def show_categories():
+            category_list.set_keys(category_keys())
+            category_list.refresh()
 
         def on_drag_start(event, cat_name):
+            if cat_name is None or cat_name == editing["key"]:
+                return
             drag_data['category'] = cat_name
-            drag_data['start_row'] = row_widgets[cat_name]['row']
+            drag_data['start_row'] = category_list.keys.index(cat_name)
             drag_data['widget'] = event.widget
             event.widget.config(cursor="fleur") # Use standard cursor
 
         def on_drag_motion(event):
             if 'category' not in drag_data: return
-            mouse_y_root = event.y_root
-            target_row = -1
-            current_rows = sorted(row_widgets.values(), key=lambda w: w['row'])
-            
-            for row_data in current_rows:
-                handle = row_data['handle']
-                row_y_root = handle.winfo_rooty()
-                row_height = handle.winfo_height()
-                row_midpoint = row_y_root + (row_height / 2)
-                if mouse_y_root < row_midpoint:
-                    target_row = row_data['row']
-                    break
-            
-            if target_row == -1: target_row = len(current_rows)
-            
-            drop_indicator.grid_forget()
-            drop_indicator.grid(row=target_row, column=0, columnspan=5, sticky="we", pady=0)
+            # scroll when dragging near the edges, then mark the gap under the pointer
+            category_list.autoscroll(event.y_root)
+            target_row = category_list.index_at(event.y_root)
+            category_list.show_drop_line(target_row)
             drag_data['drop_target_row'] = target_row
 
         def on_drag_end(event):
             if 'widget' in drag_data:
                 drag_data['widget'].config(cursor="hand2")
-            drop_indicator.grid_forget()
+            category_list.hide_drop_line()
             cat_to_move = drag_data.get('category')
             target_row = drag_data.get('drop_target_row')
             start_row = drag_data.get('start_row')
@@ -329,88 +617,73 @@ def create_main_window():
                     final_index -= 1
                 
                 cm.reorder(cat_to_move, final_index)
+                notify_categories_changed()
                 refresh_categories_ui()
-                rebuild_rows()
-
-        def rebuild_rows():
-            drop_indicator.grid_forget()
-            for w in inner.winfo_children():
-                if w != drop_indicator: w.destroy()
-            row_vars.clear(); row_widgets.clear()
-            cats = cm.get(); r = 0
-            for cat, exts in cats.items(): add_row(cat, exts, r); r += 1
-
-        def add_row(cat_name, exts_list, row_index):
-            handle = ttk.Label(inner, text="☰", cursor="hand2")
-            handle.grid(row=row_index, column=0, sticky="w", padx=(4, 6))
-            handle.bind("<Button-1>", lambda e, c=cat_name: on_drag_start(e, c))
-            handle.bind("<B1-Motion>", on_drag_motion)
-            handle.bind("<ButtonRelease-1>", on_drag_end)
-
-            v = tk.BooleanVar(value=category_vars.get(cat_name, tk.BooleanVar(value=True)).get())
-            chk = ttk.Checkbutton(inner, variable=v)
-            chk.grid(row=row_index, column=1, sticky="w", padx=4, pady=6)
-            lbl_name = ttk.Label(inner, text=cat_name, anchor="w", width=hdr_widths[2])
-            lbl_name.grid(row=row_index, column=2, sticky="w")
-            lbl_exts = ttk.Label(inner, text=", ".join(exts_list), anchor="w", width=hdr_widths[3], justify="left")
-            lbl_exts.grid(row=row_index, column=3, sticky="w")
-            btn_frame = ttk.Frame(inner)
-            btn_frame.grid(row=row_index, column=4, sticky="w")
-            btn_edit = ttk.Button(btn_frame, text="Edit", command=lambda c=cat_name: switch_to_edit(c), width=6, bootstyle="info-outline")
-            btn_edit.pack(side="left", padx=2)
-            btn_delete = ttk.Button(btn_frame, text="Delete", command=lambda c=cat_name: delete_category_confirm(c), width=6, bootstyle="danger-outline")
-            btn_delete.pack(side="left", padx=2)
-            row_vars[cat_name] = v
-            row_widgets[cat_name] = {"handle": handle, "chk": chk, "lbl_name": lbl_name, "lbl_exts": lbl_exts, "btn_edit": btn_edit, "btn_delete": btn_delete, "row": row_index}
-
-        def switch_to_edit(cat_name, creating_new=False):
-            current_categories = cm.get(); old_exts = current_categories.get(cat_name, []) if not creating_new else []
-            r = row_widgets[cat_name]["row"] if cat_name in row_widgets else len(row_widgets)
-            for widget in inner.grid_slaves(row=r): widget.destroy()
-            handle = ttk.Label(inner, text="☰", cursor="arrow"); handle.config(state="disabled"); handle.grid(row=r, column=0, sticky="w", padx=(4, 6))
-            sel_var = row_vars.get(cat_name, tk.BooleanVar(value=True)); chk = ttk.Checkbutton(inner, variable=sel_var); chk.grid(row=r, column=1, sticky="w", padx=4, pady=6)
-            name_var = tk.StringVar(value=cat_name if not creating_new else ""); ent_name = ttk.Entry(inner, textvariable=name_var, width=hdr_widths[2] + 2); ent_name.grid(row=r, column=2, sticky="w", padx=2)
-            ext_var = tk.StringVar(value=", ".join(old_exts)); ent_exts = ttk.Entry(inner, textvariable=ext_var, width=hdr_widths[3] + 2); ent_exts.grid(row=r, column=3, sticky="w", padx=2)
-            btn_frame = ttk.Frame(inner); btn_frame.grid(row=r, column=4, sticky="w")
-            btn_save = ttk.Button(btn_frame, text="Save", command=lambda: save_edit(cat_name, name_var.get().strip(), ext_var.get().strip(), creating_new), width=6, bootstyle="success"); btn_save.pack(side="left", padx=2)
-            btn_cancel = ttk.Button(btn_frame, text="Cancel", command=lambda: cancel_edit(cat_name, creating_new), width=6, bootstyle="secondary"); btn_cancel.pack(side="left", padx=2)
-            new_key = name_var.get() if creating_new else cat_name
-            row_vars[new_key] = sel_var
-            row_widgets[new_key] = {"handle": handle, "chk": chk, "ent_name": ent_name, "ent_exts": ent_exts, "btn_save": btn_save, "btn_cancel": btn_cancel, "row": r, "creating_new": creating_new, "orig_name": cat_name}
-            ent_name.focus_set()
+                show_categories()
+
+        def switch_to_edit(cat_name):
+            exts = cm.get().get(cat_name, [])
+            editing.update(key=cat_name, sel_var=selection_var(cat_name),
+                           name_var=tk.StringVar(value=cat_name), ext_var=tk.StringVar(value=", ".join(exts)))
+            show_categories()
+            focus_edit_row()
+
+        def focus_edit_row():
+            category_list.see(category_list.keys.index(editing["key"]))
+            row = category_list.row_for(editing["key"])
+            if row is not None:
+                row.ent_name.focus_set()
         
-        def save_edit(orig_name, new_name, new_exts_csv, creating_new=False):
+        def save_edit():
+            orig_name = editing["key"]
+            creating_new = orig_name == NEW_KEY
+            new_name = editing["name_var"].get().strip()
+            new_exts_csv = editing["ext_var"].get().strip()
             if not new_name: messagebox.showwarning("Validation", "Category name cannot be empty.", parent=win); return
             exts = [e.strip().lower() for e in new_exts_csv.split(",")] if new_exts_csv else []; exts = [e for e in exts if e]
             try:
                 if creating_new: cm.add(new_name, exts)
                 else: cm.edit(orig_name, new_name=new_name if new_name != orig_name else None, new_exts=exts)
             except Exception as e: messagebox.showerror("Error", f"Could not save category: {e}", parent=win); return
+            # the selection follows the category to its (new) name
+            row_vars.pop(orig_name, None)
+            row_vars[new_name] = editing["sel_var"]
+            editing.clear(); editing["key"] = None
             # When categories change, we MUST re-create watchers so they have the new rules
             # Easiest way: just log it and let the user restart, or...
             log_func("[Info] Category changes will apply to new files.")
+            notify_categories_changed()
             # We also refresh the main UI
             refresh_categories_ui()
-            rebuild_rows()
+            show_categories()
         
-        def cancel_edit(cat_name, creating_new=False): rebuild_rows()
-        def add_new_row(): r = len(row_widgets); temp_key = f"__new_{r}"; switch_to_edit(temp_key, creating_new=True)
+        def cancel_edit():
+            editing.clear(); editing["key"] = None
+            show_categories()
+
+        def add_new_row():
+            editing.update(key=NEW_KEY, sel_var=tk.BooleanVar(value=True), name_var=tk.StringVar(), ext_var=tk.StringVar())
+            show_categories()
+            focus_edit_row()
+
         def delete_category_confirm(cat_name):
             if messagebox.askyesno("Delete Category", f"Delete category '{cat_name}'?", parent=win):
                 cm.delete(cat_name)
+                row_vars.pop(cat_name, None)
                 log_func("[Info] Category changes will apply to new files.")
+                notify_categories_changed()
                 refresh_categories_ui()
-                rebuild_rows()
+                show_categories()
         
         def apply_row_selection():
             cats = cm.get();
             for w in category_frame.winfo_children(): w.destroy()
+            category_vars_new = {cat: selection_var(cat).get() for cat in cats}
             category_vars.clear()
             for cat in cats:
-                val = row_vars[cat].get() if cat in row_vars else True
-                var = tk.BooleanVar(value=val); chk = ttk.Checkbutton(category_frame, text=cat, variable=var); chk.pack(anchor="w"); category_vars[cat] = var
+                var = tk.BooleanVar(value=category_vars_new[cat]); chk = ttk.Checkbutton(category_frame, text=cat, variable=var); chk.pack(anchor="w"); category_vars[cat] = var
         
-        rebuild_rows()
+        show_categories()
         win.protocol("WM_DELETE_WINDOW", lambda: (apply_row_selection(), win.destroy()))
 
     # --- STARTUP MANAGEMENT ---
@@ -459,6 +732,16 @@ def create_main_window():
     def quit_app():
         global app_is_quitting, global_tray_icon
         
+        if engine is not None:
+            # watchers live in the engine service and keep running
+            if not messagebox.askyesno("Quit?", "Are you sure you want to quit?\nThe engine service keeps watching your folders."):
+                return
+            app_is_quitting = True
+            if global_tray_icon:
+                global_tray_icon.stop()
+            root.quit()
+            return
+
         # 1. User is asked to confirm the quit
         if not messagebox.askyesno("Quit?", "Are you sure you want to quit?\nThis will stop all file watchers."):
             return
@@ -470,15 +753,24 @@ def create_main_window():
             
         log_func("Shutting down... stopping watchers.")
         
-        # 2. It loops through every running watcher
-        for path in list(global_watchers.keys()):
-            # 3. It calls stop_watcher() for each one
-            stop_watcher(path) 
+        # 2. Save the folder list first; stopping the watchers empties it
+        save_watched_folders()
         
-        # 4. And stop_watcher() is where we added the code
-        #    to delete the sentinel file.
+        # 3. Stop every watcher in parallel under one deadline, including those still
+        #    starting. Each one removes its sentinel file and checkpoints files it had
+        #    not moved yet; they are resumed the next time the folder is watched.
+        watchers = list(global_watchers.values()) + take_pending_starts()
+        global_watchers.clear()
+        watcher_status.clear()
+        watcher_options.clear()
+        stop_watchers(watchers, log_func=print)
+        get_pending_work().flush()
         
-        save_watched_folders()
+        watched_folders_store.flush()
+        cm.flush()
+        get_catalog().close()  # commit queued catalog rows
+        if get_tracer().enabled():
+            get_tracer().export()
         root.quit()
 
     def hide_to_tray():
@@ -510,8 +802,11 @@ def create_main_window():
     # --- RESTORED: Undo Action ---
     def undo_action():
         if messagebox.askyesno("Undo", "Undo last auto-organization move?"):
+            if engine is not None:
+                engine_call("undo")
+                return
             # Pass the main GUI logger, as this is a manual action
-            undo_last_organization(log_func=log_func)
+            undo_last_organization(log_func=log_func, catalog=get_catalog(), journal=get_journal())
     # --- END RESTORED ---
 
     # ---- Build main UI ----
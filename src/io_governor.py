@@ -0,0 +1,173 @@
+# io_governor.py
+"""
+I/O governor for the move pipeline.
+
+Every move asks the governor for permission first. The governor enforces optional
+limits on bytes/second and operations/second (token buckets), serves live
+watcher events before bulk jobs (manual "Organize Now", batch runs), and within
+a priority level takes turns between folders, so one noisy folder cannot starve
+the others.
+
+Limits come from config/io_limits.json, e.g. {"bytes_per_sec": 50000000, "ops_per_sec": 200};
+0 or a missing key means unlimited. With no limits and no contention,
+acquire() returns immediately.
+"""
+import os
+import json
+import time
+import threading
+from collections import deque
+
+from categories import CONFIG_DIR
+
+IO_LIMITS_FILE = os.path.join(CONFIG_DIR, "io_limits.json")
+
+# lower value = served first
+PRIORITY_LIVE = 0
+PRIORITY_BULK = 1
+
+
+class _TokenBucket:
+    """
+    Refills at `rate` units/second, holds at most one second's worth.
+    A request bigger than the bucket may run once the bucket is full and leaves
+    it in debt, so large files are slowed down rather than blocked forever.
+    """
+
+    def __init__(self, rate):
+        self.rate = float(rate)
+        self.capacity = float(rate)
+        self.tokens = float(rate)
+        self.last = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+        self.last = now
+
+    def wait_time(self, amount, now):
+        """
+        Seconds until `amount` may be taken (0 if now).
+        """
+        self._refill(now)
+        needed = min(amount, self.capacity)
+        if self.tokens >= needed:
+            return 0.0
+        return (needed - self.tokens) / self.rate
+
+    def take(self, amount):
+        self.tokens -= amount
+
+
+class IOGovernor:
+    def __init__(self, bytes_per_sec=0, ops_per_sec=0):
+        self._cond = threading.Condition()
+        self._bytes = _TokenBucket(bytes_per_sec) if bytes_per_sec else None
+        self._ops = _TokenBucket(ops_per_sec) if ops_per_sec else None
+        # priority -> {folder: deque of tickets}, and the folder turn order per priority
+        self._queues = {}
+        self._turns = {}
+
+    def limited(self):
+        return self._bytes is not None or self._ops is not None
+
+    def _next_ticket(self):
+        for priority in sorted(self._turns):
+            turns = self._turns[priority]
+            if turns:
+                folder = turns[0]
+                return priority, folder, self._queues[priority][folder][0]
+        return None
+
+    def _wait_time(self, nbytes, now):
+        wait = 0.0
+        if self._ops is not None:
+            wait = max(wait, self._ops.wait_time(1, now))
+        if self._bytes is not None and nbytes:
+            wait = max(wait, self._bytes.wait_time(nbytes, now))
+        return wait
+
+    def acquire(self, folder, nbytes=0, priority=PRIORITY_BULK):
+        """
+        Block until one operation moving `nbytes` for `folder` may run.
+        """
+        if not self.limited():
+            return
+        ticket = object()
+        with self._cond:
+            folders = self._queues.setdefault(priority, {})
+            turns = self._turns.setdefault(priority, deque())
+            if folder not in folders:
+                folders[folder] = deque()
+                turns.append(folder)
+            folders[folder].append(ticket)
+
+            while True:
+                head = self._next_ticket()
+                if head is not None and head[2] is ticket:
+                    wait = self._wait_time(nbytes, time.monotonic())
+                    if wait <= 0:
+                        break
+                    self._cond.wait(wait)
+                else:
+                    self._cond.wait()
+
+            # take the budget and pass the turn to the next folder
+            if self._ops is not None:
+                self._ops.take(1)
+            if self._bytes is not None and nbytes:
+                self._bytes.take(nbytes)
+            folders[folder].popleft()
+            turns.popleft()
+            if folders[folder]:
+                turns.append(folder)
+            else:
+                del folders[folder]
+            self._cond.notify_all()
+
+
+def move_cost(src_path, dest_dir):
+    """
+    Bytes a move will actually copy: 0 for a rename on the same device, else the file size.
+    """
+    try:
+        src = os.stat(src_path)
+        if src.st_dev == os.stat(dest_dir).st_dev:
+            return 0
+        return src.st_size
+    except OSError:
+        return 0
+
+
+def throttle(governor, folder, src_path, dest_dir, priority=PRIORITY_BULK):
+    """
+    Wait for permission to move src_path into dest_dir. No-op without a governor
+    or without limits, so callers can use it unconditionally.
+    """
+    if governor is None or not governor.limited():
+        return
+    governor.acquire(folder, move_cost(src_path, dest_dir), priority)
+
+
+def load_limits(path=IO_LIMITS_FILE):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return int(data.get("bytes_per_sec", 0) or 0), int(data.get("ops_per_sec", 0) or 0)
+    except Exception:
+        return 0, 0
+
+
+_default_governor = None
+_default_governor_lock = threading.Lock()
+
+
+def get_governor():
+    """
+    Process-wide governor shared by the organizer and all watchers.
+    """
+    global _default_governor
+    with _default_governor_lock:
+        if _default_governor is None:
+            bytes_per_sec, ops_per_sec = load_limits()
+            _default_governor = IOGovernor(bytes_per_sec, ops_per_sec)
+        return _default_governor
@@ -0,0 +1,321 @@
+# journal.py
+"""
+Append-only undo journal of moves, kept in config/undo_journal.jsonl.
+
+Each line is one record: {"op": ..., "session": ..., "src": ..., "dest": ..., "t": ...}.
+Every move is journaled twice, write-ahead style:
+  "intent"  before the move (intend()), so a crash mid-batch still leaves a trace
+  "done"    after the move (append_batch())
+and undo adds "undone" records for the moves it put back (record_undone()).
+Lines without "op" (older journals) are "done" records.
+
+last_session() replays the journal so undo works after a restart: an intent
+without its done record counts as moved when the source is gone and the
+destination exists, which is exactly the state a crash between the two leaves.
+
+Records are written in groups: one write() call per group of moves (or per
+WRITE_CHUNK_RECORDS for huge groups); the bulk organizer journals GROUP_SIZE
+files at a time instead of one record per file.
+
+Durable mode (config/journal.json: {"durable": true, "commit_window": 0.05})
+makes intend() and append_batch() return only once their records (and, for
+done records, the moved files' directory entries) are on disk. Calls arriving
+within `commit_window` seconds are group-committed: one journal fsync and one
+fsync per touched directory for the whole group, after which every caller is
+acknowledged together. A larger window trades per-move latency for fewer
+fsyncs; 0 syncs each call on its own.
+
+The file is rotated to undo_journal.1.jsonl once it passes MAX_JOURNAL_BYTES;
+the previous generation is dropped, so the journal keeps between one and two
+files' worth of the most recent sessions.
+"""
+import os
+import json
+import time
+import itertools
+import threading
+
+from categories import CONFIG_DIR
+
+JOURNAL_FILE = os.path.join(CONFIG_DIR, "undo_journal.jsonl")
+JOURNAL_SETTINGS_FILE = os.path.join(CONFIG_DIR, "journal.json")
+
+# how long (seconds) a durable commit waits for other moves to share its fsyncs
+DEFAULT_COMMIT_WINDOW = 0.05
+# records per write() call
+WRITE_CHUNK_RECORDS = 10000
+# files the bulk organizer moves per intent/done pair of journal writes
+GROUP_SIZE = 1000
+# size at which the journal is rotated
+MAX_JOURNAL_BYTES = 32 * 1024 * 1024
+
+OP_INTENT = "intent"
+OP_DONE = "done"
+OP_UNDONE = "undone"
+
+
+def fsync_dir(path):
+    """
+    Flush a directory's entries (the result of renames into or out of it) to disk.
+    Not possible on Windows, where it is a no-op.
+    """
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class _Group:
+    """
+    Moves waiting for one group commit.
+    """
+
+    def __init__(self):
+        self.records = []  # (op, moves, session)
+        self.done = threading.Event()
+        self.error = None
+
+
+class MoveJournal:
+    def __init__(self, path=JOURNAL_FILE, durable=False, commit_window=DEFAULT_COMMIT_WINDOW,
+                 max_bytes=MAX_JOURNAL_BYTES):
+        self.path = path
+        self.durable = durable
+        self.commit_window = commit_window
+        self.max_bytes = max_bytes
+        base, ext = os.path.splitext(path)
+        self.rotated_path = base + ".1" + ext
+        self._lock = threading.Lock()
+        self._group_lock = threading.Lock()
+        self._group = None  # _Group currently collecting moves (durable mode)
+        self._file = None  # append handle, reopened when the file is rotated
+        self._file_id = None
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def __getstate__(self):
+        # batch worker processes get their own handle on the same file
+        return {"path": self.path, "durable": self.durable, "commit_window": self.commit_window,
+                "max_bytes": self.max_bytes}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def intend(self, moves, session):
+        """
+        Record [(dest, src), ...] that are about to be moved, before moving them.
+        In durable mode, returns once the records are synced.
+        """
+        self._append(OP_INTENT, moves, session)
+
+    def append_batch(self, moves, session):
+        """
+        Record [(dest, src), ...] that were moved for `session` with a single write.
+        In durable mode, returns once the group containing these moves is synced.
+        """
+        self._append(OP_DONE, moves, session)
+
+    def record_undone(self, moves):
+        """
+        Record [(dest, src), ...] that undo moved back, so they are not undone again.
+        """
+        self._append(OP_UNDONE, moves, None)
+
+    def _append(self, op, moves, session):
+        if not moves:
+            return
+        if not self.durable:
+            self._write([(op, moves, session)], fsync=False)
+            return
+
+        with self._group_lock:
+            group = self._group
+            leader = group is None
+            if leader:
+                group = self._group = _Group()
+            group.records.append((op, moves, session))
+
+        if leader:
+            # collect other moves for the window, then commit them all
+            if self.commit_window > 0:
+                time.sleep(self.commit_window)
+            with self._group_lock:
+                self._group = None
+            try:
+                self._commit(group)
+            except Exception as e:
+                group.error = e
+            group.done.set()
+        else:
+            group.done.wait()
+        if group.error is not None:
+            raise group.error
+
+    def _handle(self):
+        # another process (batch workers) may have rotated the file under us
+        try:
+            st = os.stat(self.path)
+            current = (st.st_dev, st.st_ino)
+        except FileNotFoundError:
+            current = None
+        if self._file is not None and current != self._file_id:
+            self._file.close()
+            self._file = None
+        if self._file is None:
+            # unbuffered: each chunk below is a single O_APPEND write, whole lines only
+            self._file = open(self.path, "ab", buffering=0)
+            st = os.fstat(self._file.fileno())
+            self._file_id = (st.st_dev, st.st_ino)
+        return self._file
+
+    def _write(self, records, fsync):
+        now = time.time()
+        lines = (json.dumps({"op": op, "session": session, "src": src, "dest": dest, "t": now},
+                            ensure_ascii=False).encode("utf-8") + b"\n"
+                 for op, moves, session in records for dest, src in moves)
+        with self._lock:
+            f = self._handle()
+            # huge sessions are written in chunks rather than built as one string
+            chunk = list(itertools.islice(lines, WRITE_CHUNK_RECORDS))
+            while chunk:
+                data = memoryview(b"".join(chunk))
+                while data:
+                    data = data[f.write(data):]
+                chunk = list(itertools.islice(lines, WRITE_CHUNK_RECORDS))
+            if fsync:
+                os.fsync(f.fileno())
+            if os.fstat(f.fileno()).st_size > self.max_bytes:
+                self._rotate()
+
+    def _rotate(self):
+        # close first: Windows cannot rename a file that is still open
+        self._file.close()
+        self._file = None
+        try:
+            os.replace(self.path, self.rotated_path)
+            if self.durable:
+                fsync_dir(os.path.dirname(self.path) or ".")
+        except OSError:
+            pass  # in use by another process; rotate on a later write
+
+    def _commit(self, group):
+        # directory entries first: the journal must never claim a move the disk could lose
+        dirs = set()
+        for op, moves, _ in group.records:
+            if op != OP_DONE:
+                continue
+            for dest, src in moves:
+                dirs.add(os.path.dirname(dest))
+                dirs.add(os.path.dirname(src))
+        for d in dirs:
+            try:
+                fsync_dir(d)
+            except OSError:
+                pass
+        self._write(group.records, fsync=True)
+
+    def _records(self):
+        # oldest first: the rotated generation, then the live file
+        for path in (self.rotated_path, self.path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            rec = json.loads(line)
+                            rec["dest"], rec["src"]
+                        except (ValueError, KeyError, TypeError):
+                            continue  # torn final line after a crash
+                        yield rec
+            except FileNotFoundError:
+                pass
+
+    def _replay(self):
+        """
+        Return {session: [(dest, src), ...]} of moves not undone yet, sessions
+        ordered by their last record.
+        """
+        sessions = {}  # session -> ({(dest, src): moved?}, {src: (dest, src) of its open intent})
+        owner = {}  # (dest, src) -> session of its latest record
+        for rec in self._records():
+            op = rec.get("op", OP_DONE)
+            move = (rec["dest"], rec["src"])
+            if op == OP_UNDONE:
+                session = owner.pop(move, None)
+                if session is not None:
+                    sessions[session][0].pop(move, None)
+                continue
+            session = rec.get("session")
+            entry = sessions.pop(session, None)
+            if entry is None:
+                entry = ({}, {})
+            sessions[session] = entry  # re-insert: latest session last
+            moves, intents = entry
+            # a retry under a new name replaces the open intent for the same source
+            prior = intents.pop(move[1], None)
+            if prior is not None and prior != move:
+                moves.pop(prior, None)
+            if op == OP_DONE:
+                moves[move] = True
+            else:
+                moves.setdefault(move, False)
+                intents[move[1]] = move
+            owner[move] = session
+
+        replayed = {}
+        for session, (moves, _) in sessions.items():
+            done = [move for move, moved in moves.items() if moved or self._moved_before_crash(move)]
+            if done:
+                replayed[session] = done
+        return replayed
+
+    @staticmethod
+    def _moved_before_crash(move):
+        dest, src = move
+        return os.path.lexists(dest) and not os.path.lexists(src)
+
+    def read_session(self, session):
+        """
+        Return [(dest, src), ...] moved for `session` and not undone, in order.
+        """
+        return self._replay().get(session, [])
+
+    def last_session(self):
+        """
+        Return (session, [(dest, src), ...]) of the most recent session that still
+        has moves to undo, or (None, []).
+        """
+        replayed = self._replay()
+        if not replayed:
+            return None, []
+        session = next(reversed(replayed))
+        return session, replayed[session]
+
+
+_default_journal = None
+_default_journal_lock = threading.Lock()
+
+
+def load_settings(path=JOURNAL_SETTINGS_FILE):
+    """
+    Return (durable, commit_window) from config/journal.json, defaulting to non-durable.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return bool(data.get("durable", False)), float(data.get("commit_window", DEFAULT_COMMIT_WINDOW))
+    except Exception:
+        return False, DEFAULT_COMMIT_WINDOW
+
+
+def get_journal():
+    """
+    Process-wide journal shared by the organizer and all watchers.
+    """
+    global _default_journal
+    with _default_journal_lock:
+        if _default_journal is None:
+            durable, commit_window = load_settings()
+            _default_journal = MoveJournal(durable=durable, commit_window=commit_window)
+        return _default_journal
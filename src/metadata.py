@@ -0,0 +1,684 @@
+# metadata.py
+"""
+Header-only file metadata for date- and camera-based sorting.
+
+Extensions tell which category a file belongs to; where it goes inside the
+category (Images/2024/05, Images/Canon EOS R5) needs the capture date or the
+camera, which are stored in the file's header:
+    JPEG                EXIF in the APP1 segment
+    TIFF and raw        EXIF IFDs (CR2, NEF, ARW, DNG, ORF, RW2, ...)
+    HEIC / AVIF         the Exif item of the 'meta' box
+    MP4 / MOV / 3GP     'moov': mvhd creation time, QuickTime keys and udta tags
+    MP3                 ID3v2 recording date
+Headers are walked with small seek+read calls and every file has a hard read
+budget (HEADER_READ_LIMIT); image pixels, 'mdat' and audio frames are never read.
+
+Results are cached in config/metadata_cache.db by (device, inode) and checked
+against size and mtime, so a file renamed or moved on the same volume is not
+read again. prefetch() fills the cache from a pool of threads; sharding.py uses
+it for the "capture" and "camera" shard modes.
+
+CLI:
+    python metadata.py show FILE [FILE ...]
+    python metadata.py scan FOLDER [--recursive] [--workers N]
+"""
+import os
+import re
+import sys
+import json
+import time
+import atexit
+import struct
+import weakref
+import sqlite3
+import argparse
+import threading
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+
+from categories import CONFIG_DIR
+
+METADATA_CACHE_FILE = os.path.join(CONFIG_DIR, "metadata_cache.db")
+
+# bytes read from one file at most, whatever its format
+HEADER_READ_LIMIT = 512 * 1024
+# bytes read for one metadata box or EXIF block
+BOX_READ_LIMIT = 64 * 1024
+# upper bounds on structures walked, so a corrupt header cannot loop for long
+MAX_BOXES = 4096
+MAX_IFD_ENTRIES = 512
+MAX_ID3_FRAMES = 256
+MAX_TAG_LENGTH = 256
+
+DEFAULT_METADATA_WORKERS = 8
+# files handed to the pool at a time, so huge scans do not queue every path at once
+PREFETCH_CHUNK = 1024
+# the cache commits after this many new entries (and on flush/exit)
+FLUSH_BATCH_SIZE = 500
+
+EMPTY_METADATA = {"date": None, "camera": None}
+
+# EXIF tags
+TAG_MAKE = 0x010F
+TAG_MODEL = 0x0110
+TAG_DATETIME = 0x0132
+TAG_EXIF_IFD = 0x8769
+TAG_DATETIME_ORIGINAL = 0x9003
+TAG_DATETIME_DIGITIZED = 0x9004
+
+# second field of a TIFF header: 42, or the Olympus/Panasonic raw variants
+TIFF_MAGICS = (42, 0x4F52, 0x5352, 0x55)
+# first box types of an ISO media file (MP4, MOV, HEIC)
+BMFF_BOXES = (b"ftyp", b"moov", b"mdat", b"wide", b"free", b"skip")
+# ftyp brands of still images (HEIF/AVIF) rather than movies
+HEIF_BRANDS = (b"heic", b"heix", b"heim", b"heis", b"hevc", b"hevx", b"mif1", b"msf1", b"avif", b"avis")
+# seconds from 1904-01-01 (MP4 epoch) to 1970-01-01
+MP4_EPOCH_OFFSET = 2082844800
+
+
+# --- bounded readers ---
+class _FileReader:
+    """
+    Random access to an open file; every read is small and the total is capped.
+    """
+
+    def __init__(self, f, size, budget=HEADER_READ_LIMIT):
+        self.f = f
+        self.size = size
+        self.budget = budget
+
+    def read_at(self, offset, n):
+        n = min(n, self.size - offset, self.budget)
+        if offset < 0 or n <= 0:
+            return b""
+        self.budget -= n
+        self.f.seek(offset)
+        return self.f.read(n)
+
+
+class _BufferReader:
+    """
+    Same interface over bytes already read (an EXIF block, a metadata box).
+    """
+
+    def __init__(self, data):
+        self.data = data
+        self.size = len(data)
+
+    def read_at(self, offset, n):
+        return self.data[offset:offset + n] if offset >= 0 else b""
+
+
+# --- value helpers ---
+_DATE_RE = re.compile(r"(\d{4})(?:[:-](\d{2})(?:[:-](\d{2})(?:[ T](\d{2}):(\d{2})(?::(\d{2}))?)?)?)?")
+
+
+def _iso_date(text):
+    """
+    'YYYY:MM:DD HH:MM:SS' (EXIF), ISO 8601 or a partial date (ID3 years) ->
+    'YYYY-MM-DDTHH:MM:SS', 'YYYY-MM-DD', 'YYYY-MM' or 'YYYY'; None if unusable.
+    """
+    if not isinstance(text, str):
+        return None
+    m = _DATE_RE.match(text.strip())
+    if not m:
+        return None
+    year, month, day, hour, minute, second = m.groups()
+    if not 1800 <= int(year) <= 2200:
+        return None  # e.g. the '0000:00:00 00:00:00' cameras write when the clock is unset
+    date = year
+    if month and 1 <= int(month) <= 12:
+        date += f"-{month}"
+        if day and 1 <= int(day) <= 31:
+            date += f"-{day}"
+            if hour and int(hour) < 24 and int(minute) < 60:
+                date += f"T{hour}:{minute}:{second or '00'}"
+    return date
+
+
+def _epoch_date(seconds):
+    """
+    Epoch seconds (UTC) -> local ISO date, like the file modification times used elsewhere.
+    """
+    if seconds <= 0:
+        return None
+    try:
+        return time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(seconds))
+    except (OverflowError, OSError, ValueError):
+        return None
+
+
+def _camera(make, model):
+    """
+    'Canon' + 'Canon EOS R5' -> 'Canon EOS R5'; 'Apple' + 'iPhone 12' -> 'Apple iPhone 12'.
+    """
+    make = (make or "").strip()
+    model = (model or "").strip()
+    if make and model and not model.lower().startswith(make.split()[0].lower()):
+        return f"{make} {model}"
+    return model or make or None
+
+
+def _text(data):
+    return data.split(b"\0", 1)[0].decode("utf-8", "replace").strip()
+
+
+def _result(date=None, camera=None):
+    return {"date": date, "camera": camera}
+
+
+# --- EXIF (JPEG, TIFF/raw, HEIF) ---
+def _read_ifd(r, e, offset, wanted, tags):
+    raw = r.read_at(offset, 2)
+    if len(raw) < 2:
+        return
+    count = min(struct.unpack(e + "H", raw)[0], MAX_IFD_ENTRIES)
+    entries = r.read_at(offset + 2, 12 * count)
+    for i in range(len(entries) // 12):
+        tag, kind, n, value = struct.unpack(e + "HHI4s", entries[i * 12:(i + 1) * 12])
+        if tag not in wanted:
+            continue
+        if kind == 2:  # ASCII, inline when it fits in 4 bytes
+            data = value[:n] if n <= 4 else r.read_at(struct.unpack(e + "I", value)[0], min(n, MAX_TAG_LENGTH))
+            tags[tag] = _text(data)
+        elif kind in (4, 13):  # LONG / IFD offset
+            tags[tag] = struct.unpack(e + "I", value)[0]
+
+
+def _from_tiff(r):
+    """
+    Date and camera from a TIFF structure (offsets relative to its header).
+    """
+    head = r.read_at(0, 8)
+    if len(head) < 8 or head[:2] not in (b"II", b"MM"):
+        return None
+    e = "<" if head[:2] == b"II" else ">"
+    if struct.unpack(e + "H", head[2:4])[0] not in TIFF_MAGICS:
+        return None
+    tags = {}
+    _read_ifd(r, e, struct.unpack(e + "I", head[4:8])[0], {TAG_MAKE, TAG_MODEL, TAG_DATETIME, TAG_EXIF_IFD}, tags)
+    if isinstance(tags.get(TAG_EXIF_IFD), int):
+        _read_ifd(r, e, tags[TAG_EXIF_IFD], {TAG_DATETIME_ORIGINAL, TAG_DATETIME_DIGITIZED}, tags)
+    date = None
+    for tag in (TAG_DATETIME_ORIGINAL, TAG_DATETIME_DIGITIZED, TAG_DATETIME):
+        date = _iso_date(tags.get(tag))
+        if date:
+            break
+    return _result(date, _camera(tags.get(TAG_MAKE), tags.get(TAG_MODEL)))
+
+
+def _jpeg(r):
+    """
+    Walk the segments before the image data, reading only the EXIF APP1 block.
+    """
+    offset = 2
+    while True:
+        head = r.read_at(offset, 4)
+        if len(head) < 4 or head[0] != 0xFF:
+            return None
+        marker = head[1]
+        if marker == 0xFF:  # fill byte
+            offset += 1
+            continue
+        if marker in (0xD9, 0xDA):  # end of image / start of scan: no EXIF after this
+            return None
+        length = struct.unpack(">H", head[2:4])[0]
+        if marker == 0xE1 and r.read_at(offset + 4, 6) == b"Exif\0\0":
+            return _from_tiff(_BufferReader(r.read_at(offset + 10, min(length - 8, BOX_READ_LIMIT))))
+        offset += 2 + length
+
+
+# --- ISO media files (MP4, MOV, HEIC) ---
+def _boxes(r, start, end):
+    """
+    (type, payload start, payload end) of the boxes between start and end.
+    """
+    offset = start
+    for _ in range(MAX_BOXES):
+        if offset + 8 > end:
+            return
+        head = r.read_at(offset, 16)
+        if len(head) < 8:
+            return
+        size, kind = struct.unpack(">I4s", head[:8])
+        header = 8
+        if size == 1:  # 64-bit size
+            if len(head) < 16:
+                return
+            size = struct.unpack(">Q", head[8:16])[0]
+            header = 16
+        elif size == 0:  # runs to the end
+            size = end - offset
+        if size < header:
+            return
+        yield kind, offset + header, min(offset + size, end)
+        offset += size
+
+
+def _uint(data, pos, size):
+    """
+    Big-endian unsigned int of `size` bytes (0, 2, 4 or 8) at pos -> (value, next pos).
+    """
+    if size == 0:
+        return 0, pos
+    fmt = {2: ">H", 4: ">I", 8: ">Q"}[size]
+    return struct.unpack(fmt, data[pos:pos + size])[0], pos + size
+
+
+def _bmff(r):
+    brand = b""
+    for kind, start, end in _boxes(r, 0, r.size):
+        if kind == b"ftyp":
+            brand = r.read_at(start, 4)
+        elif kind == b"meta" and brand in HEIF_BRANDS:
+            return _heif(r, start + 4, end)  # full box: skip version and flags
+        elif kind == b"moov":
+            return _moov(r, start, end)
+    return None
+
+
+def _heif(r, start, end):
+    exif_items = []
+    locations = {}
+    for kind, s, e in _boxes(r, start, end):
+        if kind == b"iinf":
+            exif_items = _heif_exif_items(r.read_at(s, min(e - s, BOX_READ_LIMIT)))
+        elif kind == b"iloc":
+            locations = _heif_locations(r.read_at(s, min(e - s, BOX_READ_LIMIT)))
+    for item in exif_items:
+        if item in locations:
+            offset, length = locations[item]
+            data = r.read_at(offset, min(length, BOX_READ_LIMIT))
+            if len(data) >= 4:
+                # the item starts with the offset of the TIFF header after this field
+                return _from_tiff(_BufferReader(data[4 + struct.unpack(">I", data[:4])[0]:]))
+    return None
+
+
+def _heif_exif_items(data):
+    """
+    Item ids of type 'Exif' from an iinf box payload.
+    """
+    version = data[0]
+    pos = 6 if version == 0 else 8
+    items = []
+    for kind, s, e in _boxes(_BufferReader(data), pos, len(data)):
+        if kind != b"infe" or data[s] < 2:
+            continue
+        if data[s] == 2:
+            item_id, item_type = struct.unpack(">H", data[s + 4:s + 6])[0], data[s + 8:s + 12]
+        else:
+            item_id, item_type = struct.unpack(">I", data[s + 4:s + 8])[0], data[s + 10:s + 14]
+        if item_type == b"Exif":
+            items.append(item_id)
+    return items
+
+
+def _heif_locations(data):
+    """
+    item id -> (file offset, length) of its first extent, from an iloc box payload.
+    """
+    version = data[0]
+    offset_size, length_size = data[4] >> 4, data[4] & 15
+    base_offset_size, index_size = data[5] >> 4, (data[5] & 15) if version in (1, 2) else 0
+    id_size = 2 if version < 2 else 4
+    count, pos = _uint(data, 6, id_size)
+    locations = {}
+    for _ in range(min(count, MAX_BOXES)):
+        item_id, pos = _uint(data, pos, id_size)
+        method = 0
+        if version in (1, 2):
+            method, pos = _uint(data, pos, 2)
+            method &= 15
+        pos += 2  # data reference index
+        base, pos = _uint(data, pos, base_offset_size)
+        extents, pos = _uint(data, pos, 2)
+        first = None
+        for _ in range(extents):
+            pos += index_size
+            extent_offset, pos = _uint(data, pos, offset_size)
+            extent_length, pos = _uint(data, pos, length_size)
+            if first is None:
+                first = (base + extent_offset, extent_length)
+        if method == 0 and first is not None:  # stored in the file (not in an idat box)
+            locations[item_id] = first
+    return locations
+
+
+def _moov(r, start, end):
+    date = make = model = None
+    tags = {}
+    for kind, s, e in _boxes(r, start, end):
+        if kind == b"mvhd":
+            head = r.read_at(s, 12)
+            if len(head) == 12:
+                created = struct.unpack(">Q", head[4:12])[0] if head[0] == 1 else struct.unpack(">I", head[4:8])[0]
+                if created:
+                    date = _epoch_date(created - MP4_EPOCH_OFFSET)
+        elif kind in (b"meta", b"udta"):
+            tags.update(_quicktime_tags(kind, r.read_at(s, min(e - s, BOX_READ_LIMIT))))
+    # the tags keep the local time of capture; mvhd only has UTC
+    date = _iso_date(tags.get("com.apple.quicktime.creationdate") or tags.get("\xa9day")) or date
+    make = tags.get("com.apple.quicktime.make") or tags.get("\xa9mak")
+    model = tags.get("com.apple.quicktime.model") or tags.get("\xa9mod")
+    return _result(date, _camera(make, model))
+
+
+def _quicktime_tags(kind, data):
+    """
+    Text tags of a moov/meta (QuickTime keys + ilst) or moov/udta (©xxx) box payload.
+    """
+    b = _BufferReader(data)
+    tags = {}
+    if kind == b"udta":
+        for tag, s, e in _boxes(b, 0, len(data)):
+            if tag in (b"\xa9day", b"\xa9mak", b"\xa9mod") and e - s >= 4:
+                # QuickTime string: 16-bit length, 16-bit language, text
+                n = struct.unpack(">H", data[s:s + 2])[0]
+                tags[tag.decode("latin-1")] = _text(data[s + 4:s + 4 + n])
+            elif tag == b"meta":  # MP4 style: udta/meta/ilst
+                tags.update(_quicktime_tags(tag, data[s:e]))
+        return tags
+
+    keys = []
+    values = {}
+    start = 0 if data[4:8] == b"hdlr" else 4  # ISO meta is a full box, QuickTime meta is not
+    for tag, s, e in _boxes(b, start, len(data)):
+        if tag == b"keys":
+            count, pos = _uint(data, s + 4, 4)
+            for _ in range(min(count, MAX_BOXES)):
+                size, _ = _uint(data, pos, 4)
+                if size < 8:
+                    break
+                keys.append(data[pos + 8:pos + size].decode("utf-8", "replace"))
+                pos += size
+        elif tag == b"ilst":
+            for index, s2, e2 in _boxes(b, s, e):
+                for sub, s3, e3 in _boxes(b, s2, e2):
+                    if sub == b"data":
+                        values[index] = _text(data[s3 + 8:e3])  # after type and locale
+    if not keys:  # items named by their own type, e.g. '\xa9day'
+        return {index.decode("latin-1"): value for index, value in values.items()}
+    for i, key in enumerate(keys, start=1):
+        value = values.get(struct.pack(">I", i))  # items named by 1-based key index
+        if value is not None:
+            tags[key] = value
+    return tags
+
+
+# --- ID3v2 (MP3) ---
+def _synchsafe(data):
+    return (data[0] << 21) | (data[1] << 14) | (data[2] << 7) | data[3]
+
+
+def _id3_text(data):
+    if not data:
+        return ""
+    encoding = {0: "latin-1", 1: "utf-16", 2: "utf-16-be", 3: "utf-8"}.get(data[0], "latin-1")
+    return data[1:].decode(encoding, "replace").replace("\0", "").strip()
+
+
+def _id3(r):
+    """
+    Recording date from the text frames of an ID3v2 tag; other frames (cover art) are skipped.
+    """
+    head = r.read_at(0, 10)
+    if len(head) < 10:
+        return None
+    version, flags = head[3], head[5]
+    end = 10 + _synchsafe(head[6:10])
+    pos = 10
+    if flags & 0x40:  # extended header
+        ext = r.read_at(pos, 4)
+        if len(ext) < 4:
+            return None
+        pos += _synchsafe(ext) if version == 4 else 4 + struct.unpack(">I", ext)[0]
+    id_len, header_len = (3, 6) if version == 2 else (4, 10)
+    wanted = {b"TDRC", b"TYER", b"TDAT", b"TYE", b"TDA"}
+    frames = {}
+    for _ in range(MAX_ID3_FRAMES):
+        if pos + header_len > end:
+            break
+        fh = r.read_at(pos, header_len)
+        if len(fh) < header_len or fh[0] == 0:  # padding
+            break
+        frame_id = fh[:id_len]
+        if version == 2:
+            size = int.from_bytes(fh[3:6], "big")
+        elif version == 4:
+            size = _synchsafe(fh[4:8])
+        else:
+            size = struct.unpack(">I", fh[4:8])[0]
+        if frame_id in wanted:
+            frames[frame_id] = _id3_text(r.read_at(pos + header_len, min(size, MAX_TAG_LENGTH)))
+        pos += header_len + size
+
+    date = _iso_date(frames.get(b"TDRC"))
+    year = frames.get(b"TYER") or frames.get(b"TYE")
+    day_month = frames.get(b"TDAT") or frames.get(b"TDA")  # 'DDMM'
+    if not date and year:
+        if day_month and len(day_month) == 4 and day_month.isdigit():
+            year = f"{year}-{day_month[2:]}-{day_month[:2]}"
+        date = _iso_date(year)
+    return _result(date)
+
+
+def _parser_for(magic):
+    if magic[:3] == b"\xff\xd8\xff":
+        return _jpeg
+    if magic[:2] in (b"II", b"MM"):
+        return _from_tiff
+    if magic[:3] == b"ID3":
+        return _id3
+    if magic[4:8] in BMFF_BOXES:
+        return _bmff
+    return None
+
+
+def read_metadata(path, size=None):
+    """
+    {"date": ..., "camera": ...} read from the header of one file; values are None
+    when absent. date is an ISO 8601 local time, or only 'YYYY' / 'YYYY-MM' when the
+    file records no more (ID3 years).
+    """
+    try:
+        with open(path, "rb", buffering=0) as f:
+            if size is None:
+                size = os.fstat(f.fileno()).st_size
+            r = _FileReader(f, size)
+            parser = _parser_for(r.read_at(0, 12))
+            found = parser(r) if parser else None
+    except (OSError, ValueError, IndexError, KeyError, struct.error):
+        found = None  # unreadable or corrupt header: sort like a file without metadata
+    return found or dict(EMPTY_METADATA)
+
+
+# --- cache ---
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS metadata (
+    dev      INTEGER NOT NULL,
+    ino      INTEGER NOT NULL,
+    size     INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    date     TEXT,
+    camera   TEXT,
+    PRIMARY KEY (dev, ino)
+) WITHOUT ROWID;
+"""
+
+
+# caches with uncommitted entries are flushed at exit; weak, so caches can be dropped
+_live_caches = weakref.WeakSet()
+
+
+def _flush_live_caches():
+    for cache in list(_live_caches):
+        cache.flush()
+
+
+atexit.register(_flush_live_caches)
+
+
+def _signed64(value):
+    # device and inode numbers are unsigned 64-bit; SQLite integers are signed
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+
+class MetadataCache:
+    """
+    (device, inode) -> metadata, valid while the file's size and mtime are unchanged.
+    Thread-safe; each thread gets its own SQLite connection. New entries are
+    committed in batches.
+    """
+
+    def __init__(self, path=METADATA_CACHE_FILE):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        conn = self._connect()
+        conn.executescript(_SCHEMA)
+        conn.commit()
+        conn.close()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._pending = {}  # (dev, ino) -> row not yet committed
+        _live_caches.add(self)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    def _lookup(self, key, st):
+        with self._lock:
+            row = self._pending.get(key)
+        if row is None:
+            try:
+                row = self._conn().execute("SELECT * FROM metadata WHERE dev = ? AND ino = ?", key).fetchone()
+            except sqlite3.Error:
+                row = None
+        if row is None or row[2] != st.st_size or row[3] != st.st_mtime_ns:
+            return None
+        return _result(row[4], row[5])
+
+    def _get(self, path):
+        """
+        (metadata, True if the header had to be read).
+        """
+        try:
+            st = os.stat(path)
+        except OSError:
+            return dict(EMPTY_METADATA), False
+        key = (_signed64(st.st_dev), _signed64(st.st_ino))
+        cached = self._lookup(key, st)
+        if cached is not None:
+            return cached, False
+        meta = read_metadata(path, st.st_size)
+        with self._lock:
+            self._pending[key] = (*key, st.st_size, st.st_mtime_ns, meta["date"], meta["camera"])
+            full = len(self._pending) >= FLUSH_BATCH_SIZE
+        if full:
+            self.flush()
+        return meta, True
+
+    def get(self, path):
+        """
+        Metadata of the file at path, from the cache or its header.
+        """
+        return self._get(path)[0]
+
+    def prefetch(self, paths, workers=DEFAULT_METADATA_WORKERS, progress_func=None):
+        """
+        Make sure every file in `paths` (any iterable) is cached, statting and reading
+        headers on a pool of `workers` threads. Returns (files seen, headers read).
+        """
+        seen = read = 0
+        paths = iter(paths)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            while True:
+                chunk = list(islice(paths, PREFETCH_CHUNK))
+                if not chunk:
+                    break
+                for _, was_read in pool.map(self._get, chunk):
+                    read += was_read
+                seen += len(chunk)
+                if progress_func:
+                    progress_func(seen, read)
+        self.flush()
+        return seen, read
+
+    def flush(self):
+        """
+        Commit the entries added since the last flush.
+        """
+        with self._lock:
+            rows = list(self._pending.values())
+            self._pending = {}
+        if not rows:
+            return
+        try:
+            with self._conn() as conn:
+                conn.executemany("INSERT OR REPLACE INTO metadata VALUES (?, ?, ?, ?, ?, ?)", rows)
+        except sqlite3.Error as e:
+            print(f"[Metadata] Error writing cache: {e}")
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_metadata_cache():
+    """
+    Process-wide metadata cache.
+    """
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = MetadataCache()
+        return _default_cache
+
+
+def _files_in(folder, recursive):
+    if not recursive:
+        with os.scandir(folder) as it:
+            for entry in it:
+                if entry.is_file():
+                    yield entry.path
+        return
+    for dirpath, _dirs, files in os.walk(folder):
+        for name in files:
+            yield os.path.join(dirpath, name)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Read capture dates and cameras from file headers.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_show = sub.add_parser("show", help="print the metadata of files")
+    p_show.add_argument("files", nargs="+")
+    p_scan = sub.add_parser("scan", help="fill the cache for a folder")
+    p_scan.add_argument("folder")
+    p_scan.add_argument("--recursive", action="store_true")
+    p_scan.add_argument("--workers", type=int, default=DEFAULT_METADATA_WORKERS)
+    args = parser.parse_args(argv)
+
+    cache = get_metadata_cache()
+    if args.command == "show":
+        print(json.dumps({path: cache.get(path) for path in args.files}, indent=2))
+        return 0
+    if not os.path.isdir(args.folder):
+        print(f"No such folder: {args.folder}")
+        return 1
+    started = time.monotonic()
+    seen, read = cache.prefetch(_files_in(args.folder, args.recursive), workers=args.workers)
+    print(f"Scanned {seen} file(s), read {read} header(s) in {time.monotonic() - started:.1f}s.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,214 @@
+# move_log.py
+"""
+Compact containers for very large organize runs.
+
+A plan or undo log with millions of entries used to hold a tuple and two or
+three full path strings per file, which costs several hundred bytes each. Here
+the data is stored column-wise instead:
+    - file names are packed as UTF-8 into one bytearray, with end offsets in an array
+    - folders and categories are interned once and referenced by integer id
+    - destinations are kept relative to the organized folder
+
+PlanItems holds the (filename, category) pairs of a plan. MoveLog holds the
+(dest, src) pairs of performed moves and behaves like the list it replaces
+(append, extend, len, iteration, reversed), so undo and the journal work
+unchanged. A log filled from a plan references the plan's file names instead of
+copying them. Entries are decoded back into strings only when read.
+
+Run tools/bench_memory.py to measure peak memory for a large plan.
+"""
+import os
+import threading
+from array import array
+
+# undecodable file names (surrogate escapes, lone surrogates) round-trip unchanged
+_ENCODING = "utf-8"
+_ERRORS = "surrogatepass"
+
+
+class _StringColumn:
+    """
+    Append-only list of strings packed into one buffer.
+    """
+    __slots__ = ("_data", "_ends")
+
+    def __init__(self):
+        self._data = bytearray()
+        self._ends = array("I")  # widened to 64-bit offsets past 4 GiB of names
+
+    def _widen_for(self, end):
+        if end > 0xFFFFFFFF and self._ends.typecode == "I":
+            self._ends = array("Q", self._ends)
+
+    def append(self, s):
+        self._data += s.encode(_ENCODING, _ERRORS)
+        self._widen_for(len(self._data))
+        self._ends.append(len(self._data))
+
+    def extend_column(self, other):
+        base = len(self._data)
+        self._data += other._data
+        self._widen_for(len(self._data))
+        self._ends.extend(end + base for end in other._ends)
+
+    def __getitem__(self, i):
+        start = self._ends[i - 1] if i else 0
+        return self._data[start:self._ends[i]].decode(_ENCODING, _ERRORS)
+
+    def __len__(self):
+        return len(self._ends)
+
+
+class _Interner:
+    """
+    Maps repeated strings (folders, categories) to small integer ids.
+    """
+    __slots__ = ("values", "_ids")
+
+    def __init__(self):
+        self.values = []
+        self._ids = {}
+
+    def intern(self, value):
+        idx = self._ids.get(value)
+        if idx is None:
+            idx = self._ids[value] = len(self.values)
+            self.values.append(value)
+        return idx
+
+
+class PlanItems:
+    """
+    (filename, category) pairs for organize_files, for files at the root of one folder.
+    """
+    __slots__ = ("_names", "_category_ids", "_categories")
+
+    def __init__(self):
+        self._names = _StringColumn()
+        self._category_ids = array("H")
+        self._categories = _Interner()
+
+    def append(self, filename, category):
+        self._names.append(filename)
+        self._category_ids.append(self._categories.intern(category))
+
+    def name(self, index):
+        return self._names[index]
+
+    def __len__(self):
+        return len(self._names)
+
+    def __iter__(self):
+        categories = self._categories.values
+        for i in range(len(self._names)):
+            yield self._names[i], categories[self._category_ids[i]]
+
+
+class MoveLog:
+    """
+    (dest, src) pairs of performed moves, in order. Safe to append from several threads.
+    File names live in name columns: the log's own, or a PlanItems' column it
+    references, so a run's names are not stored twice.
+    """
+    __slots__ = ("_roots", "_dirs", "_root_ids", "_dir_ids", "_columns", "_col_ids", "_name_idx", "_renamed", "_lock")
+
+    def __init__(self, moves=()):
+        self._roots = _Interner()  # folder each file came from
+        self._dirs = _Interner()  # destination folder, relative to the root when inside it
+        self._root_ids = array("I")
+        self._dir_ids = array("I")
+        self._columns = [_StringColumn()]  # name columns; [0] is owned by this log
+        self._col_ids = array("I")
+        self._name_idx = array("I")  # source file name = self._columns[col_id][name_idx]
+        self._renamed = {}  # index -> destination name, only when it differs (duplicates)
+        self._lock = threading.Lock()
+        self.extend(moves)
+
+    def _column_id(self, column):
+        for i, c in enumerate(self._columns):
+            if c is column:
+                return i
+        self._columns.append(column)
+        return len(self._columns) - 1
+
+    def _add(self, root, dest, name, col_id, name_idx):
+        dest_dir, dest_name = os.path.split(dest)
+        if dest_dir == root:
+            rel_dir = ""
+        elif dest_dir.startswith(root + os.sep):
+            rel_dir = dest_dir[len(root) + 1:]
+        else:
+            rel_dir = dest_dir  # absolute; os.path.join(root, rel_dir) returns it as is
+        if dest_name != name:
+            self._renamed[len(self._name_idx)] = dest_name
+        self._root_ids.append(self._roots.intern(root))
+        self._dir_ids.append(self._dirs.intern(rel_dir))
+        self._col_ids.append(col_id)
+        self._name_idx.append(name_idx)
+
+    def append(self, move):
+        dest, src = move
+        root, name = os.path.split(src)
+        with self._lock:
+            own = self._columns[0]
+            own.append(name)
+            self._add(root, dest, name, 0, len(own) - 1)
+
+    def append_planned(self, plan, index, dest, root):
+        """
+        Record the move of plan entry `index` (a file at the root of `root`) to dest,
+        referencing the plan's copy of the file name.
+        """
+        with self._lock:
+            self._add(root, dest, plan.name(index), self._column_id(plan._names), index)
+
+    def extend(self, moves):
+        if isinstance(moves, MoveLog):
+            self._extend_log(moves)
+            return
+        for move in moves:
+            self.append(move)
+
+    def _extend_log(self, other):
+        # merge columns directly instead of decoding every entry
+        with self._lock:
+            base = len(self._name_idx)
+            root_map = [self._roots.intern(r) for r in other._roots.values]
+            dir_map = [self._dirs.intern(d) for d in other._dirs.values]
+            col_map = [self._column_id(c) for c in other._columns]
+            self._root_ids.extend(root_map[i] for i in other._root_ids)
+            self._dir_ids.extend(dir_map[i] for i in other._dir_ids)
+            self._col_ids.extend(col_map[i] for i in other._col_ids)
+            self._name_idx.extend(other._name_idx)
+            for idx, name in other._renamed.items():
+                self._renamed[base + idx] = name
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self._name_idx)
+        root = self._roots.values[self._root_ids[i]]
+        name = self._columns[self._col_ids[i]][self._name_idx[i]]
+        rel_dir = self._dirs.values[self._dir_ids[i]]
+        dest_dir = os.path.join(root, rel_dir) if rel_dir else root
+        return os.path.join(dest_dir, self._renamed.get(i, name)), os.path.join(root, name)
+
+    def __len__(self):
+        return len(self._name_idx)
+
+    def __iter__(self):
+        for i in range(len(self._name_idx)):
+            yield self[i]
+
+    def __reversed__(self):
+        for i in range(len(self._name_idx) - 1, -1, -1):
+            yield self[i]
+
+    # the lock is not picklable; batch worker processes send their logs back to the parent
+    def __getstate__(self):
+        return (self._roots, self._dirs, self._root_ids, self._dir_ids, self._columns, self._col_ids, self._name_idx,
+                self._renamed)
+
+    def __setstate__(self, state):
+        (self._roots, self._dirs, self._root_ids, self._dir_ids, self._columns, self._col_ids, self._name_idx,
+         self._renamed) = state
+        self._lock = threading.Lock()
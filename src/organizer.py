@@ -1,9 +1,17 @@
 import os
+import errno
 import shutil
+import itertools
 import mimetypes
+from array import array
+from catalog import new_session_id
+from sharding import category_destination
+from io_governor import throttle, PRIORITY_BULK
+from move_log import MoveLog, PlanItems
+from journal import GROUP_SIZE
 
 # keep last moves for undo; external modules will use these functions
-_last_moves = []
+_last_moves = MoveLog()
 SENTINEL_FILENAME = "AUTO-ORGANIZER-WATCH - This folder is under watch of auto organizer (delete this to stop auto organization).txt"
 
 def _resolve_duplicate(dest_path):
@@ -23,6 +31,26 @@ def _resolve_duplicate(dest_path):
         n += 1
 
 
+def _move_no_replace(src, dest):
+    """
+    Move src to dest, raising FileExistsError rather than replacing a file that
+    appeared at dest in the meantime (os.rename silently replaces on POSIX).
+    On one volume this is a hard link plus unlink, which cannot replace anything;
+    where that is not possible (another volume, no hard links) dest is checked
+    again right before shutil.move.
+    """
+    try:
+        os.link(src, dest, follow_symlinks=False)
+    except FileExistsError:
+        raise
+    except (OSError, NotImplementedError):
+        if os.path.lexists(dest):
+            raise FileExistsError(errno.EEXIST, "Destination already exists", dest)
+        shutil.move(src, dest)
+        return
+    os.unlink(src)
+
+
 def _guess_ext_by_mime(file_path):
     """
     If a file lacks an extension, try to guess one from its mime type.
@@ -43,57 +71,66 @@ def _guess_ext_by_mime(file_path):
     return ""
 
 
-def organize_folder(folder_path, categories_dict, selected_categories=None, log_func=print, progress_func=None, dry_run=False):
+def plan_folder(folder_path, categories_dict, selected_categories=None):
     """
-    Organize files in folder_path using categories_dict (name -> [exts]).
-    selected_categories: list/set of category names to include. If None, include all.
-    log_func(message) used for app logs (gui or CLI).
-    progress_func(processed, total) used to update progress UI; may be None.
-    dry_run: if True, don't actually move files; only log planned moves.
+    (filename, category) of every file at the root of folder_path that belongs to a
+    selected category, as a move_log.PlanItems.
     """
-    global _last_moves
-    _last_moves = []
-
     if selected_categories is None:
         selected_categories = set(categories_dict.keys())
     else:
         selected_categories = set(selected_categories)
 
-    # Build a flat list of files in the root of folder_path (do not descend)
-    # Skip files already inside any category folder.
-    category_folder_names = set(name for name in categories_dict.keys())
-    files = []
-    for entry in os.listdir(folder_path):
-        full = os.path.join(folder_path, entry)
-        if os.path.isfile(full):
-            if entry == SENTINEL_FILENAME:
+    # extension -> first category listing it
+    ext_to_category = {}
+    for cat, exts in categories_dict.items():
+        for e in exts:
+            ext_to_category.setdefault(e.lower(), cat)
+    fallback = "Others" if "Others" in categories_dict else None
+
+    # One pass over the root of folder_path (do not descend); category folders are
+    # directories and are skipped. The plan is stored compactly (see move_log.py).
+    candidates = PlanItems()
+    with os.scandir(folder_path) as it:
+        for entry in it:
+            f = entry.name
+            # skip the sentinel and hidden files
+            if f == SENTINEL_FILENAME or f.startswith(".") or not entry.is_file():
                 continue
-            files.append(entry)
-
-    # Filter and prepare list of candidate moves
-    candidates = []
-    for f in files:
-        # skip files that are in category folders (they're at root so this check isn't needed,
-        # but we also skip if filename matches a category folder name or hidden files)
-        if f.startswith("."):
-            continue
-        ext = os.path.splitext(f)[1].lower()
-        if ext == "":
-            ext = _guess_ext_by_mime(os.path.join(folder_path, f))
-        # find category for this extension
-        category = None
-        for cat, exts in categories_dict.items():
-            if ext in map(str.lower, exts):
-                category = cat
-                break
-        if not category:
-            category = "Others" if "Others" in categories_dict else None
-
-        if category and category in selected_categories:
-            # ensure we don't try to move a file already in a folder with that name
-            # (since we are operating at root, it's safe; this is a precaution)
-            candidates.append((f, ext, category))
+            ext = os.path.splitext(f)[1].lower()
+            if ext == "":
+                ext = _guess_ext_by_mime(entry.path)
+            category = ext_to_category.get(ext, fallback)
+            if category and category in selected_categories:
+                candidates.append(f, category)
+    return candidates
+
 
+def organize_folder(folder_path, categories_dict, selected_categories=None, log_func=print, progress_func=None, dry_run=False,
+                    catalog=None, sharding=None, governor=None, journal=None, mode="move", view_root=None, session=None):
+    """
+    Organize files in folder_path using categories_dict (name -> [exts]).
+    selected_categories: list/set of category names to include. If None, include all.
+    log_func(message) used for app logs (gui or CLI).
+    progress_func(processed, total) used to update progress UI; may be None.
+    dry_run: if True, don't actually move files; only log planned moves.
+    catalog: optional catalog.Catalog that records every placed file.
+    sharding: optional sharding.ShardingConfig; large category folders get subfolders.
+    governor: optional io_governor.IOGovernor; moves run at bulk priority.
+    journal: optional journal.MoveJournal; moves are journaled a group at a time as they happen.
+    session: journal/catalog session id; a new "manual" session by default.
+    mode: "move" (default) or "view": leave the files in place and sync a view of
+    category folders of links under view_root instead (see views.py). Views need no undo.
+    """
+    global _last_moves
+    if mode == "view":
+        import views  # views builds on plan_folder
+        views.get_view(folder_path, view_root).rebuild(categories_dict, selected_categories, dry_run=dry_run,
+                                                       progress_func=progress_func, log_func=log_func)
+        return
+    _last_moves = MoveLog()
+
+    candidates = plan_folder(folder_path, categories_dict, selected_categories)
     total = len(candidates)
     if total == 0:
         log_func("No files to organize (based on selected categories).")
@@ -101,44 +138,195 @@ def organize_folder(folder_path, categories_dict, selected_categories=None, log_
             progress_func(0, 0)
         return
 
-    processed = 0
-    for idx, (filename, ext, category) in enumerate(candidates, start=1):
-        src = os.path.join(folder_path, filename)
-        dest_folder = os.path.join(folder_path, category)
-        os.makedirs(dest_folder, exist_ok=True)
-        dest = os.path.join(dest_folder, filename)
-        dest = _resolve_duplicate(dest)  # ensure no overwrite
+    moves = organize_files(folder_path, candidates, log_func=log_func, progress_func=progress_func, dry_run=dry_run,
+                           catalog=catalog, sharding=sharding, governor=governor, journal=journal, session=session)
+    # adopt the run's log instead of copying it, unless a watcher recorded moves meanwhile
+    if len(_last_moves):
+        _last_moves.extend(moves)
+    else:
+        _last_moves = moves
+
+    # done
+    if dry_run:
+        log_func("Dry-run complete. No files were moved.")
+    else:
+        log_func("Organization complete.")
+
+
+class _DestIndex:
+    """
+    Names already present in destination folders, used to pick non-clashing names.
+    A folder receiving many files is listed once; for a handful of files a few
+    existence checks are cheaper than listing a huge category folder.
+    Source names in one folder are unique, so only the ' (n)' names handed out
+    need remembering, not every claimed name.
+    """
+    LIST_THRESHOLD = 64
+
+    def __init__(self, expected_per_dir, src_dir):
+        self.expected = expected_per_dir
+        self.src_dir = src_dir
+        self.names = {}  # dest dir -> set of names (only for listed folders)
+        self.renamed = {}  # dest dir -> ' (n)' names handed out during this batch
+
+    def _listed(self, dest_dir):
+        if dest_dir not in self.names:
+            try:
+                self.names[dest_dir] = set(os.listdir(dest_dir))
+            except OSError:
+                self.names[dest_dir] = set()
+        return self.names[dest_dir]
+
+    def _exists(self, dest_dir, name):
+        if name in self.renamed.get(dest_dir, ()):
+            return True
+        if self.expected.get(dest_dir, 0) >= self.LIST_THRESHOLD:
+            return name in self._listed(dest_dir)
+        return os.path.exists(os.path.join(dest_dir, name))
+
+    def claim(self, dest_dir, filename):
+        """
+        Return a free path for filename in dest_dir, appending ' (n)' like _resolve_duplicate.
+        """
+        name = filename
+        if self._exists(dest_dir, name):
+            base, ext = os.path.splitext(filename)
+            n = 1
+            while self._candidate_taken(dest_dir, f"{base} ({n}){ext}"):
+                n += 1
+            name = f"{base} ({n}){ext}"
+            self.renamed.setdefault(dest_dir, set()).add(name)
+        return os.path.join(dest_dir, name)
+
+    def taken(self, dest_path):
+        """
+        Record that dest_path, handed out by claim(), was created by someone else
+        during the batch; the next claim() for that name picks another one.
+        """
+        dest_dir, name = os.path.split(dest_path)
+        self.renamed.setdefault(dest_dir, set()).add(name)
+        if dest_dir in self.names:
+            self.names[dest_dir].add(name)
+
+    def _candidate_taken(self, dest_dir, name):
+        # a ' (n)' name may also belong to a file of this batch, already moved or still waiting
+        return (self._exists(dest_dir, name) or os.path.exists(os.path.join(dest_dir, name))
+                or os.path.exists(os.path.join(self.src_dir, name)))
+
+
+def organize_files(folder_path, items, log_func=print, progress_func=None, dry_run=False, catalog=None, sharding=None,
+                   governor=None, priority=PRIORITY_BULK, journal=None, session=None):
+    """
+    Bulk move path shared by organize_folder and the watcher's batch mode.
+    items: [(filename, category), ...] (or a move_log.PlanItems) for files at the root
+    of folder_path; it is iterated more than once.
+    Destination folders are created once, new names are resolved against a
+    per-batch index, and moves are written to `journal` a group at a time:
+    intents before a group is moved, done records after.
+    Returns a MoveLog of the (dest, src) moves performed (empty for dry runs).
+    """
+    if session is None:
+        session = new_session_id("manual")
+    total = len(items)
+    if dry_run and sharding is not None:
+        sharding = sharding.preview()  # plan shards without writing markers or counts
+
+    # plan: destination folder of every file (sharding may split a category),
+    # kept as one small id per file
+    dest_folders = []
+    dest_ids = {}
+    planned = array("I")
+    expected_per_dir = {}
+    if sharding is not None:
+        sharding.prefetch_metadata(folder_path, items)  # capture/camera shards read file headers
+    for filename, category in items:
+        dest_folder = category_destination(folder_path, category, filename, os.path.join(folder_path, filename), sharding)
+        dest_id = dest_ids.get(dest_folder)
+        if dest_id is None:
+            dest_id = dest_ids[dest_folder] = len(dest_folders)
+            dest_folders.append(dest_folder)
+        planned.append(dest_id)
+        expected_per_dir[dest_folder] = expected_per_dir.get(dest_folder, 0) + 1
+
+    if not dry_run:
+        for dest_folder in expected_per_dir:
+            os.makedirs(dest_folder, exist_ok=True)
+
+    index = _DestIndex(expected_per_dir, folder_path)
+    moves = MoveLog()
+    plan_backed = isinstance(items, PlanItems)  # the log can share the plan's file names
+    entries = enumerate(zip(items, planned), start=1)
+    while True:
+        # journal GROUP_SIZE files at a time: intents before the moves, done records after
+        group = []
+        for idx, ((filename, category), dest_id) in itertools.islice(entries, GROUP_SIZE):
+            dest_folder = dest_folders[dest_id]
+            group.append((idx, filename, category, dest_folder, index.claim(dest_folder, filename)))  # ensure no overwrite
+        if not group:
+            break
 
         if dry_run:
-            log_func(f"[DRY RUN] Would move: {filename} -> {category}/{os.path.basename(dest)}")
-            # do not record moves in dry-run
-        else:
+            for idx, filename, category, dest_folder, dest in group:
+                log_func(f"[DRY RUN] Would move: {filename} -> {os.path.relpath(dest, folder_path).replace(os.sep, '/')}")
+                # do not record moves in dry-run
+                if progress_func:
+                    progress_func(idx, total)
+            continue
+
+        if journal is not None:
+            journal.intend([(dest, os.path.join(folder_path, filename)) for _, filename, _, _, dest in group], session)
+        done = []
+        for idx, filename, category, dest_folder, dest in group:
+            src = os.path.join(folder_path, filename)
             try:
-                shutil.move(src, dest)
-                _last_moves.append((dest, src))
-                log_func(f"Moved: {filename} -> {category}/{os.path.basename(dest)}")
+                throttle(governor, folder_path, src, dest_folder, priority)
+                while True:
+                    try:
+                        _move_no_replace(src, dest)
+                        break
+                    except FileExistsError:
+                        # the name was taken while the batch ran (watcher, user): pick another
+                        index.taken(dest)
+                        dest = index.claim(dest_folder, filename)
+                        if journal is not None:
+                            journal.intend([(dest, src)], session)
+                done.append((dest, src))
+                rel_dest = os.path.relpath(dest, folder_path).replace(os.sep, "/")
+                if plan_backed:
+                    moves.append_planned(items, idx - 1, dest, folder_path)
+                else:
+                    moves.append((dest, src))
+                if catalog is not None:
+                    catalog.record(dest, category, folder_path, session)
+                log_func(f"Moved: {filename} -> {rel_dest}")
             except Exception as e:
                 log_func(f"Error moving {filename}: {e}")
 
-        processed = idx
-        if progress_func:
-            progress_func(processed, total)
+            if progress_func:
+                progress_func(idx, total)
+        if journal is not None:
+            journal.append_batch(done, session)
 
-    # done
-    if dry_run:
-        log_func("Dry-run complete. No files were moved.")
-    else:
-        log_func("Organization complete.")
+    return moves
 
 
-def undo_last_organization(log_func=print):
+def undo_last_organization(log_func=print, catalog=None, journal=None):
     """
     Move files back in reverse order of moves recorded in _last_moves.
+    catalog: optional catalog.Catalog to drop undone files from.
+    journal: optional journal.MoveJournal; undone moves are recorded in it, and when
+    nothing was moved in this process (e.g. after a restart) its last session is undone.
     """
     global _last_moves
+    if not _last_moves and journal is not None:
+        session, moves = journal.last_session()
+        if moves:
+            log_func(f"Undoing session {session} from the journal.")
+            _last_moves = MoveLog(moves)
     if not _last_moves:
         log_func("Nothing to undo.")
         return
+    undone = []
     # reverse order
     for dest, original in reversed(_last_moves):
         if os.path.exists(dest):
@@ -146,11 +334,21 @@ def undo_last_organization(log_func=print):
                 # ensure original dir exists
                 orig_dir = os.path.dirname(original)
                 os.makedirs(orig_dir, exist_ok=True)
-                shutil.move(dest, original)
+                _move_no_replace(dest, original)
+                undone.append((dest, original))
+                if catalog is not None:
+                    catalog.remove(dest)
                 log_func(f"Undo: {os.path.basename(dest)} -> {original}")
+            except FileExistsError:
+                log_func(f"Cannot undo {dest}: {original} exists again")
             except Exception as e:
                 log_func(f"Error undoing {dest}: {e}")
         else:
             log_func(f"File not found for undo: {dest}")
-    _last_moves = []
+    if journal is not None:
+        try:
+            journal.record_undone(undone)
+        except Exception as e:
+            log_func(f"Error writing undo journal: {e}")
+    _last_moves = MoveLog()
     log_func("Undo complete.")
@@ -0,0 +1,77 @@
+# pending_work.py
+"""
+Checkpoint of watcher work that was still queued at shutdown.
+
+When watchers are stopped with a deadline (quitting the app, stopping the engine),
+files that had not been moved yet - still debouncing, waiting for stability or
+queued for a batch flush - are recorded here per watched folder instead of being
+dropped. The next time a watcher starts on that folder it takes its entries back
+and re-submits the files that still exist, so they go through the normal
+pipeline (readiness, stability, classification) again.
+
+Stored in config/pending_work.json: {"<watched folder>": ["<file path>", ...]}.
+"""
+import os
+import threading
+
+from categories import CONFIG_DIR
+from config_store import ConfigStore
+
+PENDING_WORK_FILE = os.path.join(CONFIG_DIR, "pending_work.json")
+
+
+def valid_pending_work(data):
+    return isinstance(data, dict) and all(
+        isinstance(folder, str) and isinstance(paths, list) and all(isinstance(p, str) for p in paths)
+        for folder, paths in data.items())
+
+
+class PendingWork:
+    def __init__(self, path=PENDING_WORK_FILE, log_func=print):
+        self._store = ConfigStore(path, validate=valid_pending_work, indent=2, log_func=log_func)
+        self._lock = threading.Lock()
+        self._entries = self._store.load(default={})
+
+    def add(self, folder, paths):
+        """
+        Record unfinished files of `folder`; they are written out by flush() (or shortly after).
+        """
+        if not paths:
+            return
+        with self._lock:
+            known = self._entries.setdefault(folder, [])
+            known.extend(p for p in dict.fromkeys(paths) if p not in known)
+            self._store.save(self._entries)
+
+    def take(self, folder):
+        """
+        Remove and return the checkpointed files of `folder` that still exist.
+        """
+        with self._lock:
+            paths = self._entries.pop(folder, None)
+            if paths is None:
+                return []
+            self._store.save(self._entries)
+        return [p for p in paths if os.path.isfile(p)]
+
+    def count(self):
+        with self._lock:
+            return sum(len(paths) for paths in self._entries.values())
+
+    def flush(self):
+        self._store.flush()
+
+
+_default_pending_work = None
+_default_pending_work_lock = threading.Lock()
+
+
+def get_pending_work():
+    """
+    Process-wide checkpoint shared by all watchers.
+    """
+    global _default_pending_work
+    with _default_pending_work_lock:
+        if _default_pending_work is None:
+            _default_pending_work = PendingWork()
+        return _default_pending_work
@@ -0,0 +1,168 @@
+# polling_observer.py
+"""
+Lightweight polling observer for folders where native change notifications are
+unreliable (SMB/NFS shares).
+
+Compared to watchdog's generic PollingObserver it is built for one flat folder:
+- a snapshot is just {name: identity} from os.scandir, with no per-file stat calls:
+  the inode, or on Windows (where DirEntry.inode() costs a stat) the creation
+  time, mtime and size that scandir already returned;
+- the scan is skipped entirely while the directory's own mtime is unchanged
+  (adding, removing or renaming an entry always bumps it);
+- snapshots are diffed into created / deleted / moved (same identity) events; a
+  name whose identity changed (atomic save, re-created file) is reported again;
+- the interval tightens while the folder is active and backs off while idle.
+
+It implements the subset of the Observer API FolderWatcher uses:
+schedule(handler, path, recursive=False), start(), stop(), join(timeout).
+"""
+import os
+import time
+import threading
+from watchdog.events import FileCreatedEvent, FileDeletedEvent, FileMovedEvent
+
+# polling interval bounds (seconds)
+DEFAULT_MIN_POLL_INTERVAL = 1.0
+DEFAULT_MAX_POLL_INTERVAL = 10.0
+# multiplier applied after each poll that found nothing
+IDLE_BACKOFF_FACTOR = 1.5
+# network filesystems often store mtimes with coarse (up to 2s) precision; a directory
+# modified this recently is rescanned even if its mtime looks unchanged
+MTIME_GRANULARITY = 2.0
+
+
+if os.name == "nt":
+    def _identity(entry):
+        # inode() stats the file on Windows; stat() is served from the directory listing.
+        # A file being written changes identity too, which only repeats its created event.
+        st = entry.stat(follow_symlinks=False)
+        return st.st_ctime_ns, st.st_mtime_ns, st.st_size
+else:
+    def _identity(entry):
+        return entry.inode()  # cached by scandir
+
+
+def _snapshot(path):
+    """
+    Return {name: identity} for the regular files directly inside path.
+    """
+    snap = {}
+    with os.scandir(path) as it:
+        for entry in it:
+            try:
+                if entry.is_file(follow_symlinks=False):
+                    snap[entry.name] = _identity(entry)
+            except OSError:
+                continue
+    return snap
+
+
+def _diff(path, old, new):
+    """
+    Turn two snapshots into watchdog events. An entry that vanished and one that
+    appeared with the same identity are reported as a single move. A name that now
+    belongs to another file (replaced by a rename or re-created between polls)
+    counts as appeared: created, or moved from the replacing file's old name.
+    """
+    created = [n for n, identity in new.items() if n not in old or old[n] != identity]
+    deleted = [n for n in old if n not in new]
+    if not created and not deleted:
+        return []
+
+    events = []
+    deleted_by_identity = {old[n]: n for n in deleted if old[n]}
+    moved_from = set()
+    for name in created:
+        src = deleted_by_identity.get(new[name])
+        if src is not None and src not in moved_from:
+            moved_from.add(src)
+            events.append(FileMovedEvent(os.path.join(path, src), os.path.join(path, name)))
+        else:
+            events.append(FileCreatedEvent(os.path.join(path, name)))
+    for name in deleted:
+        if name not in moved_from:
+            events.append(FileDeletedEvent(os.path.join(path, name)))
+    return events
+
+
+class ScandirPollingObserver:
+    """
+    Polls one folder on a background thread and dispatches events to its handler.
+    """
+
+    def __init__(self, min_interval=DEFAULT_MIN_POLL_INTERVAL, max_interval=DEFAULT_MAX_POLL_INTERVAL):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = min_interval
+        self._handler = None
+        self._path = None
+        self._snapshot = {}
+        self._dir_mtime = None
+        self._last_scan = 0.0
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def schedule(self, event_handler, path, recursive=False):
+        if recursive:
+            raise ValueError("ScandirPollingObserver only watches a single folder (recursive=False).")
+        self._handler = event_handler
+        self._path = os.path.abspath(path)
+
+    def start(self):
+        if self._handler is None:
+            raise RuntimeError("schedule() must be called before start().")
+        # files already present are not reported, same as the native observer
+        self._dir_mtime = os.stat(self._path).st_mtime
+        self._snapshot = _snapshot(self._path)
+        self._last_scan = time.time()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def join(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def is_alive(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _needs_scan(self):
+        try:
+            mtime = os.stat(self._path).st_mtime
+        except OSError:
+            return False  # share unreachable; try again next interval
+        if mtime != self._dir_mtime:
+            self._dir_mtime = mtime
+            return True
+        # mtime may not have ticked yet for changes within the filesystem's precision
+        return self._last_scan - mtime < MTIME_GRANULARITY
+
+    def poll_once(self):
+        """
+        Run one poll cycle. Returns the number of events dispatched.
+        """
+        if not self._needs_scan():
+            return 0
+        scan_started = time.time()
+        try:
+            new = _snapshot(self._path)
+        except OSError:
+            return 0
+        events = _diff(self._path, self._snapshot, new)
+        self._snapshot = new
+        self._last_scan = scan_started
+        for event in events:
+            try:
+                self._handler.dispatch(event)
+            except Exception:
+                pass
+        return len(events)
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            if self.poll_once():
+                self.interval = self.min_interval
+            else:
+                self.interval = min(self.max_interval, self.interval * IDLE_BACKOFF_FACTOR)
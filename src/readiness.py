@@ -0,0 +1,182 @@
+# readiness.py
+"""
+Pluggable "is this file finished?" checks used by the watcher before moving a file.
+
+A readiness check is a callable `check(path)` returning:
+    False -> something is still writing to it
+    None  -> no writer was seen, or the check cannot tell (unsupported platform,
+             no permission, network filesystem, ...)
+
+Not seeing a writer proves nothing: processes of other users, clients writing
+over SMB/NFS and writers that reopen the file for every chunk are invisible. So
+the only proof that a file is complete is its size holding still
+(file_watcher._wait_for_stable_file); a False from any check keeps the watcher
+waiting even when the size looks settled.
+"""
+import os
+import sys
+import time
+import threading
+
+try:
+    import fcntl  # POSIX only
+except ImportError:
+    fcntl = None
+
+# how long a /proc scan of one directory is reused (seconds)
+DEFAULT_PROC_SCAN_TTL = 0.25
+
+# checks used by the watcher when none are given explicitly
+DEFAULT_READINESS = ("open_handles", "lock")
+
+# O_ACCMODE bits in /proc/<pid>/fdinfo "flags" (O_WRONLY=1, O_RDWR=2)
+_ACCMODE = 0o3
+
+
+class OpenWriterScanner:
+    """
+    Finds files that some process holds open for writing by scanning /proc/*/fd.
+    Results are cached per directory for `ttl` seconds, so a burst of files in
+    the same folder pays for a single scan.
+    Only processes we are allowed to inspect are seen, so an empty result means
+    "no writer seen", never "no writer": this check returns False or None, never True.
+    """
+
+    def __init__(self, ttl=DEFAULT_PROC_SCAN_TTL):
+        self.ttl = ttl
+        self._cache = {}  # dirpath -> (monotonic time, set of paths open for writing)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def available():
+        return sys.platform.startswith("linux") and os.path.isdir("/proc/self/fd")
+
+    def _scan(self, dirpath):
+        writers = set()
+        prefix = dirpath.rstrip(os.sep) + os.sep
+        try:
+            pids = [p for p in os.listdir("/proc") if p.isdigit()]
+        except OSError:
+            return writers
+        for pid in pids:
+            fd_dir = f"/proc/{pid}/fd"
+            try:
+                fds = os.listdir(fd_dir)
+            except OSError:
+                continue  # process exited or belongs to another user
+            for fd in fds:
+                try:
+                    target = os.readlink(os.path.join(fd_dir, fd))
+                except OSError:
+                    continue
+                # cheap filter first: only files directly inside dirpath
+                if not target.startswith(prefix) or os.sep in target[len(prefix):]:
+                    continue
+                try:
+                    with open(f"/proc/{pid}/fdinfo/{fd}", "r") as f:
+                        for line in f:
+                            if line.startswith("flags:"):
+                                flags = int(line.split()[1], 8)
+                                if flags & _ACCMODE:
+                                    writers.add(target)
+                                break
+                except (OSError, ValueError):
+                    continue
+        return writers
+
+    def writers_in(self, dirpath):
+        now = time.monotonic()
+        with self._lock:
+            cached = self._cache.get(dirpath)
+            if cached and now - cached[0] < self.ttl:
+                return cached[1]
+        writers = self._scan(dirpath)
+        with self._lock:
+            self._cache[dirpath] = (time.monotonic(), writers)
+        return writers
+
+    def __call__(self, path):
+        if not self.available():
+            return None
+        path = os.path.realpath(path)
+        return False if path in self.writers_in(os.path.dirname(path)) else None
+
+
+def advisory_lock_check(path):
+    """
+    False if another process holds an exclusive lock on the file, else None.
+    On POSIX this probes flock(); on Windows a writer that denies sharing makes
+    the open fail with PermissionError.
+    An unlocked file proves nothing, so this never returns True.
+    """
+    if fcntl is None:
+        try:
+            # append mode without writing leaves the file untouched
+            with open(path, "ab"):
+                pass
+        except PermissionError:
+            return False
+        except OSError:
+            return None
+        return None
+
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return None
+    try:
+        fcntl.flock(fd, fcntl.LOCK_SH | fcntl.LOCK_NB)
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    except BlockingIOError:
+        return False
+    except OSError:
+        return None
+    finally:
+        os.close(fd)
+    return None
+
+
+# name -> check; "open_handles" shares one scanner (and its cache) process-wide
+READINESS_STRATEGIES = {
+    "open_handles": OpenWriterScanner(),
+    "lock": advisory_lock_check,
+}
+
+
+def resolve_checks(checks):
+    """
+    Turn a list of strategy names and/or callables into a tuple of callables.
+    """
+    if not checks:
+        return ()
+    resolved = []
+    for check in checks:
+        if callable(check):
+            resolved.append(check)
+        elif check in READINESS_STRATEGIES:
+            resolved.append(READINESS_STRATEGIES[check])
+        else:
+            raise ValueError(f"Unknown readiness strategy: {check}")
+    return tuple(resolved)
+
+
+def ready_verdict(path, checks):
+    """
+    False if any of `checks` sees the file being written, otherwise None.
+    A True from a check is ignored: only size stability proves a file complete.
+    """
+    for check in checks:
+        try:
+            result = check(path)
+        except Exception:
+            result = None
+        if result is False:
+            return False
+    return None
+
+
+def is_busy(path, checks):
+    """
+    True if a readiness check sees a writer on path.
+    """
+    return bool(checks) and ready_verdict(path, checks) is False
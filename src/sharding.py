@@ -0,0 +1,307 @@
+# sharding.py
+"""
+Optional per-category sharding for very large category folders.
+
+Once a category folder holds `threshold` files, new files go into subfolders
+instead of the category root:
+    date    -> Images/2024/05         (from the file's modification time)
+    capture -> Images/2024/05         (capture/recording date from the file header, see
+                                       metadata.py; modification time if there is none)
+    camera  -> Images/Canon EOS R5    (camera make and model, "Unknown camera" otherwise)
+    hash    -> Documents/3f           (first byte of an md5 of the file name, 256 shards)
+    alpha   -> Documents/r            (first letter/digit of the name, "_" otherwise)
+
+The shard is computed from the file alone, never by listing the target folder.
+Files headed for a capture/camera shard have their headers read ahead of the
+moves on a pool of threads (prefetch_metadata), and the results are cached.
+Whether a category folder is sharded is recorded by a marker file inside it, so
+the check costs one stat. Until the marker exists, the folder's file count is
+taken once per process and then kept up to date in memory.
+
+Policies live in config/sharding.json: {"Images": {"mode": "date", "threshold": 20000}}.
+A threshold of 0 shards from the first file, e.g. to always sort photos by capture date.
+
+CLI:
+    python sharding.py show
+    python sharding.py set CATEGORY --mode date|capture|camera|hash|alpha [--threshold N]
+    python sharding.py unset CATEGORY
+    python sharding.py rebalance FOLDER CATEGORY [--dry-run]   # move existing files into shards
+"""
+import os
+import re
+import sys
+import json
+import time
+import shutil
+import hashlib
+import argparse
+import threading
+
+from categories import CONFIG_DIR
+from config_store import atomic_write_json
+from metadata import get_metadata_cache
+
+SHARDING_FILE = os.path.join(CONFIG_DIR, "sharding.json")
+SHARD_MODES = ("date", "capture", "camera", "hash", "alpha")
+# modes that read the file header (metadata.py)
+METADATA_MODES = ("capture", "camera")
+UNKNOWN_CAMERA = "Unknown camera"
+DEFAULT_SHARD_THRESHOLD = 10000
+# marker placed in a category folder once it is sharded
+SHARD_MARKER = ".sharded"
+
+
+class ShardPolicy:
+    def __init__(self, mode, threshold=DEFAULT_SHARD_THRESHOLD):
+        if mode not in SHARD_MODES:
+            raise ValueError(f"Unknown shard mode: {mode}")
+        self.mode = mode
+        self.threshold = int(threshold)
+
+    def to_dict(self):
+        return {"mode": self.mode, "threshold": self.threshold}
+
+    def shard_for(self, filename, src_path=None):
+        """
+        Relative shard folder for a file, e.g. '2024/05', 'Canon EOS R5', '3f' or 'r'.
+        """
+        if self.mode == "capture":
+            date = _file_metadata(src_path)["date"]
+            if date:
+                # 'YYYY-MM...', or just 'YYYY' for files that only record a year
+                return os.path.join(date[:4], date[5:7]) if len(date) >= 7 else date[:4]
+        if self.mode == "camera":
+            camera = _file_metadata(src_path)["camera"]
+            return _folder_name(camera) if camera else UNKNOWN_CAMERA
+        if self.mode in ("date", "capture"):
+            try:
+                mtime = os.path.getmtime(src_path) if src_path else time.time()
+            except OSError:
+                mtime = time.time()
+            return time.strftime("%Y" + os.sep + "%m", time.localtime(mtime))
+        if self.mode == "hash":
+            return hashlib.md5(filename.lower().encode("utf-8")).hexdigest()[:2]
+        first = filename[:1].lower()
+        return first if first.isalnum() else "_"
+
+
+def _file_metadata(src_path):
+    if not src_path:
+        return {"date": None, "camera": None}
+    return get_metadata_cache().get(src_path)
+
+
+def _folder_name(text):
+    """
+    Camera name -> usable folder name.
+    """
+    name = re.sub(r'[<>:"/\\|?*\x00-\x1f]', "_", text).strip(" .")[:64]
+    return name or UNKNOWN_CAMERA
+
+
+class ShardingConfig:
+    """
+    Category name -> ShardPolicy, loaded from and saved to config/sharding.json.
+    Also tracks which category folders have passed their threshold.
+    """
+
+    def __init__(self, path=SHARDING_FILE):
+        self.path = path
+        self.policies = self._load()
+        self._counts = {}  # category dir -> file count (only for folders not yet sharded)
+        self._lock = threading.Lock()
+        self._read_only = False  # see preview()
+        self._marked = set()  # category dirs a preview treats as sharded
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return {cat: ShardPolicy(p["mode"], p.get("threshold", DEFAULT_SHARD_THRESHOLD)) for cat, p in data.items()}
+        except Exception:
+            return {}
+
+    def save(self):
+        atomic_write_json(self.path, {cat: p.to_dict() for cat, p in self.policies.items()}, indent=4)
+
+    def policy_for(self, category):
+        return self.policies.get(category)
+
+    # the lock guards _counts only; pickling (for batch worker processes) drops it
+    def __getstate__(self):
+        return {"path": self.path, "policies": self.policies}
+
+    def __setstate__(self, state):
+        self.path = state["path"]
+        self.policies = state["policies"]
+        self._counts = {}
+        self._lock = threading.Lock()
+        self._read_only = False
+        self._marked = set()
+
+    def preview(self):
+        """
+        Copy for dry runs: it plans exactly like this config, including folders that
+        pass their threshold during the run, but writes no marker and leaves this
+        config's counts alone.
+        """
+        clone = ShardingConfig.__new__(ShardingConfig)
+        clone.__setstate__(self.__getstate__())
+        with self._lock:
+            clone._counts = dict(self._counts)
+        clone._read_only = True
+        return clone
+
+    def _is_sharded(self, category_dir, policy):
+        if category_dir in self._marked or os.path.exists(os.path.join(category_dir, SHARD_MARKER)):
+            return True
+        with self._lock:
+            count = self._counts.get(category_dir)
+            if count is None:
+                # one listing per folder per process; afterwards we count placements
+                try:
+                    with os.scandir(category_dir) as it:
+                        count = sum(1 for e in it if e.is_file(follow_symlinks=False))
+                except OSError:
+                    count = 0
+            if count < policy.threshold:
+                self._counts[category_dir] = count + 1  # the file about to be placed
+                return False
+            self._counts.pop(category_dir, None)
+            if self._read_only:
+                self._marked.add(category_dir)
+                return True
+        _write_marker(category_dir)
+        return True
+
+    def destination_dir(self, folder_path, category, filename, src_path=None):
+        """
+        Folder a file of `category` should be placed in (created by the caller).
+        """
+        category_dir = os.path.join(folder_path, category)
+        policy = self.policy_for(category)
+        if policy is None or not self._is_sharded(category_dir, policy):
+            return category_dir
+        return os.path.join(category_dir, policy.shard_for(filename, src_path))
+
+    def prefetch_metadata(self, folder_path, items):
+        """
+        Read the headers of the files a capture/camera policy will shard, on a pool
+        of threads, before they are placed one at a time.
+        items: [(filename, category), ...] for files at the root of folder_path.
+        """
+        categories = {cat for cat, p in self.policies.items() if p.mode in METADATA_MODES}
+        if categories:
+            get_metadata_cache().prefetch(os.path.join(folder_path, name) for name, category in items
+                                          if category in categories)
+
+
+def _write_marker(category_dir):
+    try:
+        os.makedirs(category_dir, exist_ok=True)
+        with open(os.path.join(category_dir, SHARD_MARKER), "w", encoding="utf-8") as f:
+            f.write("Files in this folder are sorted into subfolders by the file organizer.\n")
+    except OSError:
+        pass
+
+
+def category_destination(folder_path, category, filename, src_path=None, sharding=None):
+    """
+    Destination folder for a file, honouring `sharding` (a ShardingConfig) if given.
+    """
+    if sharding is None:
+        return os.path.join(folder_path, category)
+    return sharding.destination_dir(folder_path, category, filename, src_path)
+
+
+def rebalance(folder_path, category, policy, log_func=print, dry_run=False):
+    """
+    One-time tool: move the files at the root of folder_path/category into shard
+    subfolders and mark the folder as sharded. Returns the number of files moved.
+    """
+    from organizer import _resolve_duplicate  # organizer imports this module
+    category_dir = os.path.join(folder_path, category)
+    if not os.path.isdir(category_dir):
+        log_func(f"No such category folder: {category_dir}")
+        return 0
+
+    moved = 0
+    created = set()
+    with os.scandir(category_dir) as it:
+        entries = [e for e in it if e.is_file(follow_symlinks=False) and e.name != SHARD_MARKER]
+    if policy.mode in METADATA_MODES:
+        get_metadata_cache().prefetch(e.path for e in entries)
+    for entry in entries:
+        shard_dir = os.path.join(category_dir, policy.shard_for(entry.name, entry.path))
+        if dry_run:
+            log_func(f"[DRY RUN] Would move: {entry.name} -> {os.path.relpath(shard_dir, folder_path)}")
+            continue
+        if shard_dir not in created:
+            os.makedirs(shard_dir, exist_ok=True)
+            created.add(shard_dir)
+        dest = _resolve_duplicate(os.path.join(shard_dir, entry.name))
+        try:
+            shutil.move(entry.path, dest)
+            moved += 1
+        except Exception as e:
+            log_func(f"Error moving {entry.name}: {e}")
+    if not dry_run:
+        _write_marker(category_dir)
+        log_func(f"Rebalanced {moved} file(s) in {category_dir} into {len(created)} shard(s).")
+    return moved
+
+
+_default_config = None
+_default_config_lock = threading.Lock()
+
+
+def get_sharding_config():
+    """
+    Process-wide sharding configuration.
+    """
+    global _default_config
+    with _default_config_lock:
+        if _default_config is None:
+            _default_config = ShardingConfig()
+        return _default_config
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage sharding of large category folders.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("show", help="list sharding policies")
+    p_set = sub.add_parser("set", help="set a category's policy")
+    p_set.add_argument("category")
+    p_set.add_argument("--mode", choices=SHARD_MODES, required=True)
+    p_set.add_argument("--threshold", type=int, default=DEFAULT_SHARD_THRESHOLD)
+    p_unset = sub.add_parser("unset", help="remove a category's policy")
+    p_unset.add_argument("category")
+    p_reb = sub.add_parser("rebalance", help="move existing files into shards")
+    p_reb.add_argument("folder")
+    p_reb.add_argument("category")
+    p_reb.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args(argv)
+
+    config = ShardingConfig()
+    if args.command == "show":
+        if not config.policies:
+            print("No categories are sharded.")
+        for cat, p in config.policies.items():
+            print(f"{cat:<20} mode={p.mode:<6} threshold={p.threshold}")
+    elif args.command == "set":
+        config.policies[args.category] = ShardPolicy(args.mode, args.threshold)
+        config.save()
+    elif args.command == "unset":
+        config.policies.pop(args.category, None)
+        config.save()
+    else:
+        policy = config.policy_for(args.category)
+        if policy is None:
+            print(f"Category '{args.category}' has no sharding policy; use 'set' first.")
+            return 1
+        rebalance(args.folder, args.category, policy, dry_run=args.dry_run)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
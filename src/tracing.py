@@ -0,0 +1,212 @@
+# tracing.py
+"""
+Opt-in, sampled per-file tracing of the watcher pipeline.
+
+A sampled file gets a trace from the moment its first event arrives until it is
+moved (or dropped), with one span per pipeline step:
+    debounce -> filter -> readiness -> stability_wait -> classify -> batch_queue
+    -> destination -> throttle -> move
+Finished traces are kept in a bounded ring and exported in the Chrome trace
+event format, which chrome://tracing and https://ui.perfetto.dev open directly:
+one track per file, grouped by watched folder.
+
+Settings live in config/tracing.json: {"sample_rate": 0.01, "max_traces": 1000}.
+With the default sample_rate of 0 tracing is off. Unsampled files cost one
+random() call when their first event arrives, so a small rate can stay on.
+
+Export from a running engine with `python engine_service.py trace [OUT]`; the
+GUI and the engine also write config/trace.json when they shut down.
+"""
+import os
+import json
+import time
+import random
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+from categories import CONFIG_DIR
+
+TRACING_FILE = os.path.join(CONFIG_DIR, "tracing.json")
+TRACE_EXPORT_FILE = os.path.join(CONFIG_DIR, "trace.json")
+DEFAULT_SAMPLE_RATE = 0.0
+DEFAULT_MAX_TRACES = 1000
+# traces started but not finished; files beyond this are not sampled
+MAX_ACTIVE_TRACES = 10000
+
+
+class FileTrace:
+    """
+    Spans recorded for one file. Times are time.perf_counter() seconds.
+    """
+    __slots__ = ("path", "folder", "start", "end", "outcome", "spans")
+
+    def __init__(self, path, folder):
+        self.path = path
+        self.folder = folder
+        self.start = time.perf_counter()
+        self.end = None
+        self.outcome = None
+        self.spans = []  # (name, start, end, args)
+
+    def add(self, name, start, end=None, **args):
+        self.spans.append((name, start, time.perf_counter() if end is None else end, args))
+
+    def gap(self, name, **args):
+        """
+        Record the time since the previous span ended (e.g. waiting in a queue) as `name`.
+        """
+        self.add(name, self.spans[-1][2] if self.spans else self.start, **args)
+
+    @contextmanager
+    def span(self, name, **args):
+        start = time.perf_counter()
+        try:
+            yield args  # callers may add result details to args
+        finally:
+            self.add(name, start, **args)
+
+
+class _NoTrace:
+    """
+    Stand-in for unsampled files, so call sites need no checks.
+    """
+    __slots__ = ()
+
+    def add(self, name, start, end=None, **args):
+        pass
+
+    def gap(self, name, **args):
+        pass
+
+    @contextmanager
+    def span(self, name, **args):
+        yield args
+
+
+NO_TRACE = _NoTrace()
+
+
+class Tracer:
+    def __init__(self, sample_rate=DEFAULT_SAMPLE_RATE, max_traces=DEFAULT_MAX_TRACES):
+        self.sample_rate = float(sample_rate)
+        self._lock = threading.Lock()
+        self._active = {}  # path -> FileTrace
+        self._finished = deque(maxlen=max_traces)
+        self._epoch = time.perf_counter()
+        self._epoch_wall = time.time()
+
+    def enabled(self):
+        return self.sample_rate > 0
+
+    def begin(self, path, folder):
+        """
+        Start tracing `path` if it is sampled. A path already being traced keeps its trace.
+        """
+        if path in self._active or random.random() >= self.sample_rate:
+            return
+        with self._lock:
+            if path not in self._active and len(self._active) < MAX_ACTIVE_TRACES:
+                self._active[path] = FileTrace(path, folder)
+
+    def rename(self, old_path, new_path):
+        """
+        Carry a trace over a rename (foo.crdownload -> foo.pdf). Returns False if
+        old_path was not traced.
+        """
+        with self._lock:
+            trace = self._active.pop(old_path, None)
+            if trace is None:
+                return False
+            trace.path = new_path
+            self._active.setdefault(new_path, trace)
+            return True
+
+    def get(self, path):
+        """
+        The active trace for `path`, or NO_TRACE.
+        """
+        return self._active.get(path, NO_TRACE)
+
+    def finish(self, path, outcome):
+        with self._lock:
+            trace = self._active.pop(path, None)
+            if trace is None:
+                return
+            trace.end = time.perf_counter()
+            trace.outcome = outcome
+            self._finished.append(trace)
+
+    def discard_folder(self, folder):
+        """
+        Drop unfinished traces of a folder whose watcher stopped.
+        """
+        with self._lock:
+            for path in [p for p, t in self._active.items() if t.folder == folder]:
+                del self._active[path]
+
+    # --- export ---
+    def _us(self, t):
+        return round((t - self._epoch) * 1e6, 1)
+
+    def chrome_events(self):
+        """
+        Finished traces as Chrome trace events: pid = watched folder, tid = file.
+        """
+        with self._lock:
+            traces = list(self._finished)
+        events = []
+        pids = {}
+        for tid, trace in enumerate(traces, start=1):
+            pid = pids.get(trace.folder)
+            if pid is None:
+                pid = pids[trace.folder] = len(pids) + 1
+                events.append({"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": trace.folder}})
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid,
+                           "args": {"name": os.path.basename(trace.path)}})
+            events.append({"name": "file", "cat": "watcher", "ph": "X", "pid": pid, "tid": tid,
+                           "ts": self._us(trace.start), "dur": self._us(trace.end) - self._us(trace.start),
+                           "args": {"path": trace.path, "outcome": trace.outcome}})
+            for name, start, end, args in trace.spans:
+                events.append({"name": name, "cat": "watcher", "ph": "X", "pid": pid, "tid": tid,
+                               "ts": self._us(start), "dur": self._us(end) - self._us(start), "args": args})
+        return events
+
+    def export(self, path=TRACE_EXPORT_FILE):
+        """
+        Write finished traces to `path` as Chrome trace JSON. Returns the number of traces.
+        """
+        events = self.chrome_events()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms",
+                       "otherData": {"epoch": self._epoch_wall, "sample_rate": self.sample_rate}}, f)
+        return sum(1 for e in events if e["name"] == "file")
+
+
+def load_settings(path=TRACING_FILE):
+    """
+    Return (sample_rate, max_traces) from config/tracing.json; tracing is off by default.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return float(data.get("sample_rate", DEFAULT_SAMPLE_RATE)), int(data.get("max_traces", DEFAULT_MAX_TRACES))
+    except Exception:
+        return DEFAULT_SAMPLE_RATE, DEFAULT_MAX_TRACES
+
+
+_default_tracer = None
+_default_tracer_lock = threading.Lock()
+
+
+def get_tracer():
+    """
+    Process-wide tracer shared by all watchers.
+    """
+    global _default_tracer
+    with _default_tracer_lock:
+        if _default_tracer is None:
+            sample_rate, max_traces = load_settings()
+            _default_tracer = Tracer(sample_rate, max_traces)
+        return _default_tracer
@@ -0,0 +1,267 @@
+# views.py
+"""
+Zero-move "view" organization.
+
+Instead of moving files into category folders, a view leaves every file where it
+is and builds the category folders out of links:
+    Downloads/report.pdf            (the original, untouched)
+    Downloads/_Views/Documents/report.pdf  -> hardlink to it
+
+Hardlinks are used when the view is on the same volume as the files; across
+volumes (or where the filesystem has no hardlinks) symlinks are used instead.
+Other tools keep working with the original paths, and no file data is copied.
+
+The links a view created are listed in <view root>/.view.json, so a view only
+ever deletes its own links, never a file someone put into a view folder. It is
+kept up to date one file at a time by the watcher (policy "view"): link() when a
+file is ready, unlink() when it is deleted or renamed away. rebuild() syncs the
+whole view with the folder; it only creates or removes links whose target or
+category changed, so it costs a directory scan and a couple of stat calls per
+file and never reads file contents.
+
+    python views.py rebuild FOLDER [--view-root DIR] [--dry-run]
+    python views.py clear FOLDER [--view-root DIR]
+"""
+import os
+import sys
+import argparse
+import threading
+
+from categories import CategoryManager
+from config_store import ConfigStore
+from organizer import plan_folder, _resolve_duplicate
+
+# folder created inside the organized folder when no view root is given
+VIEW_DIRNAME = "_Views"
+# list of the links a view created, inside the view root
+VIEW_MANIFEST = ".view.json"
+
+
+def default_view_root(folder_path):
+    return os.path.join(os.path.abspath(folder_path), VIEW_DIRNAME)
+
+
+def valid_view_manifest(data):
+    """
+    {"Category/link name": "source file name", ...}
+    """
+    return isinstance(data, dict) and all(isinstance(k, str) and isinstance(v, str) for k, v in data.items())
+
+
+def _make_link(src, link_path):
+    """
+    Hardlink src at link_path, or symlink it if a hardlink is not possible
+    (another volume, or no hardlink support). Returns "hardlink" or "symlink".
+    """
+    try:
+        os.link(src, link_path)
+        return "hardlink"
+    except OSError:
+        os.symlink(src, link_path)
+        return "symlink"
+
+
+class FolderView:
+    """
+    Category folders of links to the files at the root of one folder.
+    Safe to use from several threads.
+    """
+
+    def __init__(self, folder_path, view_root=None, log_func=print):
+        self.folder_path = os.path.abspath(folder_path)
+        self.view_root = os.path.abspath(view_root) if view_root else default_view_root(folder_path)
+        self.log = log_func
+        self._store = ConfigStore(os.path.join(self.view_root, VIEW_MANIFEST), validate=valid_view_manifest,
+                                  indent=None, log_func=log_func)
+        self._lock = threading.Lock()
+        self._links = self._store.load(default={})  # "Category/link name" -> source file name
+        self._by_source = {src: rel for rel, src in self._links.items()}
+
+    # --- helpers ---
+    def _link_path(self, rel):
+        return os.path.join(self.view_root, *rel.split("/"))
+
+    def _is_current(self, rel, category):
+        """
+        True if the link `rel` is in `category` and still points at its source file.
+        """
+        if rel.split("/", 1)[0] != category:
+            return False
+        try:
+            # follows symlinks; for hardlinks compares inodes, so a replaced source is noticed
+            return os.path.samefile(self._link_path(rel), os.path.join(self.folder_path, self._links[rel]))
+        except OSError:
+            return False
+
+    def _drop(self, rel):
+        # caller holds the lock
+        try:
+            os.remove(self._link_path(rel))
+        except FileNotFoundError:
+            pass
+        name = self._links.pop(rel, None)
+        if name is not None and self._by_source.get(name) == rel:
+            del self._by_source[name]
+
+    def _add(self, src_name, category):
+        # caller holds the lock
+        category_dir = os.path.join(self.view_root, category)
+        os.makedirs(category_dir, exist_ok=True)
+        # only an unrelated file can already hold the name: source names are unique
+        link_path = _resolve_duplicate(os.path.join(category_dir, src_name))
+        kind = _make_link(os.path.join(self.folder_path, src_name), link_path)
+        rel = f"{category}/{os.path.basename(link_path)}"
+        self._links[rel] = src_name
+        self._by_source[src_name] = rel
+        return rel, kind
+
+    # --- incremental updates (watcher) ---
+    def link(self, src_path, category):
+        """
+        Show the file src_path (at the root of the folder) in `category`.
+        Returns the link path. Relinking a file that is already shown correctly is a no-op.
+        """
+        name = os.path.basename(src_path)
+        with self._lock:
+            rel = self._by_source.get(name)
+            if rel is not None and self._is_current(rel, category):
+                return self._link_path(rel)
+            if rel is not None:
+                self._drop(rel)  # moved to another category, or the file was replaced
+            rel, _ = self._add(name, category)
+            self._store.save(self._links)
+        return self._link_path(rel)
+
+    def unlink(self, src_path):
+        """
+        Remove the link of a file that was deleted or renamed away. Returns True if there was one.
+        """
+        name = os.path.basename(src_path)
+        with self._lock:
+            rel = self._by_source.get(name)
+            if rel is None:
+                return False
+            self._drop(rel)
+            self._store.save(self._links)
+        return True
+
+    def flush(self):
+        self._store.flush()
+
+    # --- full sync ---
+    def rebuild(self, categories_dict, selected_categories=None, dry_run=False, progress_func=None, log_func=None):
+        """
+        Make the view match the folder: links for new files, none for removed ones,
+        re-created links for files that changed category or were replaced.
+        Returns (created, removed).
+        """
+        log = log_func or self.log
+        wanted = dict(plan_folder(self.folder_path, categories_dict, selected_categories))
+        kinds = set()
+        created = 0
+        with self._lock:
+            stale = [rel for rel, name in self._links.items()
+                     if name not in wanted or not self._is_current(rel, wanted[name])]
+            stale_names = {self._links[rel] for rel in stale}
+            missing = [(name, category) for name, category in wanted.items()
+                       if name not in self._by_source or name in stale_names]
+            if dry_run:
+                for rel in stale:
+                    log(f"[DRY RUN] Would remove view link: {rel}")
+                for name, category in missing:
+                    log(f"[DRY RUN] Would link: {name} -> {category}")
+                log(f"Dry-run complete. {len(missing)} link(s) to add, {len(stale)} to remove.")
+                return len(missing), len(stale)
+
+            for rel in stale:
+                self._drop(rel)
+            for idx, (name, category) in enumerate(missing, start=1):
+                try:
+                    _, kind = self._add(name, category)
+                    kinds.add(kind)
+                    created += 1
+                except Exception as e:
+                    log(f"[View] Error linking {name}: {e}")
+                if progress_func:
+                    progress_func(idx, len(missing))
+            self._store.save(self._links)
+        self._store.flush()
+        self._remove_empty_category_dirs()
+        if progress_func and not missing:
+            progress_func(0, 0)
+
+        kind_text = f" ({', '.join(sorted(kinds))}s)" if kinds else ""
+        log(f"View updated in {self.view_root}: {created} link(s) added{kind_text}, "
+            f"{len(stale)} removed, {len(wanted)} file(s) shown.")
+        return created, len(stale)
+
+    def clear(self, log_func=None):
+        """
+        Remove every link this view created (the original files are not touched).
+        """
+        with self._lock:
+            count = len(self._links)
+            for rel in list(self._links):
+                self._drop(rel)
+            self._store.save(self._links)
+        self._store.flush()
+        self._remove_empty_category_dirs()
+        (log_func or self.log)(f"Removed {count} view link(s) from {self.view_root}.")
+        return count
+
+    def _remove_empty_category_dirs(self):
+        try:
+            with os.scandir(self.view_root) as it:
+                dirs = [e.path for e in it if e.is_dir(follow_symlinks=False)]
+        except OSError:
+            return
+        for d in dirs:
+            try:
+                os.rmdir(d)  # only succeeds when empty
+            except OSError:
+                pass
+
+
+_views = {}
+_views_lock = threading.Lock()
+
+
+def get_view(folder_path, view_root=None, log_func=print):
+    """
+    The process-wide FolderView of a folder, shared by its watcher and manual runs
+    so they work from the same list of links.
+    """
+    folder_path = os.path.abspath(folder_path)
+    view_root = os.path.abspath(view_root) if view_root else default_view_root(folder_path)
+    with _views_lock:
+        view = _views.get((folder_path, view_root))
+        if view is None:
+            view = _views[(folder_path, view_root)] = FolderView(folder_path, view_root, log_func=log_func)
+        return view
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build category views of links instead of moving files.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_rebuild = sub.add_parser("rebuild", help="create or update the view of a folder")
+    p_rebuild.add_argument("folder")
+    p_rebuild.add_argument("--view-root", help=f"where the category folders go (default: FOLDER/{VIEW_DIRNAME})")
+    p_rebuild.add_argument("--dry-run", action="store_true")
+    p_clear = sub.add_parser("clear", help="remove a folder's view links")
+    p_clear.add_argument("folder")
+    p_clear.add_argument("--view-root")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.folder):
+        print(f"No such folder: {args.folder}")
+        return 1
+    view = get_view(args.folder, args.view_root)
+    if args.command == "rebuild":
+        view.rebuild(CategoryManager().get(), dry_run=args.dry_run)
+    else:
+        view.clear()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
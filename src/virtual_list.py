@@ -0,0 +1,182 @@
+# virtual_list.py
+"""
+Virtualized list view for the Tk GUI.
+
+Only the rows that fit in the viewport (plus one) exist as widgets. Scrolling
+re-binds those pooled rows to other entries instead of creating new ones, and
+set_keys() only re-binds the visible rows, so a list with thousands of entries
+costs the same as one with twenty. Every row has the same height.
+
+    lst = VirtualList(parent, row_height=36, create_row=make, bind_row=fill)
+    lst.set_keys(["a", "b", ...])   # after add/remove/reorder
+    lst.refresh("b")                # after one entry's data changed
+
+create_row(parent) builds one row widget (its children may be laid out freely);
+bind_row(row, key, index) fills it for an entry. row.key is set to the bound key
+before bind_row is called, so row callbacks can look it up at click time.
+"""
+import tkinter as tk
+import ttkbootstrap as ttk
+
+# distance (px) from the top/bottom edge at which a drag scrolls the list
+AUTOSCROLL_MARGIN = 24
+
+
+class VirtualList(ttk.Frame):
+    def __init__(self, master, row_height, create_row, bind_row, empty_text="", **kwargs):
+        super().__init__(master, **kwargs)
+        self.row_height = row_height
+        self._create_row = create_row
+        self._bind_row = bind_row
+        self.keys = []
+        self._pool = []  # [row widget, canvas window id, (key, index) bound or None]
+
+        self.canvas = tk.Canvas(self, borderwidth=0, highlightthickness=0, yscrollincrement=row_height)
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self._yview)
+        self.canvas.configure(yscrollcommand=self.scrollbar.set)
+        self.canvas.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self._empty = self.canvas.create_text(10, 10, anchor="nw", text=empty_text, fill="gray")
+        self._drop_line = None
+        self.canvas.bind("<Configure>", lambda e: self._render(resized=True))
+        # wheel scrolling while the pointer is over the list
+        self.canvas.bind("<Enter>", lambda e: self._bind_wheel(True))
+        self.canvas.bind("<Leave>", self._on_leave)
+
+    # --- data ---
+    def set_keys(self, keys):
+        """
+        Replace the entries. Rows already showing the same key at the same index are kept.
+        """
+        self.keys = list(keys)
+        self.canvas.itemconfigure(self._empty, state="hidden" if self.keys else "normal")
+        self._update_scrollregion()
+        self._render()
+
+    def refresh(self, key=None):
+        """
+        Re-bind the visible rows showing `key` (or every visible row).
+        """
+        for entry in self._pool:
+            if entry[2] is not None and (key is None or entry[2][0] == key):
+                entry[2] = None
+        self._render()
+
+    def visible_keys(self):
+        return [entry[2][0] for entry in self._pool if entry[2] is not None]
+
+    # --- geometry ---
+    def _update_scrollregion(self):
+        height = len(self.keys) * self.row_height
+        self.canvas.configure(scrollregion=(0, 0, self.canvas.winfo_width(), height))
+
+    def _yview(self, *args):
+        self.canvas.yview(*args)
+        self._render()
+
+    def _first_visible(self):
+        return max(0, int(self.canvas.canvasy(0)) // self.row_height)
+
+    def _render(self, resized=False):
+        width = self.canvas.winfo_width()
+        if resized:
+            self._update_scrollregion()
+        wanted = min(len(self.keys), self.canvas.winfo_height() // self.row_height + 2)
+        while len(self._pool) < wanted:
+            row = self._create_row(self.canvas)
+            row.key = None
+            window = self.canvas.create_window(0, 0, anchor="nw", window=row, width=width, height=self.row_height)
+            self._pool.append([row, window, None])
+
+        top = self._first_visible()
+        for slot, entry in enumerate(self._pool):
+            row, window, bound = entry
+            index = top + slot
+            if index < len(self.keys):
+                key = self.keys[index]
+                if bound != (key, index):
+                    row.key = key
+                    self._bind_row(row, key, index)
+                    entry[2] = (key, index)
+                y = index * self.row_height
+            else:
+                entry[2] = None
+                row.key = None
+                y = -self.row_height * (slot + 2)  # parked above the scroll region
+            self.canvas.coords(window, 0, y)
+            if resized:
+                self.canvas.itemconfigure(window, width=width)
+
+    def see(self, index):
+        """
+        Scroll so entry `index` is visible.
+        """
+        first = self._first_visible()
+        visible = max(1, self.canvas.winfo_height() // self.row_height)
+        if index < first:
+            self.canvas.yview_scroll(index - first, "units")
+        elif index >= first + visible:
+            self.canvas.yview_scroll(index - first - visible + 1, "units")
+        self._render()
+
+    def row_for(self, key):
+        """
+        The row widget currently showing `key`, or None if it is scrolled out of view.
+        """
+        for row, _, bound in self._pool:
+            if bound is not None and bound[0] == key:
+                return row
+        return None
+
+    # --- drag support ---
+    def index_at(self, y_root):
+        """
+        Insertion index (0..len) for a pointer at screen y, rounding to the nearest row boundary.
+        """
+        y = y_root - self.canvas.winfo_rooty() + self.canvas.canvasy(0)
+        return max(0, min(len(self.keys), int(round(y / self.row_height))))
+
+    def autoscroll(self, y_root):
+        top = self.canvas.winfo_rooty()
+        if y_root < top + AUTOSCROLL_MARGIN:
+            self._yview("scroll", -1, "units")
+        elif y_root > top + self.canvas.winfo_height() - AUTOSCROLL_MARGIN:
+            self._yview("scroll", 1, "units")
+
+    def show_drop_line(self, index):
+        # a widget, not a canvas line: embedded row windows always cover canvas items
+        y = index * self.row_height - 1
+        if self._drop_line is None:
+            line = tk.Frame(self.canvas, height=2, bg="#2780e3")
+            self._drop_line = (line, self.canvas.create_window(0, y, anchor="nw", window=line,
+                                                               width=self.canvas.winfo_width(), height=2))
+        line, window = self._drop_line
+        self.canvas.coords(window, 0, y)
+        line.lift()
+
+    def hide_drop_line(self):
+        if self._drop_line is not None:
+            line, window = self._drop_line
+            self.canvas.delete(window)
+            line.destroy()
+            self._drop_line = None
+
+    # --- mouse wheel ---
+    def _bind_wheel(self, on):
+        if on:
+            self.canvas.bind_all("<MouseWheel>", self._on_wheel)
+            self.canvas.bind_all("<Button-4>", lambda e: self._yview("scroll", -1, "units"))
+            self.canvas.bind_all("<Button-5>", lambda e: self._yview("scroll", 1, "units"))
+        else:
+            for seq in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+                self.canvas.unbind_all(seq)
+
+    def _on_leave(self, event):
+        # moving onto a row widget also leaves the canvas; keep the wheel bound then
+        inside = self.winfo_containing(event.x_root, event.y_root)
+        if inside is None or not str(inside).startswith(str(self.canvas)):
+            self._bind_wheel(False)
+
+    def _on_wheel(self, event):
+        self._yview("scroll", -1 if event.delta > 0 else 1, "units")
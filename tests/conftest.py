@@ -0,0 +1,13 @@
+import os
+import sys
+
+import pytest
+
+# the application modules live flat in src/ and import each other by name
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+
+@pytest.fixture(autouse=True)
+def _isolated_config(tmp_path, monkeypatch):
+    # config/ is relative to the working directory; keep every test's config apart
+    monkeypatch.chdir(tmp_path)
@@ -0,0 +1,104 @@
+import os
+import time
+import asyncio
+
+from categories import CategoryManager
+from async_watcher import AsyncFolderWatcher, _wait_for_stable_file_async
+
+
+def test_stability_checks_do_not_block_the_loop(tmp_path):
+    path = tmp_path / "file.bin"
+    path.write_bytes(b"data")
+
+    def slow_check(p):
+        time.sleep(0.2)  # e.g. a /proc scan with thousands of pids, or a stalled drive
+        return None
+
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        tick_task = asyncio.create_task(ticker())
+        stable = await _wait_for_stable_file_async(str(path), check_interval=0.01, stable_checks=2, timeout=5,
+                                                   log_func=lambda m: None, readiness_checks=[slow_check])
+        tick_task.cancel()
+        return stable, ticks
+
+    stable, ticks = asyncio.run(main())
+    assert stable
+    # three 0.2 s checks: the loop kept running other coroutines meanwhile
+    assert ticks >= 20
+
+
+def test_watcher_moves_new_file(tmp_path):
+    folder = tmp_path / "watched"
+    folder.mkdir()
+
+    async def main():
+        watcher = AsyncFolderWatcher(str(folder), log_func=lambda m: None, cm=CategoryManager(), stable_checks=1,
+                                     check_interval=0.05, debounce_window=0.05, adaptive=False, readiness_checks=())
+        await watcher.start()
+        try:
+            (folder / "notes.txt").write_text("hello")
+            for _ in range(100):
+                if not (folder / "notes.txt").exists():
+                    break
+                await asyncio.sleep(0.05)
+        finally:
+            await watcher.stop()
+
+    asyncio.run(main())
+    moved = [os.path.relpath(os.path.join(d, f), folder) for d, _, files in os.walk(folder) for f in files]
+    assert moved == [os.path.join("Documents", "notes.txt")]
+
+
+def test_queued_path_is_not_scheduled_again(tmp_path):
+    from async_watcher import _AsyncWatchHandler
+
+    async def main():
+        handler = _AsyncWatchHandler(str(tmp_path), CategoryManager(), asyncio.get_running_loop(), None,
+                                     log_func=lambda m: None, adaptive=False, readiness_checks=())
+        path = str(tmp_path / "queued.txt")
+        handler._queued.add(path)  # already waiting in the batch for its move
+        handler._schedule(path)
+        return dict(handler._tasks)
+
+    assert asyncio.run(main()) == {}
+
+
+def test_stop_does_not_wait_out_a_growing_file(tmp_path):
+    folder = tmp_path / "watched"
+    folder.mkdir()
+
+    async def main():
+        watcher = AsyncFolderWatcher(str(folder), log_func=lambda m: None, cm=CategoryManager(), stable_checks=3,
+                                     check_interval=0.05, stability_timeout=30, debounce_window=0.01,
+                                     adaptive=False, readiness_checks=())
+        await watcher.start()
+        path = folder / "download.txt"
+
+        async def writer():
+            while True:
+                with open(path, "a") as f:
+                    f.write("x")
+                await asyncio.sleep(0.02)
+
+        writing = asyncio.create_task(writer())
+        for _ in range(100):
+            if watcher.in_flight():
+                break
+            await asyncio.sleep(0.02)
+        assert watcher.in_flight()
+        started = time.monotonic()
+        await watcher.stop()
+        elapsed = time.monotonic() - started
+        writing.cancel()
+        return elapsed
+
+    assert asyncio.run(main()) < 3
+    assert (folder / "download.txt").exists()
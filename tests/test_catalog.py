@@ -0,0 +1,29 @@
+import threading
+
+from catalog import Catalog, new_session_id
+
+
+def test_session_ids_are_unique_within_a_second():
+    ids = [new_session_id("watch") for _ in range(100)]
+
+    def start_pool_worker():
+        ids.append(new_session_id("watch"))
+    threads = [threading.Thread(target=start_pool_worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(set(ids)) == len(ids) == 108
+    assert all(i.startswith("watch-") for i in ids)
+
+
+def test_session_query_keeps_runs_apart(tmp_path):
+    for name in ("a.txt", "b.txt"):
+        (tmp_path / name).write_text(name)
+    catalog = Catalog(str(tmp_path / "catalog.db"))
+    first, second = new_session_id("manual"), new_session_id("manual")
+    catalog.record(str(tmp_path / "a.txt"), "Documents", str(tmp_path), first)
+    catalog.record(str(tmp_path / "b.txt"), "Documents", str(tmp_path), second)
+    catalog.flush()
+    assert [r["name"] for r in catalog.query(session=first)] == ["a.txt"]
+    catalog.close()
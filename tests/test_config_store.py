@@ -0,0 +1,65 @@
+import gc
+import json
+import os
+import time
+import weakref
+
+import config_store
+from config_store import ConfigStore, atomic_write_json, load_json, valid_categories
+
+
+def test_atomic_write_leaves_no_temp_files(tmp_path):
+    path = str(tmp_path / "cfg" / "data.json")
+    atomic_write_json(path, {"a": [".txt"]})
+    assert load_json(path) == {"a": [".txt"]}
+    assert os.listdir(tmp_path / "cfg") == ["data.json"]
+
+
+def test_damaged_file_falls_back_to_bak(tmp_path):
+    path = str(tmp_path / "categories.json")
+    store = ConfigStore(path, validate=valid_categories, log_func=lambda m: None)
+    store.save({"Documents": [".txt"]})
+    store.flush()
+    assert os.path.exists(path + config_store.BACKUP_SUFFIX)
+
+    with open(path, "w") as f:
+        f.write('{"Documents": [".t')  # torn write by another program
+    assert store.load() == {"Documents": [".txt"]}
+
+    with open(path, "w") as f:
+        json.dump({"Documents": "not a list"}, f)
+    assert load_json(path, valid_categories, log_func=lambda m: None) == {"Documents": [".txt"]}
+
+
+def test_missing_file_and_bak_give_default(tmp_path):
+    store = ConfigStore(str(tmp_path / "none.json"), log_func=lambda m: None)
+    assert store.load(default=[]) == []
+
+
+def test_burst_of_saves_is_written_once_with_the_latest_content(tmp_path, monkeypatch):
+    writes = []
+    real_write = config_store._atomic_write_text
+    monkeypatch.setattr(config_store, "_atomic_write_text", lambda p, t: (writes.append(p), real_write(p, t)))
+    path = str(tmp_path / "watched.json")
+    store = ConfigStore(path, delay=0.05)
+    for n in range(20):
+        store.save([f"/folder{n}"])
+    deadline = time.monotonic() + 5
+    while store._writer is not None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert writes == [path, path + config_store.BACKUP_SUFFIX]
+    assert load_json(path) == ["/folder19"]
+
+
+def test_stores_are_not_pinned_until_exit(tmp_path):
+    store = ConfigStore(str(tmp_path / "x.json"))
+    store.save({"k": []})
+    store.flush()
+    assert store in config_store._live_stores
+    ref = weakref.ref(store)
+    del store
+    deadline = time.monotonic() + 5
+    while ref() is not None and time.monotonic() < deadline:
+        gc.collect()  # the writer thread lets go once nothing is pending
+        time.sleep(0.01)
+    assert ref() is None
@@ -0,0 +1,60 @@
+import socket
+
+import pytest
+
+import engine_service
+from engine_service import EngineService, connect_if_running
+
+
+@pytest.fixture
+def no_unix_sockets(monkeypatch):
+    # what a Windows build of Python looks like
+    monkeypatch.delattr(socket, "AF_UNIX", raising=False)
+
+
+def test_clients_fall_back_to_in_process_without_unix_sockets(no_unix_sockets):
+    assert not engine_service.supported()
+    assert connect_if_running() is None
+
+
+def test_serve_refuses_without_unix_sockets(no_unix_sockets):
+    with pytest.raises(RuntimeError):
+        EngineService(log_func=lambda m: None).serve()
+
+
+def test_cli_reports_unsupported_platform(no_unix_sockets, capsys):
+    assert engine_service.main(["status"]) == 1
+    assert "not supported" in capsys.readouterr().out
+
+
+def test_rewatch_while_starting_keeps_one_watcher(tmp_path, monkeypatch):
+    import threading
+    import time
+    import file_watcher
+
+    folder = tmp_path / "share"
+    folder.mkdir()
+    running = set()
+    lock = threading.Lock()
+
+    def slow_start(self):
+        time.sleep(0.3)  # a slow network drive
+        with lock:
+            running.add(self)
+
+    def stop(self, deadline=None):
+        with lock:
+            running.discard(self)
+    monkeypatch.setattr(file_watcher.FolderWatcher, "start", slow_start)
+    monkeypatch.setattr(file_watcher.FolderWatcher, "stop", stop)
+
+    service = EngineService(log_func=lambda m: None)
+    assert service.watch(str(folder), save=False)
+    service.unwatch(str(folder), save=False)
+    assert service.watch(str(folder), {"backend": "polling"}, save=False)
+    deadline = time.monotonic() + 5
+    while service.status.get(str(folder)) != "Watching" and time.monotonic() < deadline:
+        time.sleep(0.02)
+    time.sleep(0.1)
+    assert running == {service.watchers[str(folder)]}
+    assert service.watchers[str(folder)].backend == "polling"
@@ -0,0 +1,154 @@
+import os
+import time
+
+import pytest
+from watchdog.events import FileMovedEvent
+
+from categories import CategoryManager
+from file_watcher import FolderWatcher, _Debouncer, _WatchHandler, stop_watchers
+from pending_work import PendingWork
+
+
+@pytest.fixture
+def handler(tmp_path):
+    h = _WatchHandler(str(tmp_path), CategoryManager(), log_func=lambda m: None, adaptive=False,
+                      readiness_checks=(), debounce_window=0)
+    h._submit = lambda path, immediate=False: None  # only the bookkeeping is under test
+    yield h
+    h.stop()
+
+
+def _rename(handler, tmp_path, src_name, dest_name):
+    src, dest = tmp_path / src_name, tmp_path / dest_name
+    dest.write_bytes(b"data")
+    handler.on_moved(FileMovedEvent(str(src), str(dest)))
+    return os.path.abspath(dest)
+
+
+def test_rename_from_finished_name_skips_wait(handler, tmp_path):
+    dest = _rename(handler, tmp_path, "report.pdf~", "report.pdf")
+    assert handler._ready_now(dest, handler._take_arrived_complete(dest))
+
+
+@pytest.mark.parametrize("partial", ["movie.mp4.crdownload", "movie.mp4.part", "movie.mp4.tmp"])
+def test_rename_from_partial_name_waits(handler, tmp_path, partial):
+    dest = _rename(handler, tmp_path, partial, "movie.mp4")
+    assert not handler._ready_now(dest, handler._take_arrived_complete(dest))
+
+
+def test_renamed_file_with_open_writer_waits(handler, tmp_path):
+    handler.readiness_checks = (lambda p: False,)  # a writer still appends to it
+    dest = _rename(handler, tmp_path, "log.txt.1", "log.txt")
+    assert not handler._ready_now(dest, handler._take_arrived_complete(dest))
+
+
+def test_file_deleted_while_queued_does_not_block_its_name(tmp_path):
+    h = _WatchHandler(str(tmp_path), CategoryManager(), log_func=lambda m: None, adaptive=False, readiness_checks=(),
+                      debounce_window=0, stable_checks=1, check_interval=0.01, policy="batch", batch_interval=3600)
+    try:
+        path = tmp_path / "a.txt"
+        path.write_text("first")
+        h._process_new_file(str(path))
+        assert str(path) in h._queued
+        path.unlink()
+        h._batcher.flush()
+        assert not h._queued
+
+        path.write_text("second")
+        h._process_new_file(str(path))
+        h._batcher.flush()
+        assert (tmp_path / "Documents" / "a.txt").read_text() == "second"
+    finally:
+        h.stop()
+
+
+def test_shutdown_mid_stability_wait_checkpoints_and_resumes(tmp_path):
+    watched = tmp_path / "watched"
+    watched.mkdir()
+    checkpoint = str(tmp_path / "pending.json")
+    options = dict(log_func=lambda m: None, adaptive=False, readiness_checks=(), debounce_window=0,
+                   stable_checks=3, check_interval=30, stability_timeout=600)
+    watcher = FolderWatcher(str(watched), pending_work=PendingWork(checkpoint), **options)
+    watcher.start()
+    path = os.path.abspath(watched / "video.mp4")
+    try:
+        (watched / "video.mp4").write_bytes(b"partial")
+        deadline = time.monotonic() + 5
+        while path not in watcher.handler._processing and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert path in watcher.handler._processing  # waiting out its 30 s stability check
+    finally:
+        started = time.monotonic()
+        late = stop_watchers([watcher], timeout=2, log_func=lambda m: None)
+    assert late == []
+    assert time.monotonic() - started < 2
+    watcher.pending_work.flush()
+
+    pending = PendingWork(checkpoint)  # as read back by the next run
+    assert pending.count() == 1
+    restarted = FolderWatcher(str(watched), pending_work=pending, **options)
+    submitted = []
+    restarted.handler._submit = lambda p, immediate=False: submitted.append(p)
+    restarted.start()
+    restarted.stop()
+    assert submitted == [path]
+    assert pending.count() == 0
+    assert os.path.isfile(path)
+
+
+# --- _Debouncer ---
+@pytest.fixture
+def debounced():
+    fired = []
+    debouncer = _Debouncer(0.3, fired.append)
+    yield debouncer, fired
+    debouncer.stop()
+
+
+def test_burst_of_events_fires_once_after_quiet_window(debounced):
+    debouncer, fired = debounced
+    for _ in range(5):
+        debouncer.submit("a")
+        time.sleep(0.02)
+    assert fired == []
+    time.sleep(0.5)
+    assert fired == ["a"]
+
+
+def test_touch_extends_a_pending_window(debounced):
+    debouncer, fired = debounced
+    debouncer.submit("a")
+    time.sleep(0.2)
+    debouncer.touch("a")
+    time.sleep(0.2)  # past the first window, inside the extended one
+    assert fired == []
+    time.sleep(0.3)
+    assert fired == ["a"]
+
+
+def test_touch_ignores_paths_not_pending(debounced):
+    debouncer, fired = debounced
+    debouncer.touch("a")
+    assert debouncer.pending() == []
+    time.sleep(0.4)
+    assert fired == []
+
+
+def test_cancel_drops_a_renamed_path(debounced):
+    debouncer, fired = debounced
+    debouncer.submit("a.crdownload")
+    debouncer.submit("b")
+    assert debouncer.cancel("a.crdownload")
+    assert not debouncer.cancel("a.crdownload")
+    time.sleep(0.5)
+    assert fired == ["b"]
+
+
+def test_stop_returns_paths_still_waiting(debounced):
+    debouncer, fired = debounced
+    debouncer.submit("a")
+    debouncer.submit("b")
+    assert sorted(debouncer.stop()) == ["a", "b"]
+    time.sleep(0.4)
+    assert fired == []
+    assert debouncer.pending() == []
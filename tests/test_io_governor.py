@@ -0,0 +1,86 @@
+import threading
+import time
+
+from io_governor import IOGovernor, PRIORITY_BULK, PRIORITY_LIVE, _TokenBucket, throttle
+
+
+def _run_contended(governor, requests):
+    """
+    Queue every (label, folder, priority) request before the first one can be
+    granted, and return the labels in the order the governor let them run.
+    """
+    order = []
+    lock = threading.Lock()
+
+    def worker(label, folder, priority):
+        governor.acquire(folder, 0, priority)
+        with lock:
+            order.append(label)
+
+    threads = [threading.Thread(target=worker, args=request) for request in requests]
+    with governor._cond:
+        governor._ops.tokens = 0.0  # empty bucket: nothing is granted until every request waits
+        for t in threads:
+            t.start()
+        time.sleep(0.1)
+        governor._ops.last = time.monotonic()
+    for t in threads:
+        t.join(10)
+    return order
+
+
+def test_live_moves_go_before_queued_bulk_moves():
+    governor = IOGovernor(ops_per_sec=20)
+    order = _run_contended(governor, [("bulk1", "/a", PRIORITY_BULK), ("bulk2", "/a", PRIORITY_BULK),
+                                      ("bulk3", "/b", PRIORITY_BULK), ("live", "/c", PRIORITY_LIVE)])
+    assert order[0] == "live"
+    assert sorted(order[1:]) == ["bulk1", "bulk2", "bulk3"]
+
+
+def test_live_move_overtakes_a_waiting_bulk_move():
+    governor = IOGovernor(ops_per_sec=5)
+    governor._ops.tokens = 0.0
+    order = []
+    bulk = threading.Thread(target=lambda: (governor.acquire("/a", 0, PRIORITY_BULK), order.append("bulk")))
+    bulk.start()
+    time.sleep(0.05)  # the bulk move is waiting for its token (0.2 s at 5 ops/s)
+    governor.acquire("/b", 0, PRIORITY_LIVE)
+    order.append("live")
+    bulk.join(5)
+    assert order == ["live", "bulk"]
+
+
+def test_folders_take_turns_under_an_ops_limit():
+    governor = IOGovernor(ops_per_sec=40)
+    requests = [(f"a{i}", "/a", PRIORITY_BULK) for i in range(4)] + [(f"b{i}", "/b", PRIORITY_BULK) for i in range(4)]
+    order = _run_contended(governor, requests)
+    folders = [label[0] for label in order]
+    assert len(folders) == 8
+    assert all(x != y for x, y in zip(folders, folders[1:]))  # strictly alternating
+
+
+def test_ops_limit_paces_operations():
+    governor = IOGovernor(ops_per_sec=20)
+    governor._ops.tokens = 0.0
+    governor._ops.last = time.monotonic()
+    started = time.monotonic()
+    for _ in range(5):
+        governor.acquire("/a")
+    assert time.monotonic() - started >= 0.2
+
+
+def test_big_move_runs_once_bucket_is_full_and_leaves_debt():
+    bucket = _TokenBucket(100)
+    now = bucket.last
+    assert bucket.wait_time(1000, now) == 0.0  # larger than the bucket, but it is full
+    bucket.take(1000)
+    assert bucket.wait_time(1, now) > 9  # paid back at 100/s before anything else runs
+
+
+def test_no_limits_never_block(tmp_path):
+    governor = IOGovernor()
+    assert not governor.limited()
+    started = time.monotonic()
+    for _ in range(1000):
+        throttle(governor, str(tmp_path), str(tmp_path / "x"), str(tmp_path))
+    assert time.monotonic() - started < 1
@@ -0,0 +1,97 @@
+import json
+import os
+
+import pytest
+
+import organizer
+from journal import MoveJournal
+from move_log import MoveLog
+
+
+@pytest.fixture
+def folder(tmp_path):
+    root = tmp_path / "inbox"
+    root.mkdir()
+    for name in ("a.txt", "b.txt", "c.jpg"):
+        (root / name).write_text(name)
+    return root
+
+
+@pytest.fixture(autouse=True)
+def _fresh_undo_state(monkeypatch):
+    # a restarted process: nothing in memory to undo
+    monkeypatch.setattr(organizer, "_last_moves", MoveLog())
+
+
+def _organize(folder, journal):
+    items = [("a.txt", "Documents"), ("b.txt", "Documents"), ("c.jpg", "Images")]
+    return organizer.organize_files(str(folder), items, log_func=lambda m: None, journal=journal, session="s1")
+
+
+def test_undo_after_restart_replays_journal(folder, tmp_path):
+    path = str(tmp_path / "journal.jsonl")
+    _organize(folder, MoveJournal(path))
+    assert sorted(os.listdir(folder)) == ["Documents", "Images"]
+
+    organizer.undo_last_organization(log_func=lambda m: None, journal=MoveJournal(path))
+    assert sorted(p for p in os.listdir(folder) if os.path.isfile(folder / p)) == ["a.txt", "b.txt", "c.jpg"]
+    # undone moves are not undone a second time
+    assert MoveJournal(path).last_session() == (None, [])
+
+
+def test_crash_between_move_and_done_record(folder, tmp_path):
+    journal = MoveJournal(str(tmp_path / "journal.jsonl"))
+    src, dest = str(folder / "a.txt"), str(folder / "Documents" / "a.txt")
+    journal.intend([(dest, src), (str(folder / "Documents" / "b.txt"), str(folder / "b.txt"))], "s1")
+    # the process dies after moving a.txt, before b.txt and before any done record
+    os.makedirs(os.path.dirname(dest))
+    os.rename(src, dest)
+
+    assert journal.last_session() == ("s1", [(dest, src)])
+    organizer.undo_last_organization(log_func=lambda m: None, journal=journal)
+    assert (folder / "a.txt").exists() and (folder / "b.txt").exists()
+
+
+def test_retried_intent_supersedes_the_taken_name(folder, tmp_path):
+    journal = MoveJournal(str(tmp_path / "journal.jsonl"))
+    src = str(folder / "a.txt")
+    taken, free = str(folder / "Documents" / "a.txt"), str(folder / "Documents" / "a (1).txt")
+    journal.intend([(taken, src)], "s1")
+    journal.intend([(free, src)], "s1")
+    os.makedirs(os.path.dirname(taken))
+    with open(taken, "w") as f:
+        f.write("someone else's file")
+    os.rename(src, free)
+    assert journal.last_session() == ("s1", [(free, src)])
+
+
+def test_last_session_is_the_most_recent_one(tmp_path):
+    journal = MoveJournal(str(tmp_path / "journal.jsonl"))
+    journal.append_batch([("d1", "s1-src")], "s1")
+    journal.append_batch([("d2", "s2-src")], "s2")
+    assert journal.last_session() == ("s2", [("d2", "s2-src")])
+    journal.record_undone([("d2", "s2-src")])
+    assert journal.last_session() == ("s1", [("d1", "s1-src")])
+    assert journal.read_session("s2") == []
+
+
+def test_old_records_and_torn_lines_are_read(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    path.write_text(json.dumps({"session": "old", "src": "s", "dest": "d", "t": 0}) + "\n" + '{"session": "old", "sr')
+    assert MoveJournal(str(path)).read_session("old") == [("d", "s")]
+
+
+def test_rotation_keeps_one_previous_generation(tmp_path):
+    journal = MoveJournal(str(tmp_path / "journal.jsonl"), max_bytes=2000)
+    for n in range(100):
+        journal.append_batch([(f"dest{n}", f"src{n}")], f"s{n}")
+    assert os.path.getsize(journal.path) <= 2000 + 200
+    assert os.path.getsize(journal.rotated_path) <= 2000 + 200
+    assert journal.last_session() == ("s99", [("dest99", "src99")])
+    assert journal.read_session("s0") == []
+
+
+def test_durable_group_commit(folder, tmp_path):
+    journal = MoveJournal(str(tmp_path / "journal.jsonl"), durable=True, commit_window=0)
+    moves = _organize(folder, journal)
+    assert journal.read_session("s1") == list(moves)
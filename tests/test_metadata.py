@@ -0,0 +1,131 @@
+import gc
+import random
+import struct
+import weakref
+
+import pytest
+
+import metadata
+from metadata import MetadataCache, read_metadata, EMPTY_METADATA
+
+
+def _tiff(e="<"):
+    make, model, date = b"Canon\0", b"Canon EOS R5\0", b"2024:05:17 10:20:30\0"
+    exif_ifd = 8 + 2 + 3 * 12 + 4
+    make_at = exif_ifd + 2 + 12 + 4
+    model_at = make_at + len(make)
+    date_at = model_at + len(model)
+    out = (b"II" if e == "<" else b"MM") + struct.pack(e + "HI", 42, 8)
+    out += struct.pack(e + "H", 3)
+    out += struct.pack(e + "HHII", metadata.TAG_MAKE, 2, len(make), make_at)
+    out += struct.pack(e + "HHII", metadata.TAG_MODEL, 2, len(model), model_at)
+    out += struct.pack(e + "HHII", metadata.TAG_EXIF_IFD, 4, 1, exif_ifd)
+    out += struct.pack(e + "I", 0)
+    out += struct.pack(e + "H", 1) + struct.pack(e + "HHII", metadata.TAG_DATETIME_ORIGINAL, 2, len(date), date_at)
+    out += struct.pack(e + "I", 0)
+    return out + make + model + date
+
+
+def _jpeg():
+    exif = b"Exif\0\0" + _tiff()
+    return b"\xff\xd8" + b"\xff\xe1" + struct.pack(">H", 2 + len(exif)) + exif + b"\xff\xda\x00\x02" + b"\x00" * 64
+
+
+def _box(kind, payload):
+    return struct.pack(">I", 8 + len(payload)) + kind + payload
+
+
+def _mp4():
+    mvhd = _box(b"mvhd", b"\0\0\0\0" + struct.pack(">II", 3800000000, 3800000000) + b"\0" * 88)
+    day = b"2023-08-01T09:15:00"
+    udta = _box(b"udta", _box(b"\xa9day", struct.pack(">HH", len(day), 0) + day))
+    return _box(b"ftyp", b"isom\0\0\0\0") + _box(b"moov", mvhd + udta) + _box(b"mdat", b"\0" * 64)
+
+
+def _id3_frame(frame_id, text):
+    body = b"\0" + text
+    return frame_id + struct.pack(">I", len(body)) + b"\0\0" + body
+
+
+def _mp3():
+    frames = _id3_frame(b"TYER", b"2021") + _id3_frame(b"TDAT", b"1705")
+    size = len(frames) + 16  # some padding
+    synchsafe = bytes([(size >> 21) & 127, (size >> 14) & 127, (size >> 7) & 127, size & 127])
+    return b"ID3\x03\x00\x00" + synchsafe + frames + b"\0" * 16 + b"\xff\xfb" + b"\0" * 64
+
+
+SAMPLES = {
+    "photo.jpg": (_jpeg(), {"date": "2024-05-17T10:20:30", "camera": "Canon EOS R5"}),
+    "raw.nef": (_tiff(">"), {"date": "2024-05-17T10:20:30", "camera": "Canon EOS R5"}),
+    "clip.mp4": (_mp4(), {"date": "2023-08-01T09:15:00", "camera": None}),
+    "song.mp3": (_mp3(), {"date": "2021-05-17", "camera": None}),
+}
+
+
+def _write(tmp_path, name, data):
+    path = tmp_path / name
+    path.write_bytes(data)
+    return str(path)
+
+
+@pytest.mark.parametrize("name", sorted(SAMPLES))
+def test_reads_date_and_camera_from_headers(tmp_path, name):
+    data, expected = SAMPLES[name]
+    assert read_metadata(_write(tmp_path, name, data)) == expected
+
+
+@pytest.mark.parametrize("name", sorted(SAMPLES))
+def test_truncated_headers_never_raise(tmp_path, name):
+    data, _ = SAMPLES[name]
+    for cut in range(len(data)):
+        result = read_metadata(_write(tmp_path, name, data[:cut]))
+        assert set(result) == set(EMPTY_METADATA)
+
+
+@pytest.mark.parametrize("name", sorted(SAMPLES))
+def test_corrupt_headers_never_raise(tmp_path, name):
+    data, _ = SAMPLES[name]
+    rng = random.Random(name)
+    for _ in range(300):
+        damaged = bytearray(data)
+        for _ in range(rng.randint(1, 4)):
+            damaged[rng.randrange(len(damaged))] = rng.randrange(256)
+        result = read_metadata(_write(tmp_path, name, bytes(damaged)))
+        assert set(result) == set(EMPTY_METADATA)
+
+
+def test_headers_are_read_within_budget(tmp_path, monkeypatch):
+    # a 'moov' full of metadata boxes must not be read past the per-file limit
+    reads = []
+    real = metadata._FileReader.read_at
+
+    def counting(self, offset, n):
+        data = real(self, offset, n)
+        reads.append(len(data))
+        return data
+    monkeypatch.setattr(metadata._FileReader, "read_at", counting)
+    moov = _box(b"moov", _box(b"udta", b"\0" * 60000) * 40)
+    read_metadata(_write(tmp_path, "big.mov", _box(b"ftyp", b"qt  \0\0\0\0") + moov))
+    assert metadata.HEADER_READ_LIMIT - 16 * 1024 < sum(reads) <= metadata.HEADER_READ_LIMIT
+
+
+def test_cache_skips_unchanged_files(tmp_path):
+    path = _write(tmp_path, "photo.jpg", SAMPLES["photo.jpg"][0])
+    cache = MetadataCache(str(tmp_path / "cache.db"))
+    assert cache._get(path) == (SAMPLES["photo.jpg"][1], True)
+    assert cache._get(path) == (SAMPLES["photo.jpg"][1], False)
+    cache.flush()
+    assert MetadataCache(str(tmp_path / "cache.db"))._get(path)[1] is False
+
+    with open(path, "ab") as f:
+        f.write(b"\0")  # changed size: read again
+    assert cache._get(path)[1] is True
+
+
+def test_caches_are_not_pinned_until_exit(tmp_path):
+    cache = MetadataCache(str(tmp_path / "cache.db"))
+    assert cache in metadata._live_caches
+    ref = weakref.ref(cache)
+    del cache
+    gc.collect()
+    assert ref() is None
@@ -0,0 +1,59 @@
+import os
+
+import pytest
+
+import organizer
+from organizer import organize_files, _move_no_replace, _DestIndex
+
+
+def _inbox(tmp_path, count):
+    folder = tmp_path / "inbox"
+    folder.mkdir()
+    names = [f"file{i:03}.txt" for i in range(count)]
+    for name in names:
+        (folder / name).write_text("original " + name)
+    return folder, names
+
+
+@pytest.mark.parametrize("count", [3, _DestIndex.LIST_THRESHOLD + 6])
+def test_files_created_during_a_batch_are_not_overwritten(tmp_path, count):
+    folder, names = _inbox(tmp_path, count)
+    docs = folder / "Documents"
+
+    def progress(done, total):
+        if done == 1:
+            # someone drops files with the remaining names into the category folder mid-batch
+            for name in names[1:]:
+                (docs / name).write_text("intruder")
+
+    moves = organize_files(str(folder), [(name, "Documents") for name in names], log_func=lambda m: None,
+                           progress_func=progress)
+    assert len(moves) == count
+    for name in names[1:]:
+        assert (docs / name).read_text() == "intruder"
+        base, ext = os.path.splitext(name)
+        assert (docs / f"{base} (1){ext}").read_text() == "original " + name
+    assert (docs / names[0]).read_text() == "original " + names[0]
+
+
+def test_move_no_replace_refuses_existing_destination(tmp_path):
+    src, dest = tmp_path / "a.txt", tmp_path / "b.txt"
+    src.write_text("a")
+    dest.write_text("b")
+    with pytest.raises(FileExistsError):
+        _move_no_replace(str(src), str(dest))
+    assert src.read_text() == "a" and dest.read_text() == "b"
+
+
+def test_move_no_replace_without_hard_links(tmp_path, monkeypatch):
+    def no_links(*args, **kwargs):
+        raise PermissionError("hard links not supported")
+    monkeypatch.setattr(organizer.os, "link", no_links)
+    src, dest = tmp_path / "a.txt", tmp_path / "b.txt"
+    src.write_text("a")
+    dest.write_text("b")
+    with pytest.raises(FileExistsError):
+        _move_no_replace(str(src), str(dest))
+    dest.unlink()
+    _move_no_replace(str(src), str(dest))
+    assert not src.exists() and dest.read_text() == "a"
@@ -0,0 +1,78 @@
+import os
+
+import pytest
+from watchdog.events import FileMovedEvent
+
+from polling_observer import ScandirPollingObserver, _diff, _snapshot
+
+
+def _events(events, root):
+    out = []
+    for e in events:
+        names = [os.path.relpath(e.src_path, root)]
+        if isinstance(e, FileMovedEvent):
+            names.append(os.path.relpath(e.dest_path, root))
+        out.append((type(e).__name__, *names))
+    return sorted(out)
+
+
+def test_diff_created_deleted_moved():
+    old = {"a.txt": 1, "b.txt": 2, "c.txt": 3}
+    new = {"a.txt": 1, "b2.txt": 2, "d.txt": 4}
+    assert _events(_diff("/f", old, new), "/f") == [
+        ("FileCreatedEvent", "d.txt"), ("FileDeletedEvent", "c.txt"), ("FileMovedEvent", "b.txt", "b2.txt")]
+
+
+def test_diff_reports_a_replaced_name():
+    # re-created under the same name between two polls
+    assert _events(_diff("/f", {"report.pdf": 1}, {"report.pdf": 2}), "/f") == [("FileCreatedEvent", "report.pdf")]
+    # atomic save: a temp file renamed over the original
+    old = {"report.pdf": 1, "report.pdf.tmp": 2}
+    assert _events(_diff("/f", old, {"report.pdf": 2}), "/f") == [("FileMovedEvent", "report.pdf.tmp", "report.pdf")]
+    assert _diff("/f", {"report.pdf": 1}, {"report.pdf": 1}) == []
+
+
+class _Recorder:
+    def __init__(self):
+        self.events = []
+
+    def dispatch(self, event):
+        self.events.append(event)
+
+
+@pytest.fixture
+def observed(tmp_path):
+    (tmp_path / "report.pdf").write_text("v1")
+    recorder = _Recorder()
+    observer = ScandirPollingObserver(min_interval=3600)  # polls only when the test asks
+    observer.schedule(recorder, str(tmp_path))
+    observer.start()
+    yield observer, recorder
+    observer.stop()
+    observer.join(1)
+
+
+def test_poll_once_sees_moves_and_replacements(tmp_path, observed):
+    observer, recorder = observed
+    (tmp_path / "new.txt").write_text("x")
+    (tmp_path / "sub").mkdir()  # folders are not reported
+    assert observer.poll_once() == 1
+    os.rename(tmp_path / "new.txt", tmp_path / "renamed.txt")
+    observer.poll_once()
+    (tmp_path / "report.pdf.tmp").write_text("v2")
+    observer.poll_once()
+    os.replace(tmp_path / "report.pdf.tmp", tmp_path / "report.pdf")
+    observer.poll_once()
+    assert _events(recorder.events, str(tmp_path)) == sorted([
+        ("FileCreatedEvent", "new.txt"),
+        ("FileMovedEvent", "new.txt", "renamed.txt"),
+        ("FileCreatedEvent", "report.pdf.tmp"),
+        ("FileMovedEvent", "report.pdf.tmp", "report.pdf"),
+    ])
+    assert observer.poll_once() == 0
+
+
+def test_snapshot_lists_only_files(tmp_path):
+    (tmp_path / "a.txt").write_text("a")
+    (tmp_path / "dir").mkdir()
+    assert list(_snapshot(str(tmp_path))) == ["a.txt"]
@@ -0,0 +1,58 @@
+import os
+
+import pytest
+
+import readiness
+from readiness import OpenWriterScanner, ready_verdict, is_busy
+from adaptive_stability import StabilityTracker, FolderWriteStats
+from file_watcher import _wait_for_stable_file
+
+
+def test_ready_verdict_never_reports_complete():
+    assert ready_verdict("x", [lambda p: True]) is None
+    assert ready_verdict("x", [lambda p: True, lambda p: False]) is False
+    assert ready_verdict("x", [lambda p: None]) is None
+
+
+def test_failing_check_counts_as_unknown():
+    def broken(path):
+        raise OSError("boom")
+    assert ready_verdict("x", [broken]) is None
+    assert not is_busy("x", [broken])
+
+
+@pytest.mark.skipif(not OpenWriterScanner.available(), reason="needs /proc")
+def test_scanner_returns_false_or_none(tmp_path):
+    path = tmp_path / "file.bin"
+    path.write_bytes(b"data")
+    scanner = OpenWriterScanner(ttl=0)
+    # nobody writing: "no writer seen" is not proof of completion
+    assert scanner(str(path)) is None
+    with open(path, "ab"):
+        assert scanner(str(path)) is False
+    with open(path, "rb"):
+        assert scanner(str(path)) is None
+
+
+def test_advisory_lock_check_never_true(tmp_path):
+    path = tmp_path / "file.bin"
+    path.write_bytes(b"data")
+    assert readiness.advisory_lock_check(str(path)) is None
+
+
+def test_size_wait_keeps_waiting_while_busy(tmp_path):
+    path = tmp_path / "file.bin"
+    path.write_bytes(b"data")
+    busy = [lambda p: False]
+    assert not _wait_for_stable_file(str(path), check_interval=0.01, stable_checks=2, timeout=0.2,
+                                     log_func=lambda m: None, readiness_checks=busy)
+    assert _wait_for_stable_file(str(path), check_interval=0.01, stable_checks=2, timeout=1,
+                                 log_func=lambda m: None, readiness_checks=[lambda p: True])
+
+
+def test_tracker_ignores_unchanged_size_while_busy():
+    tracker = StabilityTracker(FolderWriteStats(), 0.1, 2, 60)
+    for now in range(5):
+        assert tracker.observe(10, float(now), busy=True)[0] == "wait"
+    assert tracker.observe(10, 5.0)[0] == "wait"
+    assert tracker.observe(10, 6.0)[0] == "stable"
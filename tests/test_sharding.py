@@ -0,0 +1,83 @@
+import os
+
+from sharding import ShardingConfig, ShardPolicy, SHARD_MARKER
+from organizer import organize_folder
+
+CATEGORIES = {"Documents": [".txt"]}
+
+
+def _config(tmp_path, threshold):
+    config = ShardingConfig(str(tmp_path / "sharding.json"))
+    config.policies["Documents"] = ShardPolicy("alpha", threshold)
+    return config
+
+
+def _folder(tmp_path, names):
+    folder = tmp_path / "inbox"
+    (folder / "Documents").mkdir(parents=True)
+    (folder / "Documents" / "old.txt").write_text("x")
+    for name in names:
+        (folder / name).write_text(name)
+    return folder
+
+
+def test_dry_run_leaves_no_marker_or_counts(tmp_path):
+    folder = _folder(tmp_path, ["a.txt", "b.txt", "c.txt"])
+    config = _config(tmp_path, threshold=2)
+    logs = []
+    organize_folder(str(folder), CATEGORIES, log_func=logs.append, dry_run=True, sharding=config)
+
+    assert not (folder / "Documents" / SHARD_MARKER).exists()
+    assert config._counts == {}
+    # the plan still shows the threshold being crossed during the run
+    planned = [line.split(" -> ")[1] for line in logs if line.startswith("[DRY RUN]")]
+    assert len(planned) == 3
+    assert sum(1 for dest in planned if dest.count("/") == 2) == 2  # all but the first go to shards
+
+
+def test_dry_run_predicts_the_real_run(tmp_path):
+    folder = _folder(tmp_path, ["a.txt", "b.txt", "c.txt"])
+    config = _config(tmp_path, threshold=2)
+    logs = []
+    organize_folder(str(folder), CATEGORIES, log_func=logs.append, dry_run=True, sharding=config)
+    organize_folder(str(folder), CATEGORIES, log_func=logs.append, sharding=config)
+
+    planned = sorted(line.split(" -> ")[1] for line in logs if line.startswith("[DRY RUN]"))
+    moved = sorted(line.split(" -> ")[1] for line in logs if line.startswith("Moved:"))
+    assert planned == moved
+    for dest in moved:
+        assert (folder / dest).exists()
+    assert (folder / "Documents" / SHARD_MARKER).exists()
+
+
+def test_sharding_config_is_one_instance_across_threads(monkeypatch):
+    import threading
+    import time
+    import sharding
+
+    monkeypatch.setattr(sharding, "_default_config", None)
+    real_init = sharding.ShardingConfig.__init__
+
+    def slow_init(self, *args, **kwargs):
+        time.sleep(0.05)  # reading sharding.json while other start workers arrive
+        real_init(self, *args, **kwargs)
+    monkeypatch.setattr(sharding.ShardingConfig, "__init__", slow_init)
+    configs = []
+    threads = [threading.Thread(target=lambda: configs.append(sharding.get_sharding_config())) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len({id(c) for c in configs}) == 1
+
+
+def test_rebalance_keeps_existing_names(tmp_path):
+    import sharding
+
+    docs = tmp_path / "Documents"
+    (docs / "a").mkdir(parents=True)
+    (docs / "a" / "apple.txt").write_text("already sharded")
+    (docs / "apple.txt").write_text("new")
+    policy = sharding.ShardPolicy("alpha")
+    assert sharding.rebalance(str(tmp_path), "Documents", policy, log_func=lambda m: None) == 1
+    assert sorted(os.listdir(docs / "a")) == ["apple (1).txt", "apple.txt"]
@@ -0,0 +1,103 @@
+import os
+
+import pytest
+
+import organizer
+import views
+from views import FolderView, VIEW_DIRNAME, VIEW_MANIFEST
+
+CATEGORIES = {"Documents": [".pdf", ".txt"], "Images": [".jpg"]}
+
+
+@pytest.fixture
+def folder(tmp_path):
+    root = tmp_path / "Downloads"
+    root.mkdir()
+    for name in ("report.pdf", "notes.txt", "cat.jpg"):
+        (root / name).write_text(name)
+    return root
+
+
+def _view(folder):
+    return FolderView(str(folder), log_func=lambda m: None)
+
+
+def _listing(view_root):
+    return sorted(os.path.relpath(os.path.join(d, f), view_root).replace(os.sep, "/")
+                  for d, _, files in os.walk(view_root) for f in files if not f.startswith(VIEW_MANIFEST))
+
+
+def test_rebuild_links_files_without_moving_them(folder):
+    view = _view(folder)
+    assert view.rebuild(CATEGORIES) == (3, 0)
+    root = folder / VIEW_DIRNAME
+    assert _listing(root) == ["Documents/notes.txt", "Documents/report.pdf", "Images/cat.jpg"]
+    assert os.path.samefile(root / "Images" / "cat.jpg", folder / "cat.jpg")
+    assert (folder / "report.pdf").is_file()  # the original stays put
+    assert (root / VIEW_MANIFEST).exists()
+
+
+def test_dry_run_changes_nothing(folder):
+    assert _view(folder).rebuild(CATEGORIES, dry_run=True) == (3, 0)
+    assert not (folder / VIEW_DIRNAME).exists()
+
+
+def test_rebuild_only_touches_what_changed(folder):
+    view = _view(folder)
+    view.rebuild(CATEGORIES)
+    assert view.rebuild(CATEGORIES) == (0, 0)
+
+    (folder / "notes.txt").unlink()
+    (folder / "cat.jpg").unlink()
+    (folder / "cat.jpg").write_text("a new picture under the old name")
+    assert view.rebuild(CATEGORIES) == (1, 2)
+    root = folder / VIEW_DIRNAME
+    assert _listing(root) == ["Documents/report.pdf", "Images/cat.jpg"]
+    assert os.path.samefile(root / "Images" / "cat.jpg", folder / "cat.jpg")
+
+
+def test_manifest_survives_restart_and_clear_keeps_foreign_files(folder):
+    view = _view(folder)
+    view.rebuild(CATEGORIES)
+    foreign = folder / VIEW_DIRNAME / "Documents" / "mine.txt"
+    foreign.write_text("put here by the user")
+
+    restarted = _view(folder)
+    assert restarted.rebuild(CATEGORIES) == (0, 0)
+    assert restarted.clear(log_func=lambda m: None) == 3
+    assert _listing(folder / VIEW_DIRNAME) == ["Documents/mine.txt"]
+    assert sorted(os.listdir(folder)) == [VIEW_DIRNAME, "cat.jpg", "notes.txt", "report.pdf"]
+
+
+def test_link_avoids_names_it_does_not_own(folder):
+    view = _view(folder)
+    (folder / VIEW_DIRNAME / "Documents").mkdir(parents=True)
+    (folder / VIEW_DIRNAME / "Documents" / "report.pdf").write_text("someone else's")
+    link = view.link(str(folder / "report.pdf"), "Documents")
+    assert os.path.basename(link) == "report (1).pdf"
+    assert view.unlink(str(folder / "report.pdf"))
+    assert not os.path.exists(link)
+    assert (folder / VIEW_DIRNAME / "Documents" / "report.pdf").exists()
+
+
+def test_relinking_into_another_category_moves_the_link(folder):
+    view = _view(folder)
+    first = view.link(str(folder / "notes.txt"), "Documents")
+    assert view.link(str(folder / "notes.txt"), "Documents") == first
+    second = view.link(str(folder / "notes.txt"), "Images")
+    assert not os.path.exists(first) and os.path.samefile(second, folder / "notes.txt")
+
+
+def test_symlinks_when_hardlinks_are_impossible(folder, monkeypatch):
+    def no_hardlinks(src, dst, **kwargs):
+        raise OSError("cross-device link")
+    monkeypatch.setattr(os, "link", no_hardlinks)
+    link = _view(folder).link(str(folder / "cat.jpg"), "Images")
+    assert os.path.islink(link) and os.path.samefile(link, folder / "cat.jpg")
+
+
+def test_organize_folder_view_mode(folder, monkeypatch):
+    monkeypatch.setattr(views, "_views", {})
+    organizer.organize_folder(str(folder), CATEGORIES, log_func=lambda m: None, mode="view")
+    assert _listing(folder / VIEW_DIRNAME) == ["Documents/notes.txt", "Documents/report.pdf", "Images/cat.jpg"]
+    assert sorted(os.listdir(folder)) == [VIEW_DIRNAME, "cat.jpg", "notes.txt", "report.pdf"]
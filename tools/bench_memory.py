@@ -0,0 +1,171 @@
+# bench_memory.py
+"""
+Peak memory of organizing a huge folder.
+
+By default builds the plan of N files the way plan_folder does (names only, no
+files on disk) and runs organizer.organize_files on it as a dry run, reporting
+how far the whole call raised the process's peak RSS. --create makes N empty files in a
+temporary folder and runs a real organize_folder instead, which also records
+the undo log. --legacy builds the old list-of-tuples plan and move list for
+comparison. --folder dry-runs organize_folder on an existing folder.
+
+--tracemalloc reports peak traced Python allocations instead (the default
+where RSS is unavailable, e.g. Windows); it makes the run many times slower.
+Progress goes to stderr.
+
+    python tools/bench_memory.py -n 5000000
+    python tools/bench_memory.py -n 5000000 --legacy
+    python tools/bench_memory.py -n 200000 --create
+    python tools/bench_memory.py --folder /path/to/huge/folder
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from categories import DEFAULT_CATEGORIES  # noqa: E402
+import organizer  # noqa: E402
+from move_log import PlanItems  # noqa: E402
+
+ROOT = os.path.join(os.sep, "home", "user", "Downloads")
+
+
+def _synthetic_names(n):
+    exts = [e for exts in DEFAULT_CATEGORIES.values() for e in exts]
+    for i in range(n):
+        yield f"IMG_2024_holiday_photo_{i:08d}{exts[i % len(exts)]}"
+
+
+def _category_lookup():
+    lookup = {}
+    for cat, exts in DEFAULT_CATEGORIES.items():
+        for e in exts:
+            lookup.setdefault(e, cat)
+    return lookup
+
+
+def _max_rss():
+    # ru_maxrss is in KiB on Linux, bytes on macOS
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+
+
+class _PeakMeter:
+    """
+    Peak memory since start(): RSS growth, or traced allocations with tracemalloc.
+    """
+
+    def __init__(self, trace):
+        self.trace = trace or resource is None
+        self.base = 0
+
+    def start(self):
+        if self.trace:
+            tracemalloc.start()
+        else:
+            self.base = _max_rss()
+
+    def stop(self):
+        if not self.trace:
+            return "peak RSS growth", _max_rss() - self.base
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return "peak traced", peak
+
+
+def _progress(done, total):
+    if total and done % max(total // 10, 1) == 0:
+        print(f"  {done}/{total}", file=sys.stderr, flush=True)
+
+
+def bench_compact(n):
+    lookup = _category_lookup()
+    plan = PlanItems()
+    for name in _synthetic_names(n):
+        plan.append(name, lookup.get(os.path.splitext(name)[1], "Others"))
+    # ROOT does not exist, so the dry run's destination listing finds nothing
+    organizer.organize_files(ROOT, plan, log_func=lambda m: None, progress_func=_progress, dry_run=True)
+    return plan
+
+
+def bench_legacy(n):
+    lookup = _category_lookup()
+    files = list(_synthetic_names(n))
+    candidates = []
+    for f in files:
+        ext = os.path.splitext(f)[1]
+        candidates.append((f, ext, lookup.get(ext, "Others")))
+    moves = []
+    for f, ext, category in candidates:
+        moves.append((os.path.join(ROOT, category, f), os.path.join(ROOT, f)))
+    return files, candidates, moves
+
+
+def bench_folder(folder):
+    organizer.organize_folder(folder, DEFAULT_CATEGORIES, log_func=lambda m: None, progress_func=_progress, dry_run=True)
+
+
+def bench_create(n, folder, meter):
+    for i, name in enumerate(_synthetic_names(n), start=1):
+        open(os.path.join(folder, name), "wb").close()
+        _progress(i, n)
+    print("  files created, organizing", file=sys.stderr, flush=True)
+    meter.start()
+    organizer.organize_folder(folder, DEFAULT_CATEGORIES, log_func=lambda m: None, progress_func=_progress)
+    return organizer._last_moves
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure peak memory of a large organize plan.")
+    parser.add_argument("-n", type=int, default=1000000, help="number of files")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--legacy", action="store_true", help="measure the old list-based representation")
+    mode.add_argument("--create", action="store_true", help="create N empty files and organize them for real")
+    mode.add_argument("--folder", help="dry-run organize_folder on this folder instead")
+    parser.add_argument("--tracemalloc", action="store_true", help="report traced Python allocations instead of RSS")
+    args = parser.parse_args(argv)
+
+    meter = _PeakMeter(args.tracemalloc)
+    tmp = None
+    if args.create:
+        tmp = tempfile.mkdtemp(prefix="bench_memory_")
+    else:
+        meter.start()  # --create starts measuring after making its files
+    start = time.perf_counter()
+    try:
+        if args.folder:
+            label = f"dry-run organize_folder({args.folder})"
+            result = bench_folder(args.folder)
+        elif args.create:
+            label = f"organize_folder, {args.n} files"
+            result = bench_create(args.n, tmp, meter)
+        elif args.legacy:
+            label = f"legacy lists, {args.n} files"
+            result = bench_legacy(args.n)
+        else:
+            label = f"dry-run organize_files, {args.n} files"
+            result = bench_compact(args.n)
+        elapsed = time.perf_counter() - start
+        kind, peak = meter.stop()
+        del result
+    finally:
+        if tmp is not None:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    print(f"{label}: {kind} {peak / 2**20:.1f} MiB, {elapsed:.1f}s")
+    if not args.folder:
+        print(f"  {peak / max(args.n, 1):.0f} bytes/file at peak")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,450 @@
+# soak_watcher.py
+"""
+Soak / stress harness for FolderWatcher.
+
+Runs real watchers on scratch folders for a long time while a driver keeps
+producing the traffic seen in practice:
+    burst    - a file written in many small appends (event storm for one path)
+    partial  - a browser-style download: name.pdf.crdownload grows, then is renamed
+    rename   - an editor-style save: name.tmp written, then renamed to its real name
+    storm    - dozens of small files created at once
+    delete   - a file removed before it settles (must not be moved)
+    sentinel - every --sentinel-every seconds a sentinel file is deleted; the
+               watcher must stop and the harness starts a fresh one on that folder
+
+Every --sample seconds it records, from inside the process:
+    threads  - live threads, not counting the harness's own
+    rss      - resident memory (psutil if installed, else /proc; skipped if neither)
+    queue    - files debouncing, waiting for stability or queued for a batch
+    undo     - entries in organizer._last_moves
+    latency  - p50/p95 seconds from a file's final name appearing to its move
+
+After --duration seconds the driver stops, the watchers get --settle seconds to go
+idle, and the run FAILS (exit code 1) if:
+    - the thread count did not return to the idle baseline (+ lazily started
+      per-watcher threads + --max-thread-growth)
+    - the queue is not empty (leaked _processing / _queued / debouncer entries)
+    - files that should have been moved never were (lost within --lost-after)
+    - RSS grew faster than --max-rss-slope MiB/hour over the steady-state samples
+    - p95 latency in the last quarter is over --max-latency-drift times the
+      first quarter's (and at least 0.5s worse)
+
+    python tools/soak_watcher.py --duration 14400 --folders 4 --rate 10 --csv soak.csv
+    python tools/soak_watcher.py --duration 120 --policy batch --sentinel-every 30
+
+Everything runs in a scratch directory (--workdir, default a temp folder), which is
+also the working directory, so the app's config/ files there are throwaway.
+"""
+import os
+import sys
+import csv
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import threading
+from collections import deque
+
+try:
+    import psutil  # optional, for RSS on every platform
+except ImportError:
+    psutil = None
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import organizer  # noqa: E402
+from file_watcher import FolderWatcher, SENTINEL_FILENAME  # noqa: E402
+
+SCENARIOS = {"burst": 3, "partial": 2, "rename": 2, "storm": 1, "delete": 2}
+KNOWN_EXTS = (".pdf", ".txt", ".jpg", ".png", ".mp3", ".zip", ".py")
+# the harness's own threads are named with this prefix and not counted
+THREAD_PREFIX = "soak-"
+STORM_FILES = 40
+# moves considered for the latency percentiles of one sample window
+LATENCY_WINDOW = 5000
+# latency drift must also exceed this many seconds to fail (ignores tiny baselines)
+LATENCY_DRIFT_FLOOR = 0.5
+# threads a watcher starts lazily on its first file (debouncer, batch timer)
+LAZY_THREADS_PER_WATCHER = 2
+# steady-state seconds needed before the RSS trend means anything
+RSS_MIN_SPAN = 600
+
+
+def rss_bytes():
+    """
+    Resident memory of this process, or None if it cannot be read.
+    """
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def live_threads():
+    return sum(1 for t in threading.enumerate() if not t.name.startswith(THREAD_PREFIX))
+
+
+def queue_depth(watcher):
+    handler = watcher.handler
+    depth = len(handler._processing) + len(handler._queued)
+    if handler._debouncer is not None:
+        depth += len(handler._debouncer.pending())
+    return depth
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def slope_per_hour(points):
+    """
+    Least-squares slope of (seconds, value) points, per hour.
+    """
+    if len(points) < 3:
+        return 0.0
+    n = len(points)
+    mean_t = sum(t for t, _ in points) / n
+    mean_v = sum(v for _, v in points) / n
+    var = sum((t - mean_t) ** 2 for t, _ in points)
+    if var == 0:
+        return 0.0
+    return sum((t - mean_t) * (v - mean_v) for t, v in points) / var * 3600
+
+
+class Soak:
+    def __init__(self, args, workdir):
+        self.args = args
+        self.workdir = workdir
+        self.rng = random.Random(args.seed)
+        self.folders = [os.path.join(workdir, f"watched_{i}") for i in range(args.folders)]
+        self.watchers = {}
+        self.lock = threading.Lock()
+        self.expected = {}  # src path -> time its final name appeared
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.all_latencies = []  # (elapsed, latency) for drift checks
+        self.samples = []
+        self.counter = 0
+        self.moved = 0
+        self.lost = 0
+        self.errors = 0
+        self.restarts = 0
+        self.seen_moves = 0
+        self.stop_driving = threading.Event()
+        self.slots = threading.BoundedSemaphore(args.concurrency)
+        self.start = time.monotonic()
+
+    # --- watchers ---
+    def log(self, msg):
+        if "Error" in msg:
+            self.errors += 1
+        if self.args.verbose or "Error" in msg:
+            print(msg)
+
+    def start_watcher(self, folder):
+        watcher = FolderWatcher(folder, log_func=self.log, policy=self.args.policy, backend=self.args.backend,
+                                batch_interval=self.args.batch_interval)
+        watcher.start()
+        self.watchers[folder] = watcher
+
+    def check_sentinels(self):
+        """
+        Replace watchers that stopped themselves after their sentinel was deleted.
+        """
+        for folder, watcher in list(self.watchers.items()):
+            if not watcher.is_running():
+                # the sentinel monitor is still inside stop(), which removes the sentinel
+                # file; a new watcher started before it returns would lose its sentinel
+                if watcher._thread is not None:
+                    watcher._thread.join(5)
+                self.restarts += 1
+                # files that arrived while nothing watched the folder are not organized; stop expecting them
+                prefix = folder + os.sep
+                with self.lock:
+                    for path in [p for p in self.expected if p.startswith(prefix)]:
+                        del self.expected[path]
+                self.start_watcher(folder)
+
+    # --- traffic ---
+    def _name(self, ext):
+        with self.lock:
+            self.counter += 1
+            return f"soak_{self.counter:09d}{ext}"
+
+    def _expect(self, path):
+        # called right before the file gets its final name, so a fast move is never missed
+        with self.lock:
+            self.expected[path] = time.monotonic()
+
+    def _running_folder(self):
+        folders = [f for f, w in self.watchers.items() if w.is_running()]
+        return self.rng.choice(folders) if folders else None
+
+    def burst(self, folder):
+        path = os.path.join(folder, self._name(self.rng.choice(KNOWN_EXTS)))
+        self._expect(path)
+        with open(path, "wb") as f:
+            for _ in range(self.rng.randint(5, 50)):
+                f.write(os.urandom(512))
+                f.flush()
+
+    def partial(self, folder):
+        final = os.path.join(folder, self._name(".pdf"))
+        temp = final + ".crdownload"
+        with open(temp, "wb") as f:
+            for _ in range(self.rng.randint(3, 10)):
+                f.write(os.urandom(4096))
+                f.flush()
+                if self.stop_driving.wait(self.rng.uniform(0.05, 0.3)):
+                    break
+        self._expect(final)
+        os.replace(temp, final)
+
+    def rename(self, folder):
+        temp = os.path.join(folder, self._name(".tmp"))
+        with open(temp, "wb") as f:
+            f.write(os.urandom(1024))
+        time.sleep(self.rng.uniform(0.0, 1.0))
+        final = os.path.splitext(temp)[0] + self.rng.choice(KNOWN_EXTS)
+        self._expect(final)
+        os.replace(temp, final)
+
+    def storm(self, folder):
+        for _ in range(STORM_FILES):
+            path = os.path.join(folder, self._name(self.rng.choice(KNOWN_EXTS)))
+            self._expect(path)
+            with open(path, "wb") as f:
+                f.write(b"x")
+
+    def delete(self, folder):
+        path = os.path.join(folder, self._name(".txt"))
+        with open(path, "wb") as f:
+            f.write(b"gone soon")
+        time.sleep(self.rng.uniform(0.0, 0.2))
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _run_scenario(self, name, folder):
+        try:
+            getattr(self, name)(folder)
+        except OSError as e:
+            # the folder's watcher may just have moved the file; not a watcher failure
+            if self.args.verbose:
+                print(f"[Soak] {name} in {folder}: {e}")
+        finally:
+            self.slots.release()
+
+    def drive(self):
+        names = list(SCENARIOS)
+        weights = [SCENARIOS[n] for n in names]
+        next_sentinel = time.monotonic() + self.args.sentinel_every if self.args.sentinel_every > 0 else None
+        while not self.stop_driving.wait(self.rng.expovariate(self.args.rate)):
+            if next_sentinel is not None and time.monotonic() >= next_sentinel:
+                next_sentinel += self.args.sentinel_every
+                folder = self._running_folder()
+                if folder is not None:
+                    try:
+                        os.remove(os.path.join(folder, SENTINEL_FILENAME))
+                    except OSError:
+                        pass
+            folder = self._running_folder()
+            if folder is None or not self.slots.acquire(timeout=1):
+                continue
+            name = self.rng.choices(names, weights)[0]
+            threading.Thread(target=self._run_scenario, args=(name, folder), daemon=True,
+                             name=f"{THREAD_PREFIX}{name}").start()
+
+    # --- measurement ---
+    def collect_moves(self):
+        """
+        Match new undo-log entries to the files the driver created.
+        """
+        moves = organizer._last_moves
+        total = len(moves)
+        now = time.monotonic()
+        for i in range(self.seen_moves, total):
+            dest, src = moves[i]
+            with self.lock:
+                appeared = self.expected.pop(src, None)
+            if appeared is not None:
+                self.moved += 1
+                self.latencies.append(now - appeared)
+                self.all_latencies.append((now - self.start, now - appeared))
+            try:
+                os.remove(dest)  # keep the scratch folders small over long runs
+            except OSError:
+                pass
+        self.seen_moves = total
+        # files never moved, e.g. dropped events
+        with self.lock:
+            for path, appeared in list(self.expected.items()):
+                if now - appeared > self.args.lost_after:
+                    del self.expected[path]
+                    self.lost += 1
+                    print(f"[Soak] Never moved: {path}")
+
+    def sample(self):
+        latencies = list(self.latencies)
+        self.latencies.clear()
+        rss = rss_bytes()
+        row = {
+            "elapsed": round(time.monotonic() - self.start, 1),
+            "threads": live_threads(),
+            "rss_mib": None if rss is None else round(rss / 2**20, 1),
+            "queue": sum(queue_depth(w) for w in self.watchers.values()),
+            "undo": len(organizer._last_moves),
+            "moved": self.moved,
+            "p50": percentile(latencies, 0.5),
+            "p95": percentile(latencies, 0.95),
+            "lost": self.lost,
+            "errors": self.errors,
+            "restarts": self.restarts,
+        }
+        self.samples.append(row)
+        p50 = "-" if row["p50"] is None else f"{row['p50']:.2f}s"
+        p95 = "-" if row["p95"] is None else f"{row['p95']:.2f}s"
+        print(f"[{row['elapsed']:>8.0f}s] threads={row['threads']} rss={row['rss_mib']}MiB queue={row['queue']} "
+              f"undo={row['undo']} moved={row['moved']} p50={p50} p95={p95} lost={row['lost']} "
+              f"errors={row['errors']} restarts={row['restarts']}")
+        return row
+
+    def wait_for_idle(self, timeout):
+        end = time.monotonic() + timeout
+        while time.monotonic() < end:
+            self.collect_moves()
+            if not self.expected and all(queue_depth(w) == 0 for w in self.watchers.values()):
+                return True
+            time.sleep(0.2)
+        return False
+
+    # --- run ---
+    def run(self):
+        for folder in self.folders:
+            os.makedirs(folder, exist_ok=True)
+            self.start_watcher(folder)
+        time.sleep(1)
+        baseline_threads = live_threads()
+        print(f"[Soak] {len(self.folders)} watcher(s) in {self.workdir}, idle threads: {baseline_threads}")
+
+        driver = threading.Thread(target=self.drive, daemon=True, name=f"{THREAD_PREFIX}driver")
+        driver.start()
+        end = self.start + self.args.duration
+        next_sample = time.monotonic() + self.args.sample
+        while time.monotonic() < end:
+            time.sleep(0.2)
+            self.collect_moves()
+            self.check_sentinels()
+            if time.monotonic() >= next_sample:
+                next_sample += self.args.sample
+                self.sample()
+        self.stop_driving.set()
+        driver.join()
+
+        print(f"[Soak] Driver stopped; waiting up to {self.args.settle:.0f}s for the watchers to go idle...")
+        self.check_sentinels()
+        idle = self.wait_for_idle(self.args.settle)
+        time.sleep(1)  # let finished worker threads exit
+        final = self.sample()
+        failures = self.verdict(baseline_threads, final, idle)
+
+        for watcher in self.watchers.values():
+            watcher.stop()
+        return failures
+
+    def verdict(self, baseline_threads, final, idle):
+        args = self.args
+        failures = []
+        allowed = baseline_threads + LAZY_THREADS_PER_WATCHER * len(self.watchers) + args.max_thread_growth
+        if final["threads"] > allowed:
+            failures.append(f"thread leak: {final['threads']} threads when idle, at most {allowed} expected")
+        if final["queue"]:
+            failures.append(f"queue not drained: {final['queue']} entries left after {args.settle:.0f}s")
+        if not idle:
+            for path in self.expected:
+                print(f"[Soak] Never moved: {path}")
+        if self.lost or self.expected:
+            failures.append(f"{self.lost + len(self.expected)} file(s) never moved")
+
+        # steady state: skip the first 10% of samples (imports, caches, adaptive stats warming up)
+        steady = self.samples[max(1, len(self.samples) // 10):-1]
+        rss_points = [(s["elapsed"], s["rss_mib"]) for s in steady if s["rss_mib"] is not None]
+        rss_slope = slope_per_hour(rss_points)
+        if len(rss_points) < 3 or rss_points[-1][0] - rss_points[0][0] < RSS_MIN_SPAN:
+            print(f"[Soak] Run too short for an RSS trend (needs {RSS_MIN_SPAN}s of steady state); not checked.")
+        elif rss_slope > args.max_rss_slope:
+            failures.append(f"memory growth: RSS rising {rss_slope:.1f} MiB/hour (limit {args.max_rss_slope})")
+
+        if len(self.all_latencies) >= 40:
+            quarter = args.duration / 4
+            first = [lat for t, lat in self.all_latencies if t <= quarter]
+            last = [lat for t, lat in self.all_latencies if t >= 3 * quarter]
+            p95_first, p95_last = percentile(first, 0.95), percentile(last, 0.95)
+            if p95_first is not None and p95_last is not None and p95_last > max(
+                    p95_first * args.max_latency_drift, p95_first + LATENCY_DRIFT_FLOOR):
+                failures.append(f"latency drift: p95 {p95_first:.2f}s in the first quarter, {p95_last:.2f}s in the last")
+
+        print(f"[Soak] moved={self.moved} restarts={self.restarts} errors={self.errors} "
+              f"rss slope={rss_slope:.1f} MiB/hour undo entries={final['undo']}")
+        return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Soak-test FolderWatcher with synthetic traffic.")
+    parser.add_argument("--duration", type=float, default=3600, help="seconds of traffic (default 3600)")
+    parser.add_argument("--folders", type=int, default=2, help="watched folders")
+    parser.add_argument("--rate", type=float, default=5.0, help="scenarios started per second")
+    parser.add_argument("--concurrency", type=int, default=16, help="scenarios running at once")
+    parser.add_argument("--policy", default="immediate", choices=("immediate", "batch"))
+    parser.add_argument("--backend", default="native", choices=("native", "polling"))
+    parser.add_argument("--batch-interval", type=float, default=5.0)
+    parser.add_argument("--sentinel-every", type=float, default=600, help="seconds between sentinel deletions (0 = never)")
+    parser.add_argument("--sample", type=float, default=10.0, help="seconds between samples")
+    parser.add_argument("--settle", type=float, default=120.0, help="seconds allowed to go idle at the end")
+    parser.add_argument("--lost-after", type=float, default=300.0, help="seconds after which an unmoved file counts as lost")
+    parser.add_argument("--max-thread-growth", type=int, default=5)
+    parser.add_argument("--max-rss-slope", type=float, default=20.0, help="MiB/hour")
+    parser.add_argument("--max-latency-drift", type=float, default=2.0, help="last/first quarter p95 ratio")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--workdir", help="scratch directory (default: a new temp folder, removed afterwards)")
+    parser.add_argument("--csv", help="write the samples to this CSV file")
+    parser.add_argument("--verbose", action="store_true", help="print every watcher log line")
+    args = parser.parse_args(argv)
+
+    csv_path = os.path.abspath(args.csv) if args.csv else None
+    workdir = os.path.abspath(args.workdir) if args.workdir else tempfile.mkdtemp(prefix="soak_watcher_")
+    os.makedirs(workdir, exist_ok=True)
+    previous_cwd = os.getcwd()
+    os.chdir(workdir)  # config/ files written by the watchers stay in the scratch dir
+    try:
+        soak = Soak(args, workdir)
+        failures = soak.run()
+    finally:
+        os.chdir(previous_cwd)
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    if csv_path and soak.samples:
+        with open(csv_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=list(soak.samples[0]))
+            writer.writeheader()
+            writer.writerows(soak.samples)
+
+    if failures:
+        print("FAIL")
+        for failure in failures:
+            print(f"  - {failure}")
+        return 1
+    print("PASS")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())